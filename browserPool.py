@@ -0,0 +1,131 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from resourceFilter import applyChromeOptions, installCdpBlocking
+
+# 브라우저 풀 기본값
+POOL_SIZE = 3                 # 동시에 띄울 headless Chrome 수
+MAX_PAGES_PER_DRIVER = 50     # 이 수만큼 페이지를 연 드라이버는 메모리 누수를 막기 위해 새로 띄움
+
+def defaultOptions() -> Options:
+    # 셀레니움 드라이버 설정
+    options = Options()
+    options.add_argument("--headless")          # 브라우저 창을 띄우지 않음
+    options.add_argument("--no-sandbox")        # 서버/루트 환경에서 실행 시 필수
+    options.add_argument("--disable-dev-shm-usage")  # 리소스 부족 에러 방지
+    options.add_argument("--disable-gpu")           # GPU 가속 비활성화
+    # options.add_experimental_option("detach", True) ## 브라우저 창을 유지 (디버그용)
+    return options
+
+class BrowserPool:
+    """headless Chrome 드라이버 풀 (acquire/release, 헬스체크, N페이지 후 재생성, 종료 처리)"""
+    def __init__(self, size: int = POOL_SIZE, max_pages_per_driver: int = MAX_PAGES_PER_DRIVER, options_factory=defaultOptions,
+                 block_resources: bool = True):
+        self.size = size
+        self.block_resources = block_resources
+        self.max_pages_per_driver = max_pages_per_driver
+        self.options_factory = options_factory
+        # 드라이버 또는 None(드라이버를 새로 띄우지 못한 자리, 다음 acquire에서 다시 띄운다)
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self.page_counts: dict[webdriver.Chrome, int] = {}
+        self.closed = False
+
+    async def _launch(self) -> webdriver.Chrome:
+        options = self.options_factory()
+        if self.block_resources:
+            # 이미지/폰트/분석 스크립트 차단 (DOM 텍스트와 img src만 사용)
+            applyChromeOptions(options)
+        driver = await asyncio.to_thread(webdriver.Chrome, options=options)
+        if self.block_resources:
+            try:
+                await asyncio.to_thread(installCdpBlocking, driver)
+            except BaseException:
+                # 띄운 Chrome은 돌려주지 못하므로 여기서 종료
+                await self._quit(driver)
+                raise
+        self.page_counts[driver] = 0
+        return driver
+
+    async def _quit(self, driver: webdriver.Chrome):
+        self.page_counts.pop(driver, None)
+        try:
+            await asyncio.to_thread(driver.quit)
+        except Exception as e:
+            print(f"⚠️ 드라이버 종료 중 에러: {e}")
+
+    async def _healthy(self, driver: webdriver.Chrome) -> bool:
+        try:
+            return await asyncio.to_thread(driver.execute_script, "return 1") == 1
+        except Exception:
+            return False
+
+    async def start(self):
+        results = await asyncio.gather(*(self._launch() for _ in range(self.size)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # 하나라도 못 띄우면 이미 띄운 드라이버를 종료한 뒤 첫 에러를 그대로 올린다 (Chrome 프로세스 누수 방지)
+            for driver in results:
+                if not isinstance(driver, BaseException):
+                    await self._quit(driver)
+            raise errors[0]
+        for driver in results:
+            self.idle.put_nowait(driver)
+        print(f"🌐 브라우저 풀 시작: {self.size}개")
+        return self
+
+    async def acquire(self) -> webdriver.Chrome:
+        if self.closed:
+            raise RuntimeError("BrowserPool is shut down")
+        driver = await self.idle.get()
+        try:
+            if driver is not None and not await self._healthy(driver):
+                print("♻️ 응답 없는 드라이버 교체")
+                await self._quit(driver)
+                driver = None
+            if driver is None:
+                driver = await self._launch()
+        except BaseException:
+            # 새 드라이버를 띄우지 못해도 자리는 돌려놓아야 다른 acquire가 영원히 기다리지 않는다
+            self.idle.put_nowait(driver)
+            raise
+        return driver
+
+    async def release(self, driver: webdriver.Chrome, pages: int = 1):
+        if self.closed:
+            await self._quit(driver)
+            return
+        self.page_counts[driver] = self.page_counts.get(driver, 0) + pages
+        if self.page_counts[driver] >= self.max_pages_per_driver:
+            await self._quit(driver)
+            try:
+                driver = await self._launch()
+            except Exception as e:
+                print(f"⚠️ 드라이버 재생성 실패, 다음 사용 시 다시 시도: {e}")
+                driver = None
+        self.idle.put_nowait(driver)
+
+    @asynccontextmanager
+    async def driver(self, pages: int = 1):
+        driver = await self.acquire()
+        try:
+            yield driver
+        finally:
+            await self.release(driver, pages)
+
+    async def shutdown(self):
+        # 사용 중인 드라이버는 release 시점에 종료된다
+        self.closed = True
+        while not self.idle.empty():
+            driver = self.idle.get_nowait()
+            if driver is not None:
+                await self._quit(driver)
+        print("🌐 브라우저 풀 종료")
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.shutdown()
@@ -0,0 +1,377 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from dailyFiles import OUTPUT_DIR, listDailyFiles, loadDailyConcerts
+from models.schemas import ConcertMood, ConcertStyle, ConcertType, Genre
+
+# 일별 파일에서 언제든 다시 만들 수 있으므로 파싱 캐시와 같은 폴더에 둔다
+STORE_PATH = os.path.join(".cache", "concerts.sqlite")
+
+# concerts 테이블에 그대로 들어가는 스칼라 필드
+SCALAR_FIELDS = [
+    "concert_name", "concert_poster", "genre", "concert_mood", "concert_style", "concert_type",
+    "venue", "running_time", "age_limit", "booking_limit", "selling_platform", "ticket_status",
+]
+# facetCounts로 집계할 수 있는 필드
+FACET_FIELDS = {"genre", "venue", "concert_mood", "concert_style", "concert_type", "selling_platform"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS concerts (
+    id INTEGER PRIMARY KEY,
+    concert_key TEXT NOT NULL UNIQUE,
+    booking_link TEXT,
+    concert_name TEXT,
+    concert_poster TEXT,
+    genre TEXT,
+    concert_mood TEXT,
+    concert_style TEXT,
+    concert_type TEXT,
+    venue TEXT,
+    running_time INTEGER,
+    age_limit TEXT,
+    booking_limit TEXT,
+    selling_platform TEXT,
+    ticket_status INTEGER,
+    first_date TEXT,
+    last_date TEXT,
+    source_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS performance_rounds (
+    concert_id INTEGER NOT NULL REFERENCES concerts(id) ON DELETE CASCADE,
+    round INTEGER,
+    datetime TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prices (
+    concert_id INTEGER NOT NULL REFERENCES concerts(id) ON DELETE CASCADE,
+    seat TEXT NOT NULL,
+    price INTEGER
+);
+CREATE TABLE IF NOT EXISTS ticket_open_dates (
+    concert_id INTEGER NOT NULL REFERENCES concerts(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    open_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS castings (
+    concert_id INTEGER NOT NULL REFERENCES concerts(id) ON DELETE CASCADE,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_concerts_booking_link ON concerts(booking_link);
+CREATE INDEX IF NOT EXISTS idx_concerts_first_date ON concerts(first_date);
+CREATE INDEX IF NOT EXISTS idx_concerts_last_date ON concerts(last_date);
+CREATE INDEX IF NOT EXISTS idx_concerts_genre ON concerts(genre, first_date);
+CREATE INDEX IF NOT EXISTS idx_concerts_venue ON concerts(venue, first_date);
+CREATE INDEX IF NOT EXISTS idx_rounds_datetime ON performance_rounds(datetime, concert_id);
+CREATE INDEX IF NOT EXISTS idx_rounds_concert ON performance_rounds(concert_id);
+CREATE INDEX IF NOT EXISTS idx_prices_concert ON prices(concert_id);
+CREATE INDEX IF NOT EXISTS idx_open_dates_open_at ON ticket_open_dates(open_at, concert_id);
+CREATE INDEX IF NOT EXISTS idx_open_dates_concert ON ticket_open_dates(concert_id);
+CREATE INDEX IF NOT EXISTS idx_castings_concert ON castings(concert_id);
+CREATE INDEX IF NOT EXISTS idx_castings_name ON castings(name);
+"""
+
+# booking_link(없으면 공연명) 기준 upsert. 비어 있는 값은 기존 값을 지우지 않고, 더 오래된 날짜 파일의 레코드는 무시
+UPSERT_COLUMNS = ["concert_key", "booking_link", *SCALAR_FIELDS, "first_date", "last_date", "source_date"]
+UPSERT_SQL = f"""INSERT INTO concerts ({", ".join(UPSERT_COLUMNS)}) VALUES ({", ".join("?" * len(UPSERT_COLUMNS))})
+    ON CONFLICT(concert_key) DO UPDATE SET {", ".join(
+        f"{col} = excluded.{col}" if col == "source_date" else f"{col} = COALESCE(excluded.{col}, concerts.{col})"
+        for col in UPSERT_COLUMNS[1:]
+    )}
+    WHERE excluded.source_date >= concerts.source_date
+    RETURNING id"""
+
+def normalizeDatetime(value) -> str | None:
+    """'2025-04-12 18:00', '2025-04-12T18:00:00' 등 여러 포맷을 정렬 가능한 ISO 문자열로 통일"""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.strip()).isoformat(timespec="seconds")
+    except ValueError:
+        return None
+
+def concertKey(concert: dict) -> str | None:
+    # 예매링크가 없는 예전 레코드는 공연명으로 구분
+    if concert.get("booking_link"):
+        return concert["booking_link"]
+    if concert.get("concert_name"):
+        return "name:" + re.sub(r"\s+", " ", concert["concert_name"]).strip().lower()
+    return None
+
+def fileDate(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+def fileDigest(path: str) -> str:
+    # 변경 감지는 내용 해시로 (checkout할 때마다 바뀌는 mtime은 쓰지 않는다)
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class ConcertStore:
+    """공연 1건당 concerts 한 행 + 회차/가격/티켓오픈/출연진 자식 테이블로 저장하는 SQLite 저장소"""
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        # mtime으로 변경을 감지하던 예전 저장소는 가져온 파일 목록만 새로 만든다 (upsert라 다시 가져와도 결과는 같음)
+        if "mtime" in {row["name"] for row in self.conn.execute("PRAGMA table_info(imported_files)")}:
+            self.conn.execute("DROP TABLE imported_files")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def upsert(self, concert: dict, sourceDate: str) -> int | None:
+        """공연 하나를 저장하고 id 반환 (더 최근 파일에서 이미 저장된 공연이면 None)"""
+        key = concertKey(concert)
+        if key is None:
+            return None
+        rounds = [
+            (r.get("round"), normalizeDatetime(r.get("datetime")))
+            for r in concert.get("performance_rounds") or [] if isinstance(r, dict)
+        ]
+        rounds = [(no, at) for no, at in rounds if at]
+        days = sorted(at[:10] for _, at in rounds)
+        values = [concert.get(field) for field in SCALAR_FIELDS]
+        values[SCALAR_FIELDS.index("ticket_status")] = (
+            None if concert.get("ticket_status") is None else int(bool(concert["ticket_status"]))
+        )
+
+        row = self.conn.execute(
+            UPSERT_SQL,
+            [key, concert.get("booking_link"), *values,
+             days[0] if days else None, days[-1] if days else None, sourceDate],
+        ).fetchone()
+        if row is None:
+            return None
+        concertId = row[0]
+
+        # 자식 테이블은 새 레코드에 값이 있을 때만 통째로 교체
+        children = {
+            "performance_rounds": ("round, datetime", [(concertId, no, at) for no, at in rounds]),
+            "prices": ("seat, price", [
+                (concertId, seat, price) for seat, price in (concert.get("price") or {}).items()
+                if isinstance(price, int) or price is None
+            ]),
+            "ticket_open_dates": ("kind, open_at", [
+                (concertId, kind, at) for kind, value in (concert.get("ticket_open_dates") or {}).items()
+                if (at := normalizeDatetime(value))
+            ]),
+            "castings": ("name", [
+                (concertId, c["name"]) for c in concert.get("casting") or [] if isinstance(c, dict) and c.get("name")
+            ]),
+        }
+        for table, (cols, rows) in children.items():
+            if not rows:
+                continue
+            self.conn.execute(f"DELETE FROM {table} WHERE concert_id = ?", (concertId,))
+            self.conn.executemany(
+                f"INSERT INTO {table} (concert_id, {cols}) VALUES ({', '.join('?' * len(rows[0]))})", rows
+            )
+        return concertId
+
+    def upsertMany(self, concerts: list[dict], sourceDate: str) -> int:
+        with self.conn:
+            return sum(self.upsert(concert, sourceDate) is not None for concert in concerts if isinstance(concert, dict))
+
+    def importDailyFiles(self, outputDir: str = OUTPUT_DIR, force: bool = False) -> int:
+        """crawl_new_concerts의 일별 파일 중 새로 생기거나 내용이 바뀐 파일만 날짜순으로 가져온다
+        (파일명 + 크기 + sha256으로 비교. 크기가 다르면 해시는 계산하지 않는다)"""
+        imported = {row["path"]: (row["size"], row["sha256"]) for row in self.conn.execute("SELECT * FROM imported_files")}
+        count = 0
+        for path in listDailyFiles(outputDir):
+            size = os.path.getsize(path)
+            name = os.path.basename(path)
+            digest = None
+            if not force and name in imported and imported[name][0] == size:
+                digest = fileDigest(path)
+                if digest == imported[name][1]:
+                    continue
+            with self.conn:
+                count += sum(self.upsert(concert, fileDate(path)) is not None for concert in loadDailyConcerts(path))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO imported_files (path, size, sha256) VALUES (?, ?, ?)",
+                    (name, size, digest or fileDigest(path)),
+                )
+        if count:
+            # 쿼리 플래너가 인덱스를 고를 수 있도록 통계 갱신
+            self.conn.execute("ANALYZE")
+        return count
+
+    def _load(self, ids: list[int]) -> list[dict]:
+        """concerts id 목록 -> 일별 파일과 같은 모양의 공연 dict (id 순서 유지)"""
+        if not ids:
+            return []
+        # 결과가 많은 기간 조회에서도 테이블마다 쿼리 한 번으로 끝나도록 id를 임시 테이블에 넣고,
+        # 자식 테이블 전체를 훑지 않게 CROSS JOIN으로 wanted를 바깥 루프에 고정
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (id INTEGER PRIMARY KEY)")
+        self.conn.execute("DELETE FROM wanted")
+        self.conn.executemany("INSERT OR IGNORE INTO wanted (id) VALUES (?)", ((i,) for i in ids))
+        concerts = {}
+        columns = ", ".join(["id", "booking_link", *SCALAR_FIELDS])
+        for row in self.conn.execute(f"SELECT {columns} FROM wanted CROSS JOIN concerts USING (id)"):
+            concert = dict(zip(SCALAR_FIELDS, row[2:]))
+            if concert["ticket_status"] is not None:
+                concert["ticket_status"] = bool(concert["ticket_status"])
+            concert.update(booking_link=row[1], casting=[], performance_rounds=[], price={}, ticket_open_dates={})
+            concerts[row[0]] = concert
+        for concertId, name in self.conn.execute("SELECT concert_id, name FROM wanted CROSS JOIN castings ON concert_id = id"):
+            concerts[concertId]["casting"].append({"name": name})
+        for concertId, no, at in self.conn.execute(
+            "SELECT concert_id, round, datetime FROM wanted CROSS JOIN performance_rounds ON concert_id = id ORDER BY datetime"
+        ):
+            concerts[concertId]["performance_rounds"].append({"round": no, "datetime": at})
+        for concertId, seat, price in self.conn.execute("SELECT concert_id, seat, price FROM wanted CROSS JOIN prices ON concert_id = id"):
+            concerts[concertId]["price"][seat] = price
+        for concertId, kind, at in self.conn.execute("SELECT concert_id, kind, open_at FROM wanted CROSS JOIN ticket_open_dates ON concert_id = id"):
+            concerts[concertId]["ticket_open_dates"][kind] = at
+        return [concerts[i] for i in ids if i in concerts]
+
+    def get(self, bookingLink: str) -> dict | None:
+        row = self.conn.execute("SELECT id FROM concerts WHERE booking_link = ?", (bookingLink,)).fetchone()
+        return self._load([row[0]])[0] if row else None
+
+    def concertsBetween(self, start, end, venue: str | None = None, genre: str | None = None, limit: int | None = None) -> list[dict]:
+        """[start, end) 사이에 회차가 있는 공연 (첫 회차 날짜순). 날짜는 'YYYY-MM-DD' 문자열 또는 date/datetime"""
+        where, params = ["r.datetime >= ?", "r.datetime < ?"], [normalizeDatetime(start), normalizeDatetime(end)]
+        if venue is not None:
+            where.append("c.venue = ?")
+            params.append(venue)
+        if genre is not None:
+            where.append("c.genre = ?")
+            params.append(genre)
+        sql = f"""SELECT c.id FROM concerts c JOIN performance_rounds r ON r.concert_id = c.id
+                  WHERE {" AND ".join(where)} GROUP BY c.id ORDER BY MIN(r.datetime)"""
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._load([row[0] for row in self.conn.execute(sql, params)])
+
+    def ticketOpensBetween(self, start, end) -> list[tuple[str, str, dict]]:
+        """[start, end) 사이에 열리는 예매 -> (오픈 일시, 예매 유형, 공연) 오픈 일시순"""
+        rows = self.conn.execute(
+            "SELECT open_at, kind, concert_id FROM ticket_open_dates WHERE open_at >= ? AND open_at < ? ORDER BY open_at",
+            (normalizeDatetime(start), normalizeDatetime(end)),
+        ).fetchall()
+        concerts = dict(zip(
+            (ids := list(dict.fromkeys(row["concert_id"] for row in rows))),
+            self._load(ids),
+        ))
+        return [(row["open_at"], row["kind"], concerts[row["concert_id"]]) for row in rows]
+
+    def facetCounts(self, field: str, start=None, end=None) -> dict[str, int]:
+        """장르/공연장 등 필드값별 공연 수 (start/end를 주면 그 기간에 회차가 있는 공연만)"""
+        if field not in FACET_FIELDS:
+            raise ValueError(f"unknown facet: {field}")
+        if start is None and end is None:
+            sql, params = f"SELECT {field}, COUNT(*) FROM concerts WHERE {field} IS NOT NULL GROUP BY {field}", []
+        else:
+            # 기간 안의 회차(datetime 인덱스)에서 공연 id를 먼저 구해 concerts 전체를 훑지 않는다
+            sql = f"""SELECT {field}, COUNT(*) FROM concerts WHERE {field} IS NOT NULL AND id IN (
+                          SELECT concert_id FROM performance_rounds WHERE datetime >= ? AND datetime < ?
+                      ) GROUP BY {field}"""
+            params = [normalizeDatetime(start or "0000-01-01"), normalizeDatetime(end or "9999-12-31")]
+        return dict(sorted(self.conn.execute(sql, params).fetchall(), key=lambda row: -row[1]))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM concerts").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def syntheticConcerts(n: int, seed: int = 0) -> list[tuple[str, dict]]:
+    # 벤치마크용 (수집 날짜, 공연) 목록. 실제 파일과 비슷하게 공연당 회차 1~4개, 좌석 1~4등급
+    rng = random.Random(seed)
+    venues = [f"공연장 {i}" for i in range(300)]
+    day0 = datetime(2025, 1, 1)
+    concerts = []
+    for i in range(n):
+        collected = day0 + timedelta(days=i * 1000 // n)
+        first = collected + timedelta(days=rng.randint(7, 120), hours=rng.choice([14, 17, 19]))
+        concerts.append((collected.strftime("%Y-%m-%d"), {
+            "concert_name": f"공연 {i}",
+            "concert_poster": None,
+            "genre": rng.choice(list(Genre)).value,
+            "concert_mood": rng.choice(list(ConcertMood)).value,
+            "concert_style": rng.choice(list(ConcertStyle)).value,
+            "concert_type": rng.choice(list(ConcertType)).value,
+            "casting": [{"name": f"출연자 {rng.randrange(n)}"} for _ in range(rng.randint(1, 3))],
+            "performance_rounds": [
+                {"round": no + 1, "datetime": (first + timedelta(days=no)).isoformat()} for no in range(rng.randint(1, 4))
+            ],
+            "venue": rng.choice(venues),
+            "running_time": rng.choice([None, 90, 120]),
+            "price": {seat: rng.randrange(50, 200) * 1000 for seat in ["VIP", "R", "S", "A"][:rng.randint(1, 4)]},
+            "age_limit": None,
+            "booking_limit": None,
+            "selling_platform": "INTERPARK",
+            "ticket_status": rng.random() < 0.5,
+            "ticket_open_dates": {"일반 예매": (collected + timedelta(days=rng.randint(1, 14), hours=20)).isoformat()},
+            "booking_link": f"https://tickets.interpark.com/contents/notice/detail/{i}",
+        }))
+    return concerts
+
+def benchmark(n: int = 100_000, repeat: int = 50):
+    # 합성 공연 n개로 전체 일별 파일 스캔과 저장소 쿼리 시간 비교
+    concerts = syntheticConcerts(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ConcertStore(os.path.join(tmp, "concerts.sqlite"))
+        start = time.perf_counter()
+        byDay = {}
+        for day, concert in concerts:
+            byDay.setdefault(day, []).append(concert)
+        for day in sorted(byDay):
+            store.upsertMany(byDay[day], day)
+        store.conn.execute("ANALYZE")
+        print(f"📥 공연 {len(store)}개 저장: {time.perf_counter() - start:.1f}s, {os.path.getsize(store.path) / 2**20:.1f}MB")
+
+        month, nextMonth = "2026-03-01", "2026-04-01"
+        venue = concerts[n // 2][1]["venue"]
+        queries = {
+            "월간 공연": lambda: store.concertsBetween(month, nextMonth),
+            "공연장+월간": lambda: store.concertsBetween(month, nextMonth, venue=venue),
+            "장르+월간": lambda: store.concertsBetween(month, nextMonth, genre=Genre.JAZZ.value),
+            "주간 티켓오픈": lambda: store.ticketOpensBetween("2026-03-02", "2026-03-09"),
+            "월간 장르 집계": lambda: store.facetCounts("genre", month, nextMonth),
+            "예매링크 조회": lambda: store.get(concerts[n // 3][1]["booking_link"]),
+        }
+        for name, query in queries.items():
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = query()
+                times.append(time.perf_counter() - started)
+            size = 1 if name == "예매링크 조회" else len(result)
+            print(f"  {name:>10}: {sorted(times)[len(times) // 2] * 1000:7.2f}ms (결과 {size}건)")
+
+        # 비교: 같은 질문(공연장+월간)을 일별 파일 전체를 파싱해서 답하는 경우 (디스크 읽기 제외)
+        files = {day: json.dumps(items, ensure_ascii=False) for day, items in byDay.items()}
+        started = time.perf_counter()
+        [c for text in files.values() for c in json.loads(text) if c["venue"] == venue
+         and any(month <= r["datetime"] < nextMonth for r in c["performance_rounds"])]
+        print(f"  {'일별 파일 스캔':>10}: {(time.perf_counter() - started) * 1000:7.2f}ms")
+        store.close()
+
+# 사용 예시: python concertStore.py [import|bench]
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark()
+    else:
+        store = ConcertStore()
+        print(f"📥 일별 파일에서 {store.importDailyFiles()}건 반영, 저장된 공연 {len(store)}개")
+        store.close()
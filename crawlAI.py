@@ -6,29 +6,95 @@ from datetime import datetime
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
-from parseDetail import parseDetail
-from makeJson import makeJson, ConcertParser
+from parseDetail import parseDetailAsync, parseDetailWithBrowsers, extractUrl
+from makeJson import makeJson, ConcertParser, BATCH_SIZE
+from parseCache import ParseCache
+from seenIndex import SeenIndex
+from dedupe import dropDuplicates, expandDuplicates, mergeConcerts
+from browserPool import BrowserPool
+from pipeline import Pipeline
+from metrics import METRICS
+from concertStore import ConcertStore
+from uploader import API_URL, uploadConcerts
 
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-API_URL = "https://dev.bolmal.shop/save"
+# 저장 API(API_URL)로 결과를 업로드할지 여부 (서버가 gzip NDJSON을 받도록 준비된 뒤 1로 설정)
+UPLOAD_RESULTS = os.getenv('UPLOAD_RESULTS') == '1'
+
+# 상세 페이지를 브라우저로 렌더링할지 여부 (기본은 HTTP 요청), 브라우저 풀 크기
+# (HTTP 요청이면 목록 스크롤에 드라이버 하나만 쓰므로 기본 1개)
+RENDER_DETAIL_WITH_BROWSER = os.getenv('RENDER_DETAIL_WITH_BROWSER') == '1'
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '3' if RENDER_DETAIL_WITH_BROWSER else '1'))
+# 단계별 큐로 연결한 스트리밍 파이프라인 사용 여부 (0이면 단계를 순서대로 실행하는 crawlConcert)
+STREAMING_PIPELINE = os.getenv('STREAMING_PIPELINE', '1') == '1'
+
+# 공연 목록 타일 / 타일 내부 정보 셀렉터
+TICKET_ITEM_SELECTOR = "a.TicketItem_ticketItem__"
+NOTICE_INFO_SELECTOR = "ul.NoticeItem_contentsWrap__y1tdg li"
+
+# 목록 DOM에서 라벨, 상세 링크, 공연 정보를 한 번에 읽어오는 스크립트 (페이지 이동 없음)
+# 목록 위치가 아니라 라벨로 새 타일을 고른다: 타일이 재활용(가상 스크롤)되거나 맨 위에 공지가 끼어들어도
+# 아직 읽지 않은 라벨만 돌려준다. 읽은 라벨은 페이지의 window.__harvestedLabels에 기록하고,
+# 뒤로가기 등으로 페이지가 새로 로드되면 비워지므로 파이썬 쪽 seenLabels로 한 번 더 거른다
+HARVEST_SCRIPT = """
+const harvested = window.__harvestedLabels = window.__harvestedLabels || new Set();
+return Array.from(document.querySelectorAll(arguments[0]))
+    .filter(a => !harvested.has(a.getAttribute('gtm-label')))
+    .map(a => {
+        const label = a.getAttribute('gtm-label');
+        harvested.add(label);
+        return {
+            label: label,
+            href: a.href || a.getAttribute('href'),
+            info: Array.from(a.querySelectorAll(arguments[1])).map(li => li.textContent.trim())
+        };
+    });
+"""
+# 아직 읽지 않은 라벨의 타일이 DOM에 있는지 (스크롤 후 새 타일이 붙었는지)
+UNSEEN_SCRIPT = """
+const harvested = window.__harvestedLabels || new Set();
+return Array.from(document.querySelectorAll(arguments[0])).some(a => !harvested.has(a.getAttribute('gtm-label')));
+"""
+SCROLL_SCRIPT = "window.scrollTo(0, document.body.scrollHeight);"
+
+GROWTH_TIMEOUT = 3.0     # 스크롤 후 새 타일이 붙기를 기다리는 최대 시간(초)
+GROWTH_POLL = 0.1
+MAX_SCROLL_END_RETRY = 2 # 새 타일이 나오지 않은 채로 다시 스크롤해 볼 횟수
+KNOWN_STREAK_STOP = 20   # 이미 아는 공연이 연속으로 이만큼 나오면 이후는 이전 실행에서 처리된 것
+
+def makeConcertText(label: str, infoStr: str, link: str) -> str:
+    return f"""
+                    공연명: {label}
+                    공연 정보: {infoStr}
+                    예매링크: {link}
+                    """
+
+def openDetailByClick(driver: webdriver.Chrome, label: str) -> str:
+    """타일을 클릭해 상세 링크를 얻고 목록으로 돌아온다 (href가 없는 타일용)"""
+    # 매번 fresh하게 클릭할 요소 다시 찾기
+    clickable = driver.find_element(By.CSS_SELECTOR, f"a[gtm-label='{label}']")
+    clickable.click()
 
-# 셀레니움 드라이버 설정
-options = Options()
-options.add_argument("--headless")          # 브라우저 창을 띄우지 않음
-options.add_argument("--no-sandbox")        # 서버/루트 환경에서 실행 시 필수
-options.add_argument("--disable-dev-shm-usage")  # 리소스 부족 에러 방지
-options.add_argument("--disable-gpu")           # GPU 가속 비활성화
-# options.add_experimental_option("detach", True) ## 브라우저 창을 유지 (디버그용)
-driver = webdriver.Chrome(options=options)
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "article.DetailSummary_infoBox__5we4P"))
+    )
+    currentUrl = driver.current_url
 
-async def crawlConcerts() -> list[str]:
-    crawledConcerts = []
-    errerCrawledConcerts = 0
+    driver.back()
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, TICKET_ITEM_SELECTOR))
+    )
+    return currentUrl
+
+def iterConcerts(driver: webdriver.Chrome, directLinks: bool = True, seenIndex: SeenIndex | None = None, stats: dict | None = None):
+    """목록을 스크롤하면서 새로 발견한 공연 텍스트를 하나씩 내보낸다 (에러 수는 stats['errors'])"""
+    stats = stats if stats is not None else {}
+    stats.setdefault("errors", 0)
 
     # 메인 페이지(장르 : 콘서트) 크롤링
     url = "https://tickets.interpark.com/contents/notice?Genre=CONCERT"
@@ -37,102 +103,144 @@ async def crawlConcerts() -> list[str]:
     # 암시적 대기
     driver.implicitly_wait(5)
 
-    SCROLL_AMOUNT = 700
-    SCROLL_WAIT = 1.5
-    MAX_SCROLL_END_RETRY = 3
-
-    seenLabels = set()
-    crawledConcerts = []
+    seenLabels = set()       # 이번 실행에서 이미 읽은 라벨 (새 타일 판단 기준)
 
     scrollEndCounter = 0
-    prevSeenCount = 0
+    knownStreak = 0
+    skippedKnown = 0
+    waitSeconds = 0.0
+    workSeconds = 0.0
 
     while True:
-        items = driver.find_elements(By.CSS_SELECTOR, "a.TicketItem_ticketItem__")
-        print(f"현재 화면 공연 수: {len(items)}")
-
-        newLabels = []
-        for item in items:
-            try:
-                label = item.get_attribute("gtm-label")
-                if label and label not in seenLabels:
-                    newLabels.append(label)
-                    seenLabels.add(label)
-            except:
+        workStart = time.perf_counter()
+        tiles = driver.execute_script(HARVEST_SCRIPT, TICKET_ITEM_SELECTOR, NOTICE_INFO_SELECTOR)
+        print(f"새로 읽은 공연 수: {len(tiles)} (이전까지 {len(seenLabels)}개)")
+
+        for tile in tiles:
+            label = tile.get("label")
+            if not label or label in seenLabels:
                 continue
+            seenLabels.add(label)
 
-        for label in newLabels:
-            try:                
-                # 텍스트 정보
-                try:
-                    texts = item.find_elements(By.CSS_SELECTOR, "ul.NoticeItem_contentsWrap__y1tdg li")
-                    infoList = [t.text.strip() for t in texts]
-                    infoStr = ", ".join(infoList)
-                    print(f"공연정보: {infoStr}")
-                except:
-                    pass
-
-                # 상세 링크
-                # 매번 fresh하게 클릭할 요소 다시 찾기
-                clickable = driver.find_element(By.CSS_SELECTOR, f"a[gtm-label='{label}']")
-                clickable.click()
-
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "article.DetailSummary_infoBox__5we4P"))
-                )
-
-                currentUrl = driver.current_url
-                print(f"🎟️ [{label}] 상세 링크:", currentUrl)
-
-                concertText = f"""
-                    공연명: {label}
-                    공연 정보: {infoStr}
-                    예매링크: {currentUrl}
-                    """
-                crawledConcerts.append(concertText)
-                print(concertText)
-
-                driver.back()
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "a.TicketItem_ticketItem__"))
-                )
-            except Exception as e:
-                print(f"⚠️ a[gtm-label='{label}'] -- 처리 중 에러:", e)
+            # 이전 실행에서 처리한 공연은 상세/LLM 단계까지 건너뜀
+            if seenIndex is not None and seenIndex.isKnown(label, tile.get("href")):
+                knownStreak += 1
+                skippedKnown += 1
                 continue
+            knownStreak = 0
 
-        # 스크롤 종료 감지
-        if len(seenLabels) == prevSeenCount:
+            infoStr = ", ".join(tile.get("info") or [])
+            print(f"공연정보: {infoStr}")
+
+            # 목록 DOM의 href를 그대로 사용하고, 없을 때만 클릭해서 상세 링크 확보
+            link = tile.get("href") if directLinks else None
+            if not link or not link.startswith("http"):
+                try:
+                    # 뒤로가기로 목록이 다시 로드되면 다음 패스는 전체 타일을 읽고 seenLabels로 거른다
+                    link = openDetailByClick(driver, label)
+                except Exception as e:
+                    print(f"⚠️ a[gtm-label='{label}'] -- 처리 중 에러:", e)
+                    stats["errors"] += 1
+                    continue
+            print(f"🎟️ [{label}] 상세 링크:", link)
+            if seenIndex is not None:
+                seenIndex.markPending(label, link)
+
+            concertText = makeConcertText(label, infoStr, link)
+            print(concertText)
+            # 소비하는 쪽이 처리하는 동안은 목록 작업 시간에서 제외
+            pausedAt = time.perf_counter()
+            yield concertText
+            workStart += time.perf_counter() - pausedAt
+
+        if seenIndex is not None and knownStreak >= KNOWN_STREAK_STOP:
+            print(f"✅ 이미 수집한 공연 구간 도달 (건너뛴 공연 {skippedKnown}개). 종료.")
+            workSeconds += time.perf_counter() - workStart
+            break
+
+        driver.execute_script(SCROLL_SCRIPT)
+        workSeconds += time.perf_counter() - workStart
+
+        # 고정 sleep 대신 읽지 않은 라벨의 타일이 나타나는 순간까지만 대기
+        waitStart = time.perf_counter()
+        try:
+            WebDriverWait(driver, GROWTH_TIMEOUT, poll_frequency=GROWTH_POLL).until(
+                lambda d: d.execute_script(UNSEEN_SCRIPT, TICKET_ITEM_SELECTOR)
+            )
+            scrollEndCounter = 0
+        except TimeoutException:
             scrollEndCounter += 1
             if scrollEndCounter >= MAX_SCROLL_END_RETRY:
+                waitSeconds += time.perf_counter() - waitStart
                 print("✅ 더 이상 새로운 항목 없음. 종료.")
                 break
-        else:
-            scrollEndCounter = 0
-            prevSeenCount = len(seenLabels)
-
-        driver.execute_script(f"window.scrollBy(0, {SCROLL_AMOUNT});")
-        time.sleep(SCROLL_WAIT)
-
-
-    return crawledConcerts, errerCrawledConcerts
-
-async def crawlConcert() -> list[str]:
-    # 오픈예정 공연 크롤링
-    crawrledData, numOfError = await crawlConcerts()
+        waitSeconds += time.perf_counter() - waitStart
+
+    print(f"⏱️ 목록 수집: 대기 {waitSeconds:.1f}s / 작업 {workSeconds:.1f}s (공연 {len(seenLabels)}개)")
+    stats.update(waitSeconds=round(waitSeconds, 3), workSeconds=round(workSeconds, 3), tiles=len(seenLabels), skippedKnown=skippedKnown)
+
+async def crawlConcerts(driver: webdriver.Chrome, directLinks: bool = True, seenIndex: SeenIndex | None = None) -> list[str]:
+    stats = {"errors": 0}
+    with METRICS.timer("discover"):
+        crawledConcerts = list(iterConcerts(driver, directLinks, seenIndex, stats))
+    METRICS.gauge("discover", stats)
+    return crawledConcerts, stats["errors"]
+
+async def crawlConcert(pool: BrowserPool, seenIndex: SeenIndex | None = None) -> list[str]:
+    # 오픈예정 공연 크롤링 (목록은 드라이버 하나로 스크롤)
+    async with pool.driver() as driver:
+        crawrledData, numOfError = await crawlConcerts(driver, seenIndex=seenIndex)
     print("에러수 :",numOfError)
 
     # 공연 상세 크롤링
-    finalOutput = parseDetail(crawrledData)
+    with METRICS.timer("detail"):
+        if RENDER_DETAIL_WITH_BROWSER:
+            detailTexts = await parseDetailWithBrowsers(crawrledData, pool)
+        else:
+            detailTexts = await parseDetailAsync(crawrledData)
+
+    # 본문이 같은 공지는 한 번만 LLM에 보냄 (몇 줄만 다른 공지는 파싱 후 mergeConcerts에서 합침)
+    finalOutput, duplicateOf = dropDuplicates(detailTexts)
 
     # json 형식으로 저장
     # result = makeJson(finalOutput,api_key=OPENAI_API_KEY)
-    result = ConcertParser.make_json_with_langchain(finalOutput,OPENAI_API_KEY)
-    return result
+    # 변경 없는 공지는 캐시에서 바로 가져와 모델 호출을 생략
+    cache = ParseCache()
+    try:
+        with METRICS.timer("llm"):
+            parsed, failures = await ConcertParser.astructure_concerts(finalOutput,OPENAI_API_KEY,cache=cache,pre_extract=True,batch_size=BATCH_SIZE)
+        print(f"💾 파싱 캐시: {cache.stats()}")
+        METRICS.gauge("cache", cache.stats())
+    finally:
+        cache.close()
+
+    for idx, error in sorted(failures.items()):
+        print(f"❌ [{idx}] Error parsing concert with LangChain: {error}")
+
+    result = []
+    # 중복으로 빠진 공지는 원본의 파싱 결과를 레코드로 쓰고, 레코드가 있는 공지만 본 공연으로 기록
+    for text, concert in zip(detailTexts, expandDuplicates(detailTexts, duplicateOf, parsed)):
+        if concert is None:
+            continue
+        result.append(concert)
+        if seenIndex is not None and extractUrl(text):
+            seenIndex.markSucceeded(extractUrl(text))
+
+    return mergeConcerts(result)
 
 # 실행 코드
 async def main():
+    # 이전 결과 기반 증분 크롤링
+    seenIndex = SeenIndex()
+    print(f"📚 이미 수집한 공연 수: {len(seenIndex)}")
+
     # 크롤링 코드 실행
-    results = await crawlConcert()
+    async with BrowserPool(size=BROWSER_POOL_SIZE) as pool:
+        if STREAMING_PIPELINE:
+            pipeline = Pipeline(pool, seenIndex, OPENAI_API_KEY, renderWithBrowser=RENDER_DETAIL_WITH_BROWSER)
+            results = await pipeline.run(iterConcerts)
+        else:
+            results = await crawlConcert(pool, seenIndex)
 
     # 결과 제출
     current_dir = os.getcwd()
@@ -147,17 +255,25 @@ async def main():
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
 
-    # HTTP 헤더 설정 (JSON 형식)
-    headers = {"Content-Type": "application/json"}
-
-    # # JSON 파일 열기 및 데이터 로드
-    # with open(f'crawl_new_concerts/{file_path}', 'r', encoding='utf-8') as f:
-    #     data_list = json.load(f)  # 이제 data_list는 Python 리스트입니다
-
-    # response = requests.post(API_URL, headers=headers, json=data_list)  # `json=data` 사용
-
-    # 응답 확인
-    # print("응답 코드:", response.status_code)
+    # 결과가 저장된 뒤에만 본 공연으로 기록
+    seenIndex.commit()
+
+    # 조회용 공연 저장소에 새로 생기거나 바뀐 일별 파일 반영 (저장소가 없으면 전체 파일로 새로 만든다)
+    store = ConcertStore()
+    print(f"🗄️ 공연 저장소 {store.importDailyFiles(target_dir)}건 반영, 전체 {len(store)}개")
+    store.close()
+
+    # 결과 업로드 (청크별 gzip NDJSON, 실패한 공연만 골라 보고)
+    if UPLOAD_RESULTS and results:
+        stats, failures = await uploadConcerts(results, API_URL)
+        print(f"📤 업로드: {stats['sent']}건 성공, {stats['failed']}건 실패, 요청 {stats['requests']}번, "
+              f"{stats['raw_bytes']:,}B -> {stats['gzip_bytes']:,}B")
+        for concert, error in failures:
+            print(f"   ❌ {concert.get('concert_name')}: {error}")
+
+    # 단계별 시간/바이트/토큰 기록 (실행 간 비교용)
+    METRICS.gauge("concerts_saved", len(results))
+    print(f"📈 실행 지표 저장: {METRICS.write(target_dir, current_date)}")
 
 if __name__ == "__main__":
     asyncio.run(main())
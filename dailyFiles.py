@@ -0,0 +1,41 @@
+import glob
+import json
+import os
+import re
+
+# 일별 크롤링 결과 폴더 (crawlAI.main이 YYYY-MM-DD.json으로 저장)
+OUTPUT_DIR = "crawl_new_concerts"
+DAILY_FILE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9].json"
+
+def listDailyFiles(outputDir: str = OUTPUT_DIR) -> list[str]:
+    # 날짜 파일만 골라 날짜순으로 정렬 (다른 부가 파일은 제외)
+    return sorted(glob.glob(os.path.join(outputDir, DAILY_FILE_GLOB)))
+
+def loadDailyFile(path: str) -> list:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ {path} 읽기 실패:", e)
+        return []
+    # 크롤링 실패한 날은 false 등 리스트가 아닌 값이 저장되어 있다
+    return data if isinstance(data, list) else []
+
+def textField(text: str, name: str) -> str | None:
+    # 예전 포맷(문자열 레코드)의 "공연명: ..." 같은 줄에서 값 추출
+    match = re.search(rf"{name}:\s*(.*)", text)
+    value = match.group(1).strip() if match else ""
+    return value or None
+
+def loadDailyConcerts(path: str) -> list[dict]:
+    """일별 파일을 읽어 dict 레코드만 반환 (문자열 레코드는 공연명/예매링크만 복원)"""
+    concerts = []
+    for record in loadDailyFile(path):
+        if isinstance(record, dict):
+            concerts.append(record)
+        elif isinstance(record, str):
+            concerts.append({
+                "concert_name": textField(record, "공연명"),
+                "booking_link": textField(record, "예매링크"),
+            })
+    return concerts
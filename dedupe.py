@@ -0,0 +1,99 @@
+import re
+
+from models.schemas import Concert
+
+# 공지마다 달라지는 줄(상세 URL, 포스터 링크)은 비교에서 제외
+IGNORED_LINE = re.compile(r"^(공연 URL|이미지 링크):")
+
+def normalizeName(name: str | None) -> str:
+    # 대소문자, 공백, 괄호 차이는 같은 이름으로 취급
+    return re.sub(r"[\s\[\]()]+", "", name or "").lower()
+
+def detailBody(text: str) -> str:
+    lines = [line for line in text.splitlines() if not IGNORED_LINE.match(line.strip())]
+    return re.sub(r"\s+", " ", " ".join(lines)).strip()
+
+class DuplicateFilter:
+    """텍스트를 하나씩 넣으면 앞서 넣은 텍스트 중 본문이 완전히 같은 것의 순번을 돌려준다 (스트리밍 파이프라인용).
+    같은 투어의 다른 도시/날짜 공지처럼 몇 줄만 다른 공지는 다른 공연이므로 거르지 않고 파싱 후 mergeConcerts에 맡긴다"""
+    def __init__(self):
+        self.exact: dict[str, int] = {}
+        self.count = 0
+
+    def check(self, text: str) -> int | None:
+        idx = self.count
+        self.count += 1
+        body = detailBody(text)
+        # 에러/빈 상세 페이지끼리는 중복으로 보지 않는다
+        if not body or text.startswith("[") or "[상세정보 없음]" in body:
+            return None
+        if body in self.exact:
+            return self.exact[body]
+        self.exact[body] = idx
+        return None
+
+def findDuplicates(texts: list[str]) -> dict[int, int]:
+    """parseDetail 텍스트 중 앞선 텍스트와 본문이 같은 것을 찾아 {중복 인덱스: 원본 인덱스}로 반환"""
+    duplicates = DuplicateFilter()
+    duplicateOf = {}
+    for idx, text in enumerate(texts):
+        original = duplicates.check(text)
+        if original is not None:
+            duplicateOf[idx] = original
+    return duplicateOf
+
+def dropDuplicates(texts: list[str]) -> tuple[list[str], dict[int, int]]:
+    duplicateOf = findDuplicates(texts)
+    unique = [text for idx, text in enumerate(texts) if idx not in duplicateOf]
+    print(f"🧹 상세 텍스트 중복 {len(duplicateOf)}건 제거 (LLM 호출 {len(duplicateOf)}회 절약)")
+    return unique, duplicateOf
+
+def expandDuplicates(texts: list[str], duplicateOf: dict[int, int], parsed: list[dict | None]) -> list[dict | None]:
+    """dropDuplicates 결과(unique 순서)의 파싱 결과를 texts 순서로 펼친다. 뺀 공지는 본문이 같은 원본의 결과를 쓴다"""
+    uniqueIndex = {idx: n for n, idx in enumerate(idx for idx in range(len(texts)) if idx not in duplicateOf)}
+    return [parsed[uniqueIndex[duplicateOf.get(idx, idx)]] for idx in range(len(texts))]
+
+def mergeKey(concert: Concert) -> tuple:
+    return (concert.booking_link, normalizeName(concert.concert_name), normalizeName(concert.venue))
+
+def mergeInto(base: Concert, other: Concert):
+    # 회차는 일시 기준 합집합 후 시간순으로 회차 번호를 다시 매긴다
+    rounds = {r.datetime: r for r in base.performance_rounds}
+    for r in other.performance_rounds:
+        rounds.setdefault(r.datetime, r)
+    base.performance_rounds = [
+        r.model_copy(update={"round": i}) for i, r in enumerate(sorted(rounds.values(), key=lambda r: r.datetime), start=1)
+    ]
+
+    base.ticket_open_dates = {**(other.ticket_open_dates or {}), **(base.ticket_open_dates or {})}
+    base.price = {**(other.price or {}), **(base.price or {})}
+
+    names = {c.name for c in base.casting}
+    base.casting += [c for c in other.casting if c.name not in names]
+
+    # 비어 있는 선택 필드는 다른 레코드 값으로 채움
+    for field in ("concert_poster", "running_time", "age_limit", "booking_limit"):
+        if getattr(base, field) is None:
+            setattr(base, field, getattr(other, field))
+
+def mergeConcerts(concerts: list[dict]) -> list[dict]:
+    """Concert 스키마로 검증한 뒤 (booking_link, 공연명, 공연장)이 같은 레코드를 하나로 병합"""
+    merged: dict[tuple, Concert] = {}
+    invalid = 0
+    for raw in concerts:
+        try:
+            concert = Concert.model_validate(raw)
+        except Exception as e:
+            print(f"⚠️ Concert 검증 실패: {e}")
+            invalid += 1
+            continue
+
+        key = mergeKey(concert)
+        if key in merged:
+            mergeInto(merged[key], concert)
+        else:
+            merged[key] = concert
+
+    saved = len(concerts) - invalid - len(merged)
+    print(f"🧹 공연 레코드 {saved}건 병합 (저장/업로드 {saved}건 절약, 검증 실패 {invalid}건)")
+    return [concert.model_dump(mode='json') for concert in merged.values()]
@@ -0,0 +1,273 @@
+import glob
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+
+try:
+    from lxml import html as lxmlHtml
+except ImportError:
+    lxmlHtml = None
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# 상세 페이지에서 필요한 부분
+DETAIL_INFO_CLASS = "DetailInfo_infoWrap__1BtFi"
+DETAIL_IMAGE_CLASS = "DetailSummary_imageContainer__OmWus"
+# 리뷰 목록 테이블
+REVIEW_TABLE_ATTRS = {"width": "100%", "border": "0"}
+GOODS_CODE_PATTERN = re.compile(r"GoodsCode=(\d+)", re.IGNORECASE)
+# BeautifulSoup의 get_text()처럼 스크립트/스타일 내용은 텍스트에서 제외
+NON_TEXT_TAGS = ["script", "style", "template"]
+TEXT_XPATH = ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+
+# 빠른 순서대로 설치된 백엔드. 'bs4'는 기존 방식(전체 트리) 비교용
+BACKENDS = [name for name, available in (
+    ("selectolax", LexborHTMLParser is not None),
+    ("lxml", lxmlHtml is not None),
+    ("strainer", True),
+) if available]
+# 기본 백엔드는 설치 여부에 따라 바뀌지 않도록 requirements.txt에 고정한 lxml로 정한다
+# (selectolax는 HTML_PARSE_BACKEND=selectolax로 직접 골라야 쓴다)
+PINNED_BACKEND = "lxml"
+DEFAULT_BACKEND = os.getenv("HTML_PARSE_BACKEND", PINNED_BACKEND)
+if DEFAULT_BACKEND not in BACKENDS + ["bs4"]:
+    raise ImportError(f"HTML_PARSE_BACKEND={DEFAULT_BACKEND} is not installed (pip install -r requirements.txt)")
+
+# 하위 폴더 detail/, review_list/, review_detail/에 저장한 HTML (백엔드 간 결과 비교 테스트에도 사용)
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+
+def toText(html: bytes | str) -> str:
+    # 응답 바이트는 BeautifulSoup과 같은 방식(meta charset 등)으로 디코딩
+    if not html:
+        return ""
+    if isinstance(html, bytes):
+        return UnicodeDammit(html, is_html=True).unicode_markup or ""
+    return html
+
+def joinText(strings) -> str:
+    # get_text(strip=True)와 같은 결과: 각 문자열을 strip해서 빈 문자열 없이 이어붙임
+    return "".join(s.strip() for s in strings if s.strip())
+
+def _lxmlRoot(html):
+    text = toText(html)
+    return lxmlHtml.fromstring(text) if text.strip() else None
+
+def _lxmlFirstByClass(root, className):
+    found = root.find_class(className)
+    return found[0] if found else None
+
+def _lxmlAttrs(node):
+    return [str(value) for value in node.attrib.values()]
+
+def _lxmlText(node):
+    return joinText(node.xpath(TEXT_XPATH))
+
+def _selectolaxRoot(html):
+    text = toText(html)
+    if not text.strip():
+        return None
+    return LexborHTMLParser(text)
+
+def _selectolaxAttrs(node):
+    return [value for value in node.attributes.values() if value is not None]
+
+def _selectolaxText(node):
+    return joinText(
+        child.text_content or "" for child in node.traverse(include_text=True)
+        if child.tag == "-text" and child.parent.tag not in NON_TEXT_TAGS
+    )
+
+def _soup(html, parseOnly=None):
+    return BeautifulSoup(html, "html.parser", parse_only=parseOnly)
+
+def _soupAttrs(tag):
+    return [" ".join(value) if isinstance(value, list) else str(value) for value in tag.attrs.values()]
+
+def _hasDetailClass(value):
+    # 파싱 중에는 class 속성이 나뉘기 전 문자열이라 토큰 단위로 직접 비교
+    return bool(value) and not {DETAIL_INFO_CLASS, DETAIL_IMAGE_CLASS}.isdisjoint(value.split())
+
+def findGoodsCode(attributeValues) -> str | None:
+    for value in attributeValues:
+        match = GOODS_CODE_PATTERN.search(value)
+        if match:
+            return match.group(1)
+    return None
+
+def parseDetailFields(html: bytes | str, backend: str = DEFAULT_BACKEND) -> tuple[str | None, str | None]:
+    """상세 페이지 -> (상세 설명 텍스트, 포스터 이미지 src). 없으면 None"""
+    info_text = img_src = None
+    if backend == "selectolax":
+        tree = _selectolaxRoot(html)
+        info = tree.css_first(f".{DETAIL_INFO_CLASS}") if tree else None
+        image = tree.css_first(f".{DETAIL_IMAGE_CLASS}") if tree else None
+        img = image.css_first("img") if image else None
+        info_text = _selectolaxText(info) if info else None
+        img_src = img.attributes.get("src") if img else None
+    elif backend == "lxml":
+        root = _lxmlRoot(html)
+        info = _lxmlFirstByClass(root, DETAIL_INFO_CLASS) if root is not None else None
+        image = _lxmlFirstByClass(root, DETAIL_IMAGE_CLASS) if root is not None else None
+        img = image.find(".//img") if image is not None else None
+        info_text = _lxmlText(info) if info is not None else None
+        img_src = img.get("src") if img is not None else None
+    else:
+        # 'strainer'는 두 영역만 트리로 만들고, 'bs4'는 전체 트리를 만든다
+        strainer = SoupStrainer(class_=_hasDetailClass) if backend == "strainer" else None
+        soup = _soup(html, strainer)
+        info = soup.find(class_=DETAIL_INFO_CLASS)
+        image = soup.find(class_=DETAIL_IMAGE_CLASS)
+        img = image.find("img") if image else None
+        info_text = info.get_text(strip=True) if info else None
+        img_src = img["src"] if img and img.has_attr("src") else None
+    return info_text, img_src
+
+def parseReviewRows(html: bytes | str, backend: str = DEFAULT_BACKEND) -> list[dict]:
+    """리뷰 목록 페이지의 각 행 -> {'hrefs', 'star_count', 'texts', 'goods_code'}
+
+    hrefs: 행의 모든 <a> href, star_count: 첫 td.textsmall의 별점 이미지 수(없으면 None),
+    texts: td.texts 다음 td.textsmall 순서의 텍스트, goods_code: 행 안 속성에서 찾은 GoodsCode
+    selectolax는 HTML5 규칙대로 tbody를 보충하므로(브라우저가 만든 crawl4ai HTML과 같음)
+    tbody 없이 쓴 원본 HTML에서는 다른 백엔드보다 행이 더 잡힐 수 있다"""
+    rows = []
+    if backend == "selectolax":
+        tree = _selectolaxRoot(html)
+        tables = tree.css("table") if tree else []
+        for table in tables:
+            if any(table.attributes.get(k) != v for k, v in REVIEW_TABLE_ATTRS.items()):
+                continue
+            for tr in table.css("tbody > tr"):
+                smalls = tr.css("td.textsmall")
+                rows.append({
+                    "hrefs": [a.attributes.get("href") or "" for a in tr.css("a")],
+                    "star_count": len(smalls[0].css('img[alt="별점"]')) if smalls else None,
+                    "texts": [_selectolaxText(td) for td in tr.css("td.texts") + smalls],
+                    "goods_code": findGoodsCode(v for node in tr.traverse() for v in _selectolaxAttrs(node)),
+                })
+    elif backend == "lxml":
+        root = _lxmlRoot(html)
+        condition = " and ".join(f"@{k}='{v}'" for k, v in REVIEW_TABLE_ATTRS.items())
+        tables = root.xpath(f"//table[{condition}]") if root is not None else []
+        for table in tables:
+            for tr in table.xpath(".//tbody/tr"):
+                smalls = tr.find_class("textsmall")
+                smalls = [td for td in smalls if td.tag == "td"]
+                texts = [td for td in tr.find_class("texts") if td.tag == "td"]
+                rows.append({
+                    "hrefs": [a.get("href", "") for a in tr.iter("a")],
+                    "star_count": len(smalls[0].xpath(".//img[@alt='별점']")) if smalls else None,
+                    "texts": [_lxmlText(td) for td in texts + smalls],
+                    "goods_code": findGoodsCode(v for node in tr.iter(lxmlHtml.etree.Element) for v in _lxmlAttrs(node)),
+                })
+    else:
+        strainer = SoupStrainer("table", attrs=REVIEW_TABLE_ATTRS) if backend == "strainer" else None
+        soup = _soup(html, strainer)
+        for table in soup.find_all("table", attrs=REVIEW_TABLE_ATTRS):
+            for tr in table.select("tbody > tr"):
+                smalls = tr.find_all("td", class_="textsmall")
+                rows.append({
+                    "hrefs": [a.get("href", "") for a in tr.find_all("a")],
+                    "star_count": len(smalls[0].find_all("img", alt="별점")) if smalls else None,
+                    "texts": [td.get_text(strip=True) for td in tr.find_all("td", class_="texts") + smalls],
+                    "goods_code": findGoodsCode(v for tag in [tr] + tr.find_all(True) for v in _soupAttrs(tag)),
+                })
+    return rows
+
+def findHref(html: bytes | str, needle: str, backend: str = DEFAULT_BACKEND) -> str | None:
+    """needle이 들어간 첫 번째 <a href> (리뷰 상세 페이지의 GoodsCode 링크 등)"""
+    if backend == "selectolax":
+        tree = _selectolaxRoot(html)
+        hrefs = (a.attributes.get("href") for a in tree.css("a[href]")) if tree else ()
+    elif backend == "lxml":
+        root = _lxmlRoot(html)
+        hrefs = root.xpath("//a/@href") if root is not None else ()
+    else:
+        strainer = SoupStrainer("a", href=True) if backend == "strainer" else None
+        hrefs = (a.get("href") for a in _soup(html, strainer).find_all("a"))
+    return next((href for href in hrefs if href and needle in href), None)
+
+# ---- 벤치마크 ----
+
+PARSERS = {
+    "detail": lambda html, backend: parseDetailFields(html, backend),
+    "review_list": lambda html, backend: parseReviewRows(html, backend),
+    "review_detail": lambda html, backend: findHref(html, "GoodsCode=", backend),
+}
+
+def syntheticFixtures() -> dict[str, list[str]]:
+    # 저장된 페이지가 없을 때 실제 페이지 구조를 흉내 낸 큰 HTML 생성
+    noise = "".join(
+        f'<div class="Noise_item__{i}"><span>광고 {i}</span><a href="/ad/{i}"><img src="/ad{i}.png"></a>'
+        f'<script>window.__DATA_{i}__ = {{"k": "{"x" * 200}"}};</script></div>'
+        for i in range(800)
+    )
+    detail = (
+        f'<html><head><meta charset="utf-8"><style>{".a{color:red}" * 500}</style></head><body>{noise}'
+        f'<div class="DetailSummary_imageContainer__OmWus"><img src="https://ticketimage.interpark.com/poster.gif"></div>'
+        f'<div class="DetailInfo_infoWrap__1BtFi">'
+        + "".join(f"<p>공연 안내 {i} &amp; 유의사항</p><script>track({i})</script>" for i in range(300))
+        + f"</div>{noise}</body></html>"
+    )
+    rows = "".join(
+        f'<tr><td class="texts"><a href="#">{i}</a><a href="CommunityRead.asp?no={i}&GoodsCode=2500{i:04d}">공연 제목 {i}</a></td>'
+        f'<td class="texts">리뷰 내용 {i}</td><td class="textsmall">' + '<img alt="별점" src="star.gif">' * (i % 5 + 1)
+        + f'</td><td class="textsmall">{i * 3}</td><td class="textsmall">{i}</td><td class="textsmall"></td>'
+        f'<td class="textsmall"></td><td class="textsmall">user{i}</td><td class="textsmall">2025-08-{i % 28 + 1:02d}</td></tr>'
+        for i in range(15)
+    )
+    reviewList = f'<html><body>{noise}<table width="100%" border="0"><tbody>{rows}</tbody></table>{noise}</body></html>'
+    reviewDetail = f'<html><body>{noise}<a href="/Ticket/Goods/GoodsInfo.asp?GoodsCode=25001234">공연 보기</a>{noise}</body></html>'
+    return {"detail": [detail], "review_list": [reviewList], "review_detail": [reviewDetail]}
+
+def loadFixtures(fixtureDir: str = FIXTURE_DIR) -> dict[str, list[bytes]]:
+    fixtures = {}
+    for kind in PARSERS:
+        paths = sorted(glob.glob(os.path.join(fixtureDir, kind, "*.html")))
+        if paths:
+            fixtures[kind] = [open(path, "rb").read() for path in paths]
+    return fixtures
+
+def _measure(backend, kind, pages, repeat, queue):
+    # 새 프로세스에서 실행: C 확장(lxml/selectolax) 메모리까지 잡히도록 최대 RSS 증가량으로 측정
+    # (resource는 POSIX 전용이라 벤치마크에서만 import)
+    import resource
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parse = PARSERS[kind]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [parse(page, backend) for page in pages]
+    elapsed = (time.perf_counter() - start) / (repeat * len(pages))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    queue.put((elapsed, peak, results))
+
+def benchmark(fixtureDir: str = FIXTURE_DIR, repeat: int = 20):
+    fixtures = loadFixtures(fixtureDir)
+    if not fixtures:
+        print(f"⚠️ {fixtureDir}에 저장된 HTML이 없어 합성 페이지로 측정합니다.")
+        fixtures = syntheticFixtures()
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    for kind, pages in fixtures.items():
+        size = sum(len(page) for page in pages) / len(pages) / 1024
+        print(f"\n📄 {kind}: 페이지 {len(pages)}개 (평균 {size:.0f}KB)")
+        baseline = None
+        for backend in ["bs4"] + BACKENDS:
+            queue = context.Queue()
+            process = context.Process(target=_measure, args=(backend, kind, pages, repeat, queue))
+            process.start()
+            elapsed, peak, results = queue.get()
+            process.join()
+            if baseline is None:
+                baseline = (elapsed, results)
+            same = "✅" if results == baseline[1] else "❌ 결과 다름"
+            print(f"  {backend:>10}: {elapsed * 1000:7.2f}ms/page ({baseline[0] / elapsed:4.1f}x), 최대 메모리 +{peak / 1024:.1f}MB {same}")
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import json
 import os
 from openai import OpenAI
@@ -6,18 +7,133 @@ from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import ValidationError
 from datetime import datetime
 
-from models.schemas import Concert
-from parseDetail import parseDetail
+from models.schemas import Concert, ConcertBatch, ConcertClassification
+from parseDetail import parseDetail, extractUrl
+from metrics import METRICS
+from rateLimit import TokenBucket, retryWithBackoff
+from parseCache import ParseCache, makeKey, promptVersion
+from preExtract import EXTRACTOR_VERSION, extractFields, mergeFields
 
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+MODEL_NAME = "gpt-4-turbo"
+
+# 비동기 파싱 기본값
+MAX_CONCURRENCY = 4          # 동시에 실행할 LLM 호출 수
+REQUESTS_PER_MINUTE = 60     # 분당 LLM 호출 수 상한
+MAX_RETRIES = 5              # 429 재시도 횟수
+BATCH_SIZE = 5               # 한 요청에 묶을 공연 수
+
+LANGCHAIN_PROMPT = """
+            You are an expert Korean concert information parser.
+            Your task is to extract structured data from the user's concert information text and format it according to the provided schema.
+
+            Follow these general rules:
+            - Convert monetary values to integers (e.g., "90,000원" -> 90000).
+            - If information for an optional field is not present in the text, use null.
+            - Carefully determine the ticket_status based on the current date and sale dates.
+            - Ensure all generated URLs are valid and working.
+
+            {format_instructions}
+
+            For the following fields, you MUST use one of the provided values. Do not use any other value.
+
+            For the 'genre' field, select only one from the following:
+            ["발라드","댄스","랩/힙합","아이돌","R&B/Soul","인디음악","록/메탈","성인가요/트로트",
+                "포크/블루스","일렉트로니카","클래식","재즈","J-POP","POP","키즈","CCM","국악"]
+
+            For the 'concert_mood' field, select only one from the following:
+            ["Emotional", "Energetic", "Dreamy", "Grand", "Calm", "Fun", "Intense"]
+
+            For the 'concert_style' field, select only one from the following:
+            ["Live Band", "Acoustic", "Orchestra", "Solo Performance", "Dance Performance", "Theatrical Concert"]
+
+            For the 'concert_type' field, select only one from the following:
+            ["Festival", "Concert", "Music Show", "Fan Meeting", "Talk Concert"]
+
+            Now, parse the following concert information:
+            ---
+            {concert_text}
+            """
+
+# 여러 공연을 한 요청에 묶어 포맷 지침/enum 목록을 한 번만 보내는 배치 프롬프트
+BATCH_PROMPT = """
+            You are an expert Korean concert information parser.
+            The user's text below contains several concerts, each starting with a line "=== CONCERT n ===".
+            Extract structured data for every concert and return them in the same order, one entry per concert.
+
+            Follow these general rules:
+            - Convert monetary values to integers (e.g., "90,000원" -> 90000).
+            - If information for an optional field is not present in the text, use null.
+            - Carefully determine the ticket_status based on the current date and sale dates.
+            - Ensure all generated URLs are valid and working.
+            - Never merge two concerts into one entry and never skip a concert.
+
+            {format_instructions}
+
+            For the following fields, you MUST use one of the provided values. Do not use any other value.
+            genre: ["발라드","댄스","랩/힙합","아이돌","R&B/Soul","인디음악","록/메탈","성인가요/트로트","포크/블루스","일렉트로니카","클래식","재즈","J-POP","POP","키즈","CCM","국악"]
+            concert_mood: ["Emotional", "Energetic", "Dreamy", "Grand", "Calm", "Fun", "Intense"]
+            concert_style: ["Live Band", "Acoustic", "Orchestra", "Solo Performance", "Dance Performance", "Theatrical Concert"]
+            concert_type: ["Festival", "Concert", "Music Show", "Fan Meeting", "Talk Concert"]
+
+            Now, parse the following concerts:
+            ---
+            {concert_text}
+            """
+
+# 규칙 기반 추출(preExtract) 후 분류 필드와 캐스팅만 묻는 축약 프롬프트
+FAST_PROMPT = """
+            You are an expert Korean concert information parser.
+            Classify the concert below, list its cast and fill the booking fields. Dates, prices, running time, age limit, poster and link are already extracted.
+            Carefully determine the ticket_status based on the current date and sale dates.
+            Keep each ticket open type exactly as written in the text (e.g. "Membership Presale", "일반 예매").
+
+            {format_instructions}
+
+            Use exactly one of the provided values for each field.
+            genre: ["발라드","댄스","랩/힙합","아이돌","R&B/Soul","인디음악","록/메탈","성인가요/트로트","포크/블루스","일렉트로니카","클래식","재즈","J-POP","POP","키즈","CCM","국악"]
+            concert_mood: ["Emotional", "Energetic", "Dreamy", "Grand", "Calm", "Fun", "Intense"]
+            concert_style: ["Live Band", "Acoustic", "Orchestra", "Solo Performance", "Dance Performance", "Theatrical Concert"]
+            concert_type: ["Festival", "Concert", "Music Show", "Fan Meeting", "Talk Concert"]
+            ---
+            {concert_text}
+            """
+
+SINGLE_CONCERT_PROMPT = """다음 공연 정보를 파싱하여 JSON 형식으로 변환하세요.
+            규칙:
+            1. 날짜와 시간은 모두 YYYY-MM-DDTHH:MM:SS 형식을 사용
+            2. 가격은 숫자로 변환 (예: "90,000원" → 90000)
+            3. 정보가 없는 경우 null 사용
+            4. ticket_status는 True 또는 False 중 하나로 표시
+            5. ticket_open_dates는 다음 형식을 반드시 따를 것:
+            - key는 예매 유형 또는 회차 번호
+            - value는 YYYY-MM-DDTHH:MM:SS 형식의 날짜
+            6. 다음 필드들은 각각 정해진 값 중 하나만 선택해야 합니다:
+                genre는 다음 중 하나만 선택:
+                ["발라드","댄스","랩/힙합","아이돌","R&B/Soul","인디음악","록/메탈","성인가요/트로트",
+                "포크/블루스","일렉트로니카","클래식","재즈","J-POP","POP","키즈","CCM","국악"]
+
+                concert_mood는 다음 중 하나만 선택:
+                ["Emotional","Energetic","Dreamy","Grand","Calm","Fun","Intense"]
+
+                concert_style는 다음 중 하나만 선택:
+                ["Live Band","Acoustic","Orchestra","Solo Performance","Dance Performance","Theatrical Concert"]
+
+                concert_type는 다음 중 하나만 선택:
+                ["Festival","Concert","Music Show","Fan Meeting","Talk Concert"]
+            공연 정보:
+            {concert_text}
+            """
 
 class ConcertParser:
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache: ParseCache | None = None):
         self.client = OpenAI(api_key=api_key)
+        self.cache = cache
         self.system_message = """You are a Korean concert information parser.
             Your task is to extract structured data from concert information text.
             Always output valid JSON in Korean following this exact format:
@@ -42,31 +158,14 @@ class ConcertParser:
             \}"""
 
     def singleConcertToJson(self, concert_text: str) -> dict:
-        prompt = f"""다음 공연 정보를 파싱하여 JSON 형식으로 변환하세요.
-            규칙:
-            1. 날짜와 시간은 모두 YYYY-MM-DDTHH:MM:SS 형식을 사용
-            2. 가격은 숫자로 변환 (예: "90,000원" → 90000)
-            3. 정보가 없는 경우 null 사용
-            4. ticket_status는 True 또는 False 중 하나로 표시
-            5. ticket_open_dates는 다음 형식을 반드시 따를 것:
-            - key는 예매 유형 또는 회차 번호
-            - value는 YYYY-MM-DDTHH:MM:SS 형식의 날짜
-            6. 다음 필드들은 각각 정해진 값 중 하나만 선택해야 합니다:
-                genre는 다음 중 하나만 선택:
-                ["발라드","댄스","랩/힙합","아이돌","R&B/Soul","인디음악","록/메탈","성인가요/트로트",
-                "포크/블루스","일렉트로니카","클래식","재즈","J-POP","POP","키즈","CCM","국악"]
-
-                concert_mood는 다음 중 하나만 선택:
-                ["Emotional","Energetic","Dreamy","Grand","Calm","Fun","Intense"]
+        cacheKey = None
+        if self.cache is not None:
+            cacheKey = makeKey(concert_text, promptVersion(MODEL_NAME, self.system_message, SINGLE_CONCERT_PROMPT))
+            cached = self.cache.get(cacheKey)
+            if cached is not None:
+                return cached
 
-                concert_style는 다음 중 하나만 선택:
-                ["Live Band","Acoustic","Orchestra","Solo Performance","Dance Performance","Theatrical Concert"]
-
-                concert_type는 다음 중 하나만 선택:
-                ["Festival","Concert","Music Show","Fan Meeting","Talk Concert"]
-            공연 정보:
-            {concert_text}
-            """
+        prompt = SINGLE_CONCERT_PROMPT.format(concert_text=concert_text)
         messages = [
             {"role": "system", "content": self.system_message},
             {"role": "user", "content": prompt}
@@ -74,82 +173,207 @@ class ConcertParser:
 
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4-turbo",
+                model=MODEL_NAME,
                 messages=messages,
                 response_format={"type": "json_object"},
                 temperature=0.1
             )
-            return json.loads(response.choices[0].message.content)
+            result = json.loads(response.choices[0].message.content)
+            if cacheKey is not None:
+                self.cache.put(cacheKey, result)
+            return result
         except Exception as e:
             print(f"❌ Error parsing concert: {e}")
             return None
 
     @staticmethod
-    def make_json_with_langchain(concert_texts: list[str], api_key: str) -> list[dict]:
-        # 모델 초기화
-        model = ChatOpenAI(api_key=api_key, model="gpt-4-turbo", temperature=0.1)
-
+    def build_chain(model, template: str = LANGCHAIN_PROMPT, schema=Concert):
         # 출력 파서 설정 (Pydantic 모델과 연결)
-        parser = PydanticOutputParser(pydantic_object=Concert)
+        parser = PydanticOutputParser(pydantic_object=schema)
 
         prompt = ChatPromptTemplate.from_template(
-            """
-            You are an expert Korean concert information parser.
-            Your task is to extract structured data from the user's concert information text and format it according to the provided schema.
-
-            Follow these general rules:
-            - Convert monetary values to integers (e.g., "90,000원" -> 90000).
-            - If information for an optional field is not present in the text, use null.
-            - Carefully determine the ticket_status based on the current date and sale dates.
-            - Ensure all generated URLs are valid and working.
-
-            {format_instructions}
-
-            For the following fields, you MUST use one of the provided values. Do not use any other value.
-
-            For the 'genre' field, select only one from the following:
-            ["발라드","댄스","랩/힙합","아이돌","R&B/Soul","인디음악","록/메탈","성인가요/트로트",
-                "포크/블루스","일렉트로니카","클래식","재즈","J-POP","POP","키즈","CCM","국악"]
-
-            For the 'concert_mood' field, select only one from the following:
-            ["Emotional", "Energetic", "Dreamy", "Grand", "Calm", "Fun", "Intense"]
-
-            For the 'concert_style' field, select only one from the following:
-            ["Live Band", "Acoustic", "Orchestra", "Solo Performance", "Dance Performance", "Theatrical Concert"]
-
-            For the 'concert_type' field, select only one from the following:
-            ["Festival", "Concert", "Music Show", "Fan Meeting", "Talk Concert"]
-
-            Now, parse the following concert information:
-            ---
-            {concert_text}
-            """,
+            template,
             # partial_variables를 사용해 파서가 만든 포맷팅 지침을 프롬프트에 미리 삽입합니다.
             partial_variables={
                 "format_instructions": parser.get_format_instructions(),
             },
         )
 
-        # 3. LCEL로 컴포넌트들을 파이프처럼 연결
-        chain = prompt | model | parser
+        # LCEL로 컴포넌트들을 파이프처럼 연결
+        return prompt | model | parser
+
+    @staticmethod
+    def make_json_with_langchain(concert_texts: list[str], api_key: str, model=None, cache: ParseCache | None = None) -> list[dict]:
+        # 모델 초기화
+        model = model or ChatOpenAI(api_key=api_key, model=MODEL_NAME, temperature=0.1)
+        chain = ConcertParser.build_chain(model)
+        promptVer = promptVersion(MODEL_NAME, LANGCHAIN_PROMPT)
 
         parsed_results = []
         for text in concert_texts:
+            cacheKey = makeKey(text, promptVer)
+            cached = cache.get(cacheKey) if cache is not None else None
+            if cached is not None:
+                parsed_results.append(cached)
+                continue
+
             print(f"🔍 Parsing with LangChain...\n{text[:50]}...")
             try:
                 # 체인 실행
-                parsed = chain.invoke({"concert_text": text})
+                parsed = chain.invoke({"concert_text": text}, config={"callbacks": [METRICS.tokenCallback([extractUrl(text)])]})
                 # Pydantic 모델을 dict로 변환하여 저장
                 parsed_results.append(parsed.model_dump(mode='json'))
+                if cache is not None:
+                    cache.put(cacheKey, parsed_results[-1])
             except Exception as e:
                 print(f"❌ Error parsing concert with LangChain: {e}")
                 
         print("✅ 모든 공연 json으로 변환 완료 (LangChain)")
         return parsed_results
+
+    @staticmethod
+    async def astructure_concerts(
+        concert_texts: list[str],
+        api_key: str | None = None,
+        model=None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        max_retries: int = MAX_RETRIES,
+        cache: ParseCache | None = None,
+        pre_extract: bool = False,
+        batch_size: int = 1,
+        bucket: TokenBucket | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> tuple[list[dict | None], dict[int, str]]:
+        """동시 실행 수를 제한해 비동기로 파싱. 결과는 입력 순서, 실패는 입력 인덱스별로 반환.
+        pre_extract=True면 규칙으로 뽑을 수 있는 필드는 먼저 채우고 LLM에는 분류/캐스팅만 요청.
+        batch_size>1이면 전체 프롬프트 대상 공연을 batch_size개씩 한 요청에 묶는다.
+        bucket/semaphore를 넘기면 여러 번 호출해도 속도/동시 실행 제한을 함께 쓴다 (스트리밍 파이프라인)"""
+        model = model or ChatOpenAI(api_key=api_key, model=MODEL_NAME, temperature=0.1)
+        chain = ConcertParser.build_chain(model)
+        fastChain = ConcertParser.build_chain(model, FAST_PROMPT, ConcertClassification)
+        batchChain = ConcertParser.build_chain(model, BATCH_PROMPT, ConcertBatch)
+        promptVer = promptVersion(MODEL_NAME, LANGCHAIN_PROMPT)
+        fastPromptVer = promptVersion(MODEL_NAME, FAST_PROMPT, EXTRACTOR_VERSION)
+        batchPromptVer = promptVersion(MODEL_NAME, BATCH_PROMPT)
+
+        bucket = bucket or TokenBucket(rate=requests_per_minute / 60, capacity=max_concurrency)
+        semaphore = semaphore or asyncio.Semaphore(max_concurrency)
+        results: list[dict | None] = [None] * len(concert_texts)
+        failures: dict[int, str] = {}
+
+        async def invoke(chain, text: str, concerts: list[str | None]):
+            # 재시도마다 토큰을 다시 받아야 429 이후에도 속도 제한이 유지된다
+            await bucket.acquire()
+            return await chain.ainvoke({"concert_text": text}, config={"callbacks": [METRICS.tokenCallback(concerts)]})
+
+        def onRetry(label: str, attempt: int, delay: float):
+            METRICS.count("llm.retries")
+            print(f"⏳ [{label}] 429 재시도 {attempt}회 ({delay:.1f}s 대기)")
+
+        async def invokeWithRetry(chain, text: str, label: str, concerts: list[str | None]):
+            return await retryWithBackoff(
+                lambda: invoke(chain, text, concerts),
+                maxRetries=max_retries,
+                onRetry=lambda attempt, e, delay: onRetry(label, attempt, delay),
+            )
+
+        def store(idx: int, cacheKey: str, concert: Concert):
+            results[idx] = concert.model_dump(mode='json')
+            if cache is not None:
+                cache.put(cacheKey, results[idx])
+
+        async def runSingle(idx: int, fields: dict | None):
+            text = concert_texts[idx]
+            async with semaphore:
+                print(f"🔍 [{idx}] Parsing with LangChain...\n{text[:50]}...")
+                try:
+                    with METRICS.timer("llm.request", concert=extractUrl(text)):
+                        parsed = await invokeWithRetry(chain if fields is None else fastChain, text, str(idx), [extractUrl(text)])
+                    if fields is not None:
+                        # 규칙 값은 LLM이 비워 둔 RULE_FIELDS만 채운다
+                        try:
+                            parsed = Concert.model_validate(mergeFields(parsed.model_dump(mode='json'), fields))
+                        except ValidationError as e:
+                            # 합친 결과가 스키마에 맞지 않으면 전체 프롬프트로 다시 파싱
+                            METRICS.count("llm.pre_extract_fallbacks")
+                            print(f"↪️ [{idx}] 규칙 추출 결과 검증 실패, 전체 프롬프트로 재시도: {e.error_count()}개 오류")
+                            fields = None
+                            with METRICS.timer("llm.request", concert=extractUrl(text)):
+                                parsed = await invokeWithRetry(chain, text, str(idx), [extractUrl(text)])
+                    store(idx, makeKey(text, promptVer if fields is None else fastPromptVer), parsed)
+                except Exception as e:
+                    METRICS.count("llm.failures")
+                    failures[idx] = f"{type(e).__name__}: {e}"
+
+        async def runBatch(indices: list[int]):
+            if len(indices) == 1:
+                await runSingle(indices[0], None)
+                return
+
+            packed = "\n\n".join(
+                f"=== CONCERT {n} ===\n{concert_texts[idx]}" for n, idx in enumerate(indices, start=1)
+            )
+            label = f"{indices[0]}~{indices[-1]}"
+            async with semaphore:
+                print(f"🔍 [{label}] Parsing {len(indices)} concerts in one request...")
+                try:
+                    with METRICS.timer("llm.batch_request"):
+                        parsed = await invokeWithRetry(batchChain, packed, label, [extractUrl(concert_texts[idx]) for idx in indices])
+                    if len(parsed.concerts) != len(indices):
+                        raise ValueError(f"expected {len(indices)} concerts, got {len(parsed.concerts)}")
+                except Exception as e:
+                    # 컨텍스트 초과, 검증 실패, 개수 불일치 등은 반으로 나눠 다시 시도
+                    METRICS.count("llm.batch_splits")
+                    print(f"↪️ [{label}] 배치 실패, 분할 재시도: {type(e).__name__}: {e}")
+                    parsed = None
+
+            if parsed is None:
+                half = len(indices) // 2
+                await asyncio.gather(runBatch(indices[:half]), runBatch(indices[half:]))
+                return
+            for idx, concert in zip(indices, parsed.concerts):
+                store(idx, makeKey(concert_texts[idx], batchPromptVer), concert)
+
+        pending: list[tuple[int, dict | None]] = []
+        for idx, text in enumerate(concert_texts):
+            # 회차를 찾지 못하는 등 규칙 추출이 불완전하면 전체 프롬프트로 처리
+            fields = extractFields(text) if pre_extract else None
+            if fields is not None:
+                keys = [makeKey(text, fastPromptVer)]
+            else:
+                keys = [makeKey(text, promptVer), makeKey(text, batchPromptVer)]
+            if fields is not None:
+                METRICS.count("llm.pre_extracted")
+            if cache is not None:
+                results[idx] = cache.get_first(keys)
+                METRICS.count("cache.hits" if results[idx] is not None else "cache.misses")
+                if results[idx] is not None:
+                    continue
+            pending.append((idx, fields))
+
+        tasks = [runSingle(idx, fields) for idx, fields in pending if fields is not None or batch_size <= 1]
+        if batch_size > 1:
+            fullIndices = [idx for idx, fields in pending if fields is None]
+            tasks += [runBatch(fullIndices[i:i + batch_size]) for i in range(0, len(fullIndices), batch_size)]
+
+        await asyncio.gather(*tasks)
+        return results, failures
+
+    @staticmethod
+    async def amake_json_with_langchain(concert_texts: list[str], api_key: str, **kwargs) -> list[dict]:
+        results, failures = await ConcertParser.astructure_concerts(concert_texts, api_key, **kwargs)
+        for idx, error in sorted(failures.items()):
+            print(f"❌ [{idx}] Error parsing concert with LangChain: {error}")
+
+        print(f"✅ 모든 공연 json으로 변환 완료 (LangChain, 실패 {len(failures)}건)")
+        if kwargs.get("cache") is not None:
+            print(f"💾 파싱 캐시: {kwargs['cache'].stats()}")
+        return [result for result in results if result is not None]
     
 
-def makeJson(finalOutput: list[str],api_key: str) -> list[str]:
-    parser = ConcertParser(api_key)
+def makeJson(finalOutput: list[str],api_key: str, cache: ParseCache | None = None) -> list[str]:
+    parser = ConcertParser(api_key, cache=cache)
     parsed_results = []
 
     for singleConcet in finalOutput:
@@ -0,0 +1,115 @@
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from dailyFiles import OUTPUT_DIR
+
+# 일별 결과(YYYY-MM-DD.json) 옆에 저장 (dailyFiles의 날짜 파일 패턴에는 걸리지 않음)
+METRICS_SUFFIX = ".metrics.json"
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """LLM 응답의 prompt/completion 토큰 수를 Metrics에 기록 (배치 요청은 공연 수로 나눠 공연별로도 기록)"""
+    def __init__(self, metrics: "Metrics", concerts: list[str | None] | None = None):
+        self.metrics = metrics
+        self.concerts = [c for c in concerts or [] if c]
+
+    def on_llm_end(self, response, **kwargs):
+        prompt = completion = 0
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            prompt, completion = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        else:
+            # llm_output이 없는 모델은 메시지의 usage_metadata 사용
+            for generations in response.generations:
+                for generation in generations:
+                    meta = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt += meta.get("input_tokens", 0)
+                    completion += meta.get("output_tokens", 0)
+        self.metrics.count("llm.requests")
+        self.metrics.count("llm.prompt_tokens", prompt)
+        self.metrics.count("llm.completion_tokens", completion)
+        for concert in self.concerts:
+            self.metrics.count("llm.prompt_tokens", prompt / len(self.concerts), concert=concert, total=False)
+            self.metrics.count("llm.completion_tokens", completion / len(self.concerts), concert=concert, total=False)
+
+class Metrics:
+    """단계별 타이머와 카운터. 같은 단계가 동시에 돌면 busy_seconds는 합, wall_seconds는 처음 시작~마지막 끝"""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.startedAt = time.time()
+        self.started = time.perf_counter()
+        self.counters: dict[str, float] = defaultdict(float)
+        self.stages: dict[str, dict] = {}
+        self.concerts: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.gauges: dict[str, object] = {}
+
+    @contextmanager
+    def timer(self, stage: str, concert: str | None = None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            entry = self.stages.setdefault(stage, {"calls": 0, "busy_seconds": 0.0, "first_start": started, "last_end": ended})
+            entry["calls"] += 1
+            entry["busy_seconds"] += ended - started
+            entry["first_start"] = min(entry["first_start"], started)
+            entry["last_end"] = max(entry["last_end"], ended)
+            if concert:
+                self.concerts[concert][f"{stage}.seconds"] += ended - started
+
+    def count(self, name: str, value: float = 1, concert: str | None = None, total: bool = True):
+        if total:
+            self.counters[name] += value
+        if concert:
+            self.concerts[concert][name] += value
+
+    def gauge(self, name: str, value):
+        # 실행 끝에 한 번 정해지는 값 (캐시 통계, 목록 대기 시간 등)
+        self.gauges[name] = value
+
+    def tokenCallback(self, concerts: list[str | None] | None = None) -> TokenUsageCallback:
+        return TokenUsageCallback(self, concerts)
+
+    def stageSeconds(self, stage: str) -> float:
+        return self.stages.get(stage, {}).get("busy_seconds", 0.0)
+
+    def summary(self) -> dict:
+        stages = {
+            name: {
+                "calls": entry["calls"],
+                "busy_seconds": round(entry["busy_seconds"], 3),
+                "wall_seconds": round(entry["last_end"] - entry["first_start"], 3),
+            }
+            for name, entry in self.stages.items()
+        }
+        return {
+            "started_at": datetime.fromtimestamp(self.startedAt).isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self.started, 3),
+            "stages": stages,
+            "counters": {name: round(value, 3) for name, value in sorted(self.counters.items())},
+            "gauges": self.gauges,
+            "concerts": {
+                concert: {name: round(value, 3) for name, value in sorted(values.items())}
+                for concert, values in self.concerts.items()
+            },
+        }
+
+    def write(self, outputDir: str = OUTPUT_DIR, date: str | None = None) -> str:
+        """crawl_new_concerts/YYYY-MM-DD.metrics.json으로 저장하고 경로 반환"""
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        os.makedirs(outputDir, exist_ok=True)
+        path = os.path.join(outputDir, f"{date}{METRICS_SUFFIX}")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return path
+
+# 한 번의 크롤링 실행 동안 모든 모듈이 함께 쓰는 인스턴스
+METRICS = Metrics()
@@ -71,3 +71,20 @@ class Concert(BaseModel):
     ticket_status: bool = Field(description="현재 예매 가능 여부")
     ticket_open_dates: Optional[Dict[str,Optional[datetime]]] = Field(description="티켓 예매 유형을 키로, 해당 예매의 오픈 일시를 값으로 갖는 딕셔너리",default={"type": None})
     booking_link: Optional[str] = Field(description="예매 링크")
+
+class ConcertClassification(BaseModel):
+    """규칙 기반 추출(preExtract.RULE_FIELDS) 후 LLM에게 맡기는 필드만 모은 축약 스키마"""
+    concert_name: str = Field(description="공연명")
+    genre: Genre = Field(description="장르 선택")
+    concert_mood: ConcertMood = Field(description="공연 분위기 선택")
+    concert_style: ConcertStyle = Field(description="공연 스타일 선택")
+    concert_type: ConcertType = Field(description="공연 종류 선택")
+    casting: List[Casting] = Field(description="캐스팅 정보")
+    venue: Optional[str] = Field(description="공연 장소")
+    booking_limit: Optional[str] = Field(description="예매 가능 매수")
+    ticket_status: bool = Field(description="현재 예매 가능 여부")
+    ticket_open_dates: Optional[Dict[str,Optional[datetime]]] = Field(description="티켓 예매 유형을 키로, 해당 예매의 오픈 일시를 값으로 갖는 딕셔너리",default={"type": None})
+
+class ConcertBatch(BaseModel):
+    """여러 공연을 한 요청으로 파싱할 때의 응답 스키마 (입력 순서대로)"""
+    concerts: List[Concert] = Field(description="입력 순서대로 파싱한 공연 목록")
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from models.schemas import Concert
+
+# 캐시 기본값
+CACHE_PATH = os.path.join(".cache", "llm_parse_cache.sqlite")
+CACHE_TTL = 3 * 24 * 60 * 60     # 3일 (ticket_status가 날짜에 따라 바뀌므로 너무 길게 두지 않는다)
+MAX_ENTRIES = 5000               # 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+
+# 스키마가 바뀌면 기존 캐시가 자동으로 무효화되도록 스키마 자체를 해시
+SCHEMA_VERSION = hashlib.sha256(
+    json.dumps(Concert.model_json_schema(), sort_keys=True, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:16]
+
+def normalizeText(text: str) -> str:
+    # 공백/줄바꿈 차이는 같은 입력으로 취급
+    return re.sub(r"\s+", " ", text).strip()
+
+def promptVersion(*parts: str) -> str:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def makeKey(text: str, promptVer: str, schemaVer: str = SCHEMA_VERSION) -> str:
+    payload = "\x00".join([normalizeText(text), promptVer, schemaVer])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ParseCache:
+    """parseDetail 텍스트 해시 → LLM 파싱 결과(dict)를 저장하는 SQLite 캐시"""
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS parse_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_cache_last_used ON parse_cache(last_used_at)")
+        self.conn.commit()
+
+    def _lookup(self, key: str) -> dict | None:
+        row = self.conn.execute("SELECT value, created_at FROM parse_cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            return None
+
+        self.conn.execute("UPDATE parse_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        return json.loads(row[0])
+
+    def get(self, key: str) -> dict | None:
+        return self.get_first([key])
+
+    def get_first(self, keys: list[str]) -> dict | None:
+        """여러 키 중 처음으로 찾은 값을 반환 (조회 한 번으로 집계)"""
+        for key in keys:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: dict):
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO parse_cache (key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now, now),
+        )
+        self.conn.commit()
+
+    def evict(self) -> int:
+        """만료 항목과 max_entries 초과분(LRU)을 삭제하고 삭제 건수를 반환"""
+        cur = self.conn.execute("DELETE FROM parse_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        removed = cur.rowcount
+        cur = self.conn.execute(
+            """DELETE FROM parse_cache WHERE key IN (
+                SELECT key FROM parse_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,),
+        )
+        removed += cur.rowcount
+        self.conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        size = self.conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size,
+        }
+
+    def close(self):
+        self.evict()
+        self.conn.close()
@@ -1,43 +1,114 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+import aiohttp
 import re
+from htmlParse import parseDetailFields
+from metrics import METRICS
+
+# 브라우저 헤더
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+}
+
+# 비동기 상세 크롤링 기본값
+MAX_CONCURRENCY = 8      # 동시에 가져올 상세 페이지 수
+LIMIT_PER_HOST = 4       # 호스트당 동시 연결 수
+REQUEST_TIMEOUT = 15     # 요청당 타임아웃(초)
+
+def extractUrl(concert: str) -> str | None:
+    match = re.search(r"https?://\S+", concert)
+    return match.group(0).strip() if match else None
+
+def extractDetail(url: str, html: bytes | str) -> str:
+    # 상세 설명 텍스트와 이미지 링크 부분만 파싱 (htmlParse 백엔드 사용)
+    info_text, img_src = parseDetailFields(html)
+    info_text = info_text if info_text is not None else "[상세정보 없음]"
+    img_src = img_src if img_src is not None else "[이미지 없음]"
+
+    return f"공연 URL: {url}\n공연 설명:\n{info_text}\n이미지 링크: {img_src}"
 
 def parseDetail(concertList:list[str]) -> list[str]:
     # 결과 저장용 리스트
     results = []
 
-    # 브라우저 헤더
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    }
-
     # 각 공연 정보 처리
     for concert in concertList:
-        match = re.search(r"https?://\S+", concert)
-        if not match:
+        url = extractUrl(concert)
+        if not url:
             results.append("[링크 없음]")
             continue
 
-        url = match.group(0).strip()
-
         try:
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.content, "html.parser")
+            response = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+            results.append(extractDetail(url, response.content))
 
-            # 상세 설명 텍스트
-            info = soup.find(class_="DetailInfo_infoWrap__1BtFi")
-            info_text = info.get_text(strip=True) if info else "[상세정보 없음]"
+        except Exception as e:
+            results.append(f"[에러] {url} 처리 중 오류 발생: {str(e)}")
 
-            # 이미지 링크
-            image = soup.find(class_="DetailSummary_imageContainer__OmWus")
-            img_tag = image.find("img") if image else None
-            img_src = img_tag["src"] if img_tag and img_tag.has_attr("src") else "[이미지 없음]"
+    print("✅ 상세 크롤링 완료")
+    return results
 
-            combined = f"공연 URL: {url}\n공연 설명:\n{info_text}\n이미지 링크: {img_src}"
-            results.append(combined)
+async def fetchDetail(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, concert: str) -> str:
+    url = extractUrl(concert)
+    if not url:
+        return "[링크 없음]"
 
+    async with semaphore:
+        try:
+            with METRICS.timer("detail.fetch", concert=url):
+                async with session.get(url) as response:
+                    content = await response.read()
+            METRICS.count("http.requests")
+            METRICS.count("http.bytes", len(content), concert=url)
         except Exception as e:
-            results.append(f"[에러] {url} 처리 중 오류 발생: {str(e)}")
+            METRICS.count("http.errors")
+            return f"[에러] {url} 처리 중 오류 발생: {str(e)}"
+
+    # 파싱은 CPU 작업이므로 세마포어 밖에서 수행
+    try:
+        with METRICS.timer("detail.parse", concert=url):
+            return extractDetail(url, content)
+    except Exception as e:
+        return f"[에러] {url} 처리 중 오류 발생: {str(e)}"
+
+async def parseDetailAsync(
+    concertList: list[str],
+    maxConcurrency: int = MAX_CONCURRENCY,
+    limitPerHost: int = LIMIT_PER_HOST,
+    timeout: float = REQUEST_TIMEOUT,
+) -> list[str]:
+    """하나의 커넥션 풀로 상세 페이지를 동시에 가져온다 (결과는 입력 순서 유지)"""
+    connector = aiohttp.TCPConnector(limit=maxConcurrency, limit_per_host=limitPerHost)
+    clientTimeout = aiohttp.ClientTimeout(total=timeout)
+    semaphore = asyncio.Semaphore(maxConcurrency)
+
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=clientTimeout) as session:
+        results = await asyncio.gather(
+            *(fetchDetail(session, semaphore, concert) for concert in concertList)
+        )
 
     print("✅ 상세 크롤링 완료")
-    return results
+    return list(results)
+
+async def renderDetail(pool, concert: str) -> str:
+    url = extractUrl(concert)
+    if not url:
+        return "[링크 없음]"
+
+    try:
+        with METRICS.timer("detail.render", concert=url):
+            async with pool.driver() as driver:
+                await asyncio.to_thread(driver.get, url)
+                html = await asyncio.to_thread(lambda: driver.page_source)
+        METRICS.count("browser.pages")
+        METRICS.count("browser.html_bytes", len(html.encode("utf-8")), concert=url)
+        with METRICS.timer("detail.parse", concert=url):
+            return extractDetail(url, html)
+    except Exception as e:
+        return f"[에러] {url} 처리 중 오류 발생: {str(e)}"
+
+async def parseDetailWithBrowsers(concertList: list[str], pool) -> list[str]:
+    """BrowserPool의 드라이버들로 JS 렌더링이 필요한 상세 페이지를 병렬로 가져온다 (결과는 입력 순서 유지)"""
+    results = await asyncio.gather(*(renderDetail(pool, concert) for concert in concertList))
+    print("✅ 상세 크롤링 완료 (브라우저)")
+    return list(results)
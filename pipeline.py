@@ -0,0 +1,264 @@
+import asyncio
+import time
+
+import aiohttp
+from langchain_openai import ChatOpenAI
+
+from dedupe import DuplicateFilter, mergeConcerts
+from metrics import METRICS, Metrics
+from makeJson import BATCH_SIZE, MAX_CONCURRENCY, MODEL_NAME, REQUESTS_PER_MINUTE, ConcertParser
+from models.schemas import Concert
+from parseCache import ParseCache
+from parseDetail import HEADERS, LIMIT_PER_HOST, REQUEST_TIMEOUT, extractUrl, fetchDetail, renderDetail
+from parseDetail import MAX_CONCURRENCY as DETAIL_CONCURRENCY
+from rateLimit import TokenBucket
+from seenIndex import SeenIndex
+
+# 단계별 입력 큐 크기 (가득 차면 앞 단계가 기다린다)
+QUEUE_SIZES = {
+    "detail": 32,     # 목록에서 발견한 공연 -> 상세 페이지 요청
+    "llm": 32,        # 상세 텍스트 -> 중복 제거 + LLM 파싱
+    "validate": 64,   # 파싱 결과 -> 스키마 검증
+    "write": 64,      # 검증된 공연 -> 결과 모음 / 처리 완료 기록
+}
+DETAIL_WORKERS = DETAIL_CONCURRENCY
+LLM_LINGER = 2.0              # LLM 배치를 채우려고 기다리는 최대 시간(초)
+DEPTH_REPORT_INTERVAL = 5.0   # 큐 깊이 출력 간격(초)
+
+DONE = object()  # 단계 종료 신호
+
+async def discover(iterConcerts, driver, seenIndex: SeenIndex | None, stats: dict):
+    """동기 셀레니움 목록 스크롤(crawlAI.iterConcerts)을 스레드에서 돌려 공연을 발견하는 대로 내보낸다"""
+    generator = iterConcerts(driver, seenIndex=seenIndex, stats=stats)
+    while True:
+        concert = await asyncio.to_thread(next, generator, DONE)
+        if concert is DONE:
+            return
+        yield concert
+
+class Pipeline:
+    """발견 -> 상세 -> LLM -> 검증 -> 기록 단계를 크기 제한 큐로 연결해 공연마다 바로 다음 단계로 흘려보낸다"""
+    def __init__(
+        self,
+        pool,
+        seenIndex: SeenIndex | None = None,
+        apiKey: str | None = None,
+        model=None,
+        cache: ParseCache | None = None,
+        renderWithBrowser: bool = False,
+        queueSizes: dict[str, int] = QUEUE_SIZES,
+        detailWorkers: int = DETAIL_WORKERS,
+        llmConcurrency: int = MAX_CONCURRENCY,
+        requestsPerMinute: float = REQUESTS_PER_MINUTE,
+        batchSize: int = BATCH_SIZE,
+        linger: float = LLM_LINGER,
+        metrics: Metrics = METRICS,
+    ):
+        self.pool = pool
+        self.seenIndex = seenIndex
+        self.model = model or ChatOpenAI(api_key=apiKey, model=MODEL_NAME, temperature=0.1)
+        self.cache = cache
+        self.renderWithBrowser = renderWithBrowser
+        self.detailWorkers = detailWorkers
+        self.batchSize = batchSize
+        self.linger = linger
+        self.metrics = metrics
+
+        self.queues = {name: asyncio.Queue(maxsize=size) for name, size in queueSizes.items()}
+        self.maxDepth = {name: 0 for name in self.queues}
+        self.stages = ["discover", *self.queues]
+
+        # LLM 호출은 여러 배치에 걸쳐 같은 속도/동시 실행 제한을 쓴다
+        self.bucket = TokenBucket(rate=requestsPerMinute / 60, capacity=llmConcurrency)
+        self.llmSemaphore = asyncio.Semaphore(llmConcurrency)
+        self.groupSlots = asyncio.Semaphore(llmConcurrency)
+
+        self.duplicates = DuplicateFilter()
+        self.checkedTexts: list[str] = []
+        self.duplicatesOf: dict[str, list[str]] = {}  # 원본 텍스트 -> 파싱 결과를 기다리는 중복 텍스트
+        self.written: dict[str, dict] = {}  # 원본 텍스트 -> 저장한 레코드 (나중에 온 중복 공지가 그대로 씀)
+        self.failures: list[tuple[str, str]] = []
+        self.results: list[dict] = []
+        self.discoverStats = {"errors": 0}
+
+    def depths(self) -> dict[str, int]:
+        """단계별 대기 중인 항목 수"""
+        return {name: queue.qsize() for name, queue in self.queues.items()}
+
+    async def put(self, name: str, item):
+        await self.queues[name].put(item)
+        self.maxDepth[name] = max(self.maxDepth[name], self.queues[name].qsize())
+
+    def writeRecord(self, text: str, concert: dict):
+        # 레코드를 남긴 공지만 본 공연으로 기록
+        self.results.append(concert)
+        if self.seenIndex is not None and extractUrl(text):
+            self.seenIndex.markSucceeded(extractUrl(text))
+
+    async def discoverStage(self, iterConcerts):
+        async with self.pool.driver() as driver:
+            with self.metrics.timer("discover"):
+                async for concert in discover(iterConcerts, driver, self.seenIndex, self.discoverStats):
+                    self.metrics.count("discover.items")
+                    await self.put("detail", concert)
+        self.metrics.gauge("discover", self.discoverStats)
+        print(f"에러수 : {self.discoverStats['errors']}")
+
+    async def detailWorker(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore):
+        queue = self.queues["detail"]
+        while (concert := await queue.get()) is not DONE:
+            with self.metrics.timer("detail"):
+                if self.renderWithBrowser:
+                    text = await renderDetail(self.pool, concert)
+                else:
+                    text = await fetchDetail(session, semaphore, concert)
+            self.metrics.count("detail.items")
+            await self.put("llm", text)
+
+    async def llmStage(self):
+        """상세 텍스트를 중복 제거한 뒤 batchSize개(또는 linger초)씩 모아 LLM 파싱 작업으로 넘긴다"""
+        queue = self.queues["llm"]
+        loop = asyncio.get_running_loop()
+        groups: set[asyncio.Task] = set()
+        batch: list[str] = []
+        deadline = 0.0
+
+        async def flush():
+            nonlocal batch
+            # 동시에 도는 파싱 작업 수를 제한해 큐가 LLM 속도에 맞춰 차도록 한다
+            await self.groupSlots.acquire()
+            task = asyncio.create_task(self.parseGroup(batch))
+            groups.add(task)
+            task.add_done_callback(groups.discard)
+            batch = []
+
+        while True:
+            try:
+                timeout = max(0.0, deadline - loop.time()) if batch else None
+                text = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await flush()
+                continue
+            if text is DONE:
+                break
+
+            self.checkedTexts.append(text)
+            original = self.duplicates.check(text)
+            if original is not None:
+                # 본문이 같은 공지는 원본의 파싱 결과를 레코드로 쓴다
+                self.metrics.count("dedupe.dropped")
+                originalText = self.checkedTexts[original]
+                if originalText in self.written:
+                    self.writeRecord(text, dict(self.written[originalText]))
+                else:
+                    self.duplicatesOf.setdefault(originalText, []).append(text)
+                continue
+
+            batch.append(text)
+            if len(batch) == 1:
+                deadline = loop.time() + self.linger
+            if len(batch) >= self.batchSize:
+                await flush()
+
+        if batch:
+            await flush()
+        await asyncio.gather(*groups)
+
+    async def parseGroup(self, texts: list[str]):
+        try:
+            with self.metrics.timer("llm"):
+                parsed, failures = await ConcertParser.astructure_concerts(
+                    texts, model=self.model, cache=self.cache, pre_extract=True, batch_size=self.batchSize,
+                    bucket=self.bucket, semaphore=self.llmSemaphore,
+                )
+        except Exception as e:
+            parsed, failures = [None] * len(texts), {idx: f"{type(e).__name__}: {e}" for idx in range(len(texts))}
+        finally:
+            self.groupSlots.release()
+        self.metrics.count("llm.items", len(texts))
+        for idx, text in enumerate(texts):
+            await self.put("validate", (text, parsed[idx], failures.get(idx)))
+
+    async def validateStage(self):
+        queue = self.queues["validate"]
+        while (item := await queue.get()) is not DONE:
+            text, concert, error = item
+            with self.metrics.timer("validate"):
+                if concert is not None:
+                    try:
+                        concert = Concert.model_validate(concert).model_dump(mode="json")
+                    except Exception as e:
+                        concert, error = None, f"{type(e).__name__}: {e}"
+            self.metrics.count("validate.items")
+            if concert is None:
+                self.metrics.count("validate.failures")
+                self.failures.append((text, error))
+                print(f"❌ Error parsing concert with LangChain: {error}")
+                continue
+            await self.put("write", (text, concert))
+
+    async def writeStage(self):
+        queue = self.queues["write"]
+        while (item := await queue.get()) is not DONE:
+            text, concert = item
+            with self.metrics.timer("write"):
+                self.written[text] = concert
+                self.writeRecord(text, concert)
+                for duplicate in self.duplicatesOf.pop(text, []):
+                    self.writeRecord(duplicate, dict(concert))
+            self.metrics.count("write.items")
+
+    async def reportDepths(self, interval: float = DEPTH_REPORT_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            print(f"📊 큐 깊이: {self.depths()}")
+
+    async def run(self, iterConcerts) -> list[dict]:
+        """파이프라인 전체 실행. 결과는 같은 공연끼리 합친 공연 목록"""
+        started = time.perf_counter()
+        ownCache = self.cache is None
+        if ownCache:
+            self.cache = ParseCache()
+        connector = aiohttp.TCPConnector(limit=self.detailWorkers, limit_per_host=LIMIT_PER_HOST)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        tasks: list[asyncio.Task] = []
+        try:
+            async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+                semaphore = asyncio.Semaphore(self.detailWorkers)
+                reporter = asyncio.create_task(self.reportDepths())
+                detailTasks = [asyncio.create_task(self.detailWorker(session, semaphore)) for _ in range(self.detailWorkers)]
+                llmTask = asyncio.create_task(self.llmStage())
+                validateTask = asyncio.create_task(self.validateStage())
+                writeTask = asyncio.create_task(self.writeStage())
+                tasks = [reporter, *detailTasks, llmTask, validateTask, writeTask]
+
+                # 앞 단계가 끝나면 다음 단계에 종료 신호를 보낸다
+                await self.discoverStage(iterConcerts)
+                for _ in detailTasks:
+                    await self.put("detail", DONE)
+                await asyncio.gather(*detailTasks)
+                await self.put("llm", DONE)
+                await llmTask
+                await self.put("validate", DONE)
+                await validateTask
+                await self.put("write", DONE)
+                await writeTask
+        finally:
+            # 한 단계가 실패하면 나머지 단계가 큐에서 영원히 기다리지 않도록 정리
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.metrics.gauge("cache", self.cache.stats())
+            if ownCache:
+                print(f"💾 파싱 캐시: {self.cache.stats()}")
+                self.cache.close()
+                self.cache = None
+
+        elapsed = time.perf_counter() - started
+        self.metrics.gauge("queue_max_depth", dict(self.maxDepth))
+        busy = {name: self.metrics.stageSeconds(name) for name in self.stages}
+        print(f"⏱️ 파이프라인 {elapsed:.1f}s (단계별 작업 시간 합 {sum(busy.values()):.1f}s)")
+        for name in self.stages:
+            depth = f", 최대 대기 {self.maxDepth[name]}" if name in self.maxDepth else ""
+            print(f"   {name:>8}: {int(self.metrics.counters[f'{name}.items'])}건, {busy[name]:.1f}s{depth}")
+        return mergeConcerts(self.results)
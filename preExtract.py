@@ -0,0 +1,162 @@
+import re
+import sys
+import json
+import time
+from datetime import datetime
+
+# 규칙이 바뀌면 캐시 키가 달라지도록 버전 관리
+EXTRACTOR_VERSION = "2"
+
+# 인터파크 상세 설명에 등장하는 항목 라벨 (get_text(strip=True)로 붙어 있어 라벨 기준으로 구간을 나눈다).
+# 줄 구분이 없어 짧은 라벨은 긴 헤더 안에서도 잡히므로, "일시"처럼 다른 헤더("티켓오픈일시")의 일부인 단독 라벨은 두지 않고
+# 긴 헤더는 그 자체를 라벨로 넣어 가장 긴 라벨이 먼저 매칭되게 한다
+SECTION_LABELS = {
+    "performance": ["공연일시", "공연일정", "공연기간"],
+    "venue": ["공연장소", "장소"],
+    "running_time": ["관람시간", "공연시간", "러닝타임"],
+    "age_limit": ["관람등급", "관람연령", "관람가능연령"],
+    "price": ["티켓가격", "티켓 가격", "가격", "좌석가격"],
+    "ticket_open": ["티켓오픈일시", "티켓 오픈 일시", "티켓오픈", "티켓 오픈", "예매오픈일시", "예매일정", "예매 일정", "오픈일시"],
+    "booking_limit": ["예매제한", "예매 제한", "예매매수"],
+    "etc": ["출연진", "출연", "기획", "주최", "주관", "문의", "예매처", "유의사항", "공지사항"],
+}
+LABEL_PATTERN = re.compile(
+    "|".join(sorted((re.escape(l) for labels in SECTION_LABELS.values() for l in labels), key=len, reverse=True))
+)
+LABEL_TO_SECTION = {label: section for section, labels in SECTION_LABELS.items() for label in labels}
+
+URL_PATTERN = re.compile(r"공연 URL:\s*(\S+)")
+POSTER_PATTERN = re.compile(r"이미지 링크:\s*(\S+)")
+PRICE_PATTERN = re.compile(r"([A-Za-z]+|[가-힣]+)\s*석\s*[:：]?\s*(\d{1,3}(?:,\d{3})+|\d+)\s*원")
+RUNNING_TIME_PATTERN = re.compile(r"(?:관람|공연|러닝)\s*(?:시간|타임)\s*[:：]?\s*(?:약\s*)?(\d{2,3})\s*분")
+AGE_LIMIT_PATTERN = re.compile(r"(전체\s*관람가|만\s*\d+\s*세\s*이상(?:\s*관람\s*(?:가능|가))?|\d+\s*세\s*이상(?:\s*관람\s*(?:가능|가))?)")
+# "2025.09.13(토) 오후 6시" 또는 범위 뒤쪽의 "~ 14일(일) 오후 5시"(연/월은 앞 날짜를 따른다)
+DATETIME_PATTERN = re.compile(
+    r"(?:(\d{2,4})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})\s*일?|(\d{1,2})\s*일)\s*(?:\([^)]{1,3}\))?\s*"
+    r"(오전|오후|AM|PM|am|pm)?\s*(\d{1,2})\s*(?:시|:)\s*(?:(\d{2})\s*분?)?"
+)
+# 규칙으로 채우는 Concert 필드 (나머지는 LLM이 채운다)
+RULE_FIELDS = ["concert_poster", "performance_rounds", "running_time", "price", "age_limit", "booking_link"]
+
+def splitSections(body: str) -> dict[str, str]:
+    """라벨 위치로 본문을 나눠 {section: text}로 반환 (같은 섹션은 이어붙임)"""
+    sections: dict[str, str] = {}
+    matches = list(LABEL_PATTERN.finditer(body))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
+        section = LABEL_TO_SECTION[match.group(0)]
+        sections[section] = sections.get(section, "") + body[match.end():end] + " "
+    return sections
+
+def parseDatetimes(text: str) -> list[datetime]:
+    results = []
+    lastDate = None
+    for year, month, day, dayOnly, ampm, hour, minute in DATETIME_PATTERN.findall(text):
+        if dayOnly:
+            # 앞에 연/월이 있는 날짜가 없으면 어느 달인지 알 수 없다
+            if lastDate is None:
+                continue
+            year, month, day = lastDate[0], lastDate[1], dayOnly
+        year, month, hour = int(year), int(month), int(hour)
+        if year < 100:
+            year += 2000
+        lastDate = (year, month)
+        if ampm in ("오후", "PM", "pm") and hour < 12:
+            hour += 12
+        elif ampm in ("오전", "AM", "am") and hour == 12:
+            hour = 0
+        try:
+            value = datetime(year, month, int(day), hour, int(minute or 0))
+        except ValueError:
+            continue
+        if value not in results:
+            results.append(value)
+    return results
+
+def extractFields(text: str) -> dict | None:
+    """parseDetail 텍스트에서 결정적으로 뽑을 수 있는 Concert 필드(RULE_FIELDS)를 추출.
+    공연 회차를 찾지 못하면 None (전체 프롬프트 경로로 처리)"""
+    urlMatch = URL_PATTERN.search(text)
+    posterMatch = POSTER_PATTERN.search(text)
+    body = text
+    if "공연 설명:" in text:
+        body = text.split("공연 설명:", 1)[1].split("이미지 링크:", 1)[0]
+    body = re.sub(r"\s+", " ", body).strip()
+    sections = splitSections(body)
+
+    rounds = parseDatetimes(sections.get("performance", ""))
+    if not rounds:
+        return None
+
+    poster = posterMatch.group(1) if posterMatch else None
+    if poster and poster.startswith("//"):
+        poster = "https:" + poster
+    if poster and not poster.startswith("http"):
+        poster = None
+
+    price = {seat: int(amount.replace(",", "")) for seat, amount in PRICE_PATTERN.findall(sections.get("price", body))}
+    runningTime = RUNNING_TIME_PATTERN.search(body)
+    ageLimit = AGE_LIMIT_PATTERN.search(sections.get("age_limit", body))
+
+    return {
+        "concert_poster": poster,
+        "performance_rounds": [
+            {"round": i, "datetime": value.strftime("%Y-%m-%dT%H:%M:%S")} for i, value in enumerate(sorted(rounds), start=1)
+        ],
+        "running_time": int(runningTime.group(1)) if runningTime else None,
+        "price": price or {"type": None},
+        "age_limit": re.sub(r"\s+", " ", ageLimit.group(1)) if ageLimit else None,
+        "booking_link": urlMatch.group(1) if urlMatch else None,
+    }
+
+def mergeFields(parsed: dict, fields: dict) -> dict:
+    """LLM 결과에 규칙 추출값을 합친다. 규칙 값은 LLM이 비워 둔(null) RULE_FIELDS에만 쓴다.
+    RULE_FIELDS는 값을 못 찾았어도 키는 항상 넣는다 (Concert의 필수 필드라 빠지면 검증 실패)"""
+    merged = dict(parsed)
+    for name in RULE_FIELDS:
+        merged[name] = merged.get(name) if merged.get(name) is not None else fields.get(name)
+    return merged
+
+def estimateTokens(text: str) -> int:
+    try:
+        import tiktoken
+        return len(tiktoken.encoding_for_model("gpt-4-turbo").encode(text))
+    except Exception:
+        # tiktoken이 없으면 대략적인 추정 (한글 위주 텍스트 기준)
+        return len(text) // 2
+
+def benchmark(texts: list[str], live: bool = False):
+    """전체 프롬프트 경로와 규칙 추출 + 축약 프롬프트 경로의 토큰/지연 비교"""
+    from langchain_core.output_parsers import PydanticOutputParser
+    from makeJson import LANGCHAIN_PROMPT, FAST_PROMPT, ConcertParser, OPENAI_API_KEY
+    from models.schemas import Concert, ConcertClassification
+
+    fullInstructions = PydanticOutputParser(pydantic_object=Concert).get_format_instructions()
+    fastInstructions = PydanticOutputParser(pydantic_object=ConcertClassification).get_format_instructions()
+
+    fullTokens = fastTokens = extracted = 0
+    start = time.perf_counter()
+    for text in texts:
+        fullTokens += estimateTokens(LANGCHAIN_PROMPT.format(format_instructions=fullInstructions, concert_text=text))
+        if extractFields(text) is not None:
+            extracted += 1
+            fastTokens += estimateTokens(FAST_PROMPT.format(format_instructions=fastInstructions, concert_text=text))
+        else:
+            fastTokens += estimateTokens(LANGCHAIN_PROMPT.format(format_instructions=fullInstructions, concert_text=text))
+    extractMs = (time.perf_counter() - start) * 1000
+
+    print(f"입력 {len(texts)}건, 규칙 추출 성공 {extracted}건 (추출+프롬프트 구성 {extractMs:.1f}ms)")
+    print(f"프롬프트 토큰: 전체 경로 {fullTokens} / 축약 경로 {fastTokens} ({fastTokens / max(fullTokens, 1):.0%})")
+
+    if live:
+        import asyncio
+        for preExtract in (False, True):
+            start = time.perf_counter()
+            _, failures = asyncio.run(ConcertParser.astructure_concerts(texts, OPENAI_API_KEY, pre_extract=preExtract))
+            print(f"pre_extract={preExtract}: {time.perf_counter() - start:.1f}s, 실패 {len(failures)}건")
+
+# 사용 예시: python preExtract.py details.json [--live]
+# details.json은 parseDetail 결과(문자열 리스트)
+if __name__ == "__main__":
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        benchmark(json.load(f), live="--live" in sys.argv)
@@ -0,0 +1,73 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# 재시도 기본값
+MAX_RETRIES = 5
+BASE_DELAY = 1.0    # 첫 재시도 대기(초)
+MAX_DELAY = 60.0    # 재시도 대기 상한(초)
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1):
+        # 락을 잡은 채로 기다려야 요청 순서대로 토큰이 배분된다
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+def isRateLimitError(e: Exception) -> bool:
+    # openai.RateLimitError 및 status_code 429를 가진 모든 예외
+    if type(e).__name__ == "RateLimitError":
+        return True
+    return getattr(e, "status_code", None) == 429
+
+def retryAfter(e: Exception) -> float | None:
+    # 서버가 Retry-After 헤더를 준 경우 그 값을 따른다
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+async def retryWithBackoff(
+    call: Callable[[], Awaitable[T]],
+    maxRetries: int = MAX_RETRIES,
+    retryable: Callable[[Exception], bool] = isRateLimitError,
+    baseDelay: float = BASE_DELAY,
+    maxDelay: float = MAX_DELAY,
+    onRetry: Callable[[int, Exception, float], None] | None = None,
+) -> T:
+    """retryable 예외에 대해 지수 백오프(+지터)로 재시도"""
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= maxRetries or not retryable(e):
+                raise
+            delay = retryAfter(e) or min(maxDelay, baseDelay * 2 ** attempt)
+            delay += random.uniform(0, delay * 0.1)
+            attempt += 1
+            if onRetry:
+                onRetry(attempt, e, delay)
+            await asyncio.sleep(delay)
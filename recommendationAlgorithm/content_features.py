@@ -0,0 +1,296 @@
+from bisect import bisect_right
+import json
+import os
+import sys
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+# 루트 모듈(dailyFiles, models) 공유
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from dailyFiles import OUTPUT_DIR, listDailyFiles, loadDailyConcerts
+from models.schemas import ConcertMood, ConcertStyle, ConcertType, Genre
+
+FEATURES_PATH = 'content_features.npz' # 블록은 content_features.00000.npz처럼 번호를 붙여 저장
+MANIFEST_PATH = 'content_manifest.json'
+FEATURE_VERSION = 2       # 피처 구성이 바뀌면 올려서 전체 재생성
+MAX_BLOCKS = 32           # 블록이 이보다 많으면 저장할 때 하나로 합침
+COMPACT_DEAD_RATIO = 0.25 # 교체되어 안 쓰는 행 비율이 이보다 크면 저장할 때 정리
+
+ENUM_FIELDS = [
+    ("genre", Genre),
+    ("concert_mood", ConcertMood),
+    ("concert_style", ConcertStyle),
+    ("concert_type", ConcertType),
+]
+PRICE_BUCKETS = [30_000, 50_000, 80_000, 110_000, 150_000, 200_000]  # 등급별 가격 구간 경계(원)
+CASTING_DIM = 4096        # 출연진 해시 버킷 수
+VENUE_DIM = 1024          # 공연장 해시 버킷 수
+INFER_NEIGHBORS = 20      # 신규 공연 요인 추정에 쓰는 유사 공연 수
+
+def _layout():
+    # 피처 블록별 시작 열 (열 구성은 고정이라 행을 추가해도 기존 행은 그대로)
+    offsets = {}
+    col = 0
+    for field, enum in ENUM_FIELDS:
+        offsets[field] = col
+        col += len(enum)
+    offsets["price"] = col
+    col += len(PRICE_BUCKETS) + 1
+    offsets["casting"] = col
+    col += CASTING_DIM
+    offsets["venue"] = col
+    col += VENUE_DIM
+    return offsets, col
+
+OFFSETS, N_FEATURES = _layout()
+ENUM_CODES = {field: {member.value: i for i, member in enumerate(enum)} for field, enum in ENUM_FIELDS}
+
+def normalize_name(text):
+    return ' '.join(str(text or '').split())
+
+def concert_key(concert):
+    # 같은 공연은 예매링크로, 예매링크가 없으면 공연명으로 식별
+    return concert.get("booking_link") or normalize_name(concert.get("concert_name"))
+
+def _hash(name, dim):
+    # 파이썬 hash()는 실행마다 달라지므로 crc32 사용 (name은 normalize_name을 거친 값)
+    return zlib.crc32(name.lower().encode('utf-8')) % dim
+
+def _concert_features(concert):
+    cols, vals = [], []
+    for field, _ in ENUM_FIELDS:
+        code = ENUM_CODES[field].get(concert.get(field))
+        if code is not None:
+            cols.append(OFFSETS[field] + code)
+            vals.append(1.0)
+
+    prices = [p for p in (concert.get("price") or {}).values() if isinstance(p, int) and not isinstance(p, bool)]
+    buckets = sorted({bisect_right(PRICE_BUCKETS, p) for p in prices})
+    for b in buckets:
+        cols.append(OFFSETS["price"] + b)
+        vals.append(len(buckets) ** -0.5)
+
+    names = {normalize_name(c.get("name") if isinstance(c, dict) else c) for c in concert.get("casting") or []}
+    names.discard("")
+    buckets = {_hash(name, CASTING_DIM) for name in names}
+    for b in buckets:
+        cols.append(OFFSETS["casting"] + b)
+        vals.append(len(buckets) ** -0.5)
+
+    venue = normalize_name(concert.get("venue"))
+    if venue:
+        cols.append(OFFSETS["venue"] + _hash(venue, VENUE_DIM))
+        vals.append(1.0)
+    return cols, vals
+
+def encode_concerts(concerts):
+    """공연 dict 목록 -> 행 단위 L2 정규화된 희소 피처 행렬 (float32 CSR)"""
+    indptr = [0]
+    indices, data = [], []
+    for concert in concerts:
+        cols, vals = _concert_features(concert)
+        indices.extend(cols)
+        data.extend(vals)
+        indptr.append(len(indices))
+    indptr = np.asarray(indptr, dtype=np.int64)
+    data = np.asarray(data, dtype=np.float32)
+    # 코사인 유사도를 내적 한 번으로 구하도록 행을 단위 벡터로
+    row = np.repeat(np.arange(len(concerts)), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row, weights=data * data, minlength=len(concerts)))
+    norms[norms == 0] = 1.0
+    data /= norms[row].astype(np.float32)
+    return sparse.csr_matrix((data, np.asarray(indices, dtype=np.int32), indptr), shape=(len(concerts), N_FEATURES))
+
+# crawl_new_concerts 일별 파일에서 만든 공연 콘텐츠 피처 (새 파일이 생기면 그 파일만 추가 반영)
+# 행렬은 추가된 순서대로 블록 목록으로 들고 있다가 matrix를 읽을 때 한 번만 합친다.
+# 교체된 공연의 옛 행은 지우지 않고 죽은 행으로 두고(names는 ""), 저장할 때 많이 쌓였으면 정리
+class ContentFeatures() :
+    def __init__(self, blocks=(), keys=(), names=(), files=None, alive=None, block_files=None, next_block=0):
+        self.blocks = [block.tocsr() for block in blocks]
+        self.block_files = list(block_files) if block_files is not None else [None] * len(self.blocks) # 블록별 저장 파일명 (None이면 미저장)
+        self.next_block = next_block # 다음 블록 파일 번호 (정리 후에도 이전 번호를 다시 쓰지 않음)
+        self.keys = list(keys)
+        self.names = list(names)
+        self.alive = list(alive) if alive is not None else [True] * len(self.keys)
+        self.files = dict(files or {}) # 파일명 -> [크기, 수정시각] (변경 감지용)
+        self.key_row = {key: i for i, (key, alive) in enumerate(zip(self.keys, self.alive)) if alive}
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.key_row)
+
+    @property
+    def matrix(self):
+        # 블록을 합친 CSR (행 번호 = keys 인덱스). 다음 add_concerts 전까지 캐시
+        if self._matrix is None:
+            if not self.blocks:
+                self._matrix = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+            elif len(self.blocks) == 1:
+                self._matrix = self.blocks[0]
+            else:
+                self._matrix = sparse.vstack(self.blocks, format='csr')
+        return self._matrix
+
+    @classmethod
+    def load(cls, features_path=FEATURES_PATH, manifest_path=MANIFEST_PATH):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") != FEATURE_VERSION:
+                print("🔄 콘텐츠 피처 구성이 바뀌어 처음부터 다시 만듭니다.")
+                return cls()
+            folder = os.path.dirname(features_path)
+            blocks = [sparse.load_npz(os.path.join(folder, name)) for name in manifest["blocks"]]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ 저장된 콘텐츠 피처 없음 ({e}), 새로 만듭니다.")
+            return cls()
+        return cls(blocks, manifest["keys"], manifest["names"], manifest["files"], manifest["alive"], manifest["blocks"], manifest["next_block"])
+
+    def save(self, features_path=FEATURES_PATH, manifest_path=MANIFEST_PATH):
+        """새로 추가된 블록만 파일로 쓰고 manifest 교체. 블록이나 죽은 행이 많이 쌓였으면 하나로 정리해서 저장"""
+        if len(self.blocks) > MAX_BLOCKS or len(self.keys) - len(self) > COMPACT_DEAD_RATIO * len(self.keys):
+            self.compact()
+        folder = os.path.dirname(features_path)
+        stem = os.path.splitext(os.path.basename(features_path))[0]
+        previous = set()
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = set(json.load(f).get("blocks", []))
+        for i, block in enumerate(self.blocks):
+            if self.block_files[i] is None:
+                # 블록 파일은 매번 새 이름이라 manifest를 바꾸기 전까지 기존 저장본이 그대로 유지된다
+                self.block_files[i] = f"{stem}.{self.next_block:05d}.npz"
+                self.next_block += 1
+                sparse.save_npz(os.path.join(folder, self.block_files[i]), block)
+        manifest = {"version": FEATURE_VERSION, "files": self.files, "keys": self.keys, "names": self.names,
+                    "alive": self.alive, "blocks": self.block_files, "next_block": self.next_block}
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        # 정리되어 더는 manifest에 없는 블록 파일 삭제
+        for name in previous - set(self.block_files):
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+    def compact(self):
+        """죽은 행을 빼고 블록을 하나로 합친다 (행 번호가 바뀜)"""
+        keep = np.array(self.alive, dtype=bool)
+        matrix = self.matrix[keep] if not keep.all() else self.matrix
+        self.keys = [k for k, kept in zip(self.keys, keep) if kept]
+        self.names = [n for n, kept in zip(self.names, keep) if kept]
+        self.alive = [True] * len(self.keys)
+        self.key_row = {key: i for i, key in enumerate(self.keys)}
+        self.blocks, self.block_files = [matrix], [None]
+        self._matrix = None
+
+    def add_concerts(self, concerts):
+        """공연 추가. 이미 있는 공연은 옛 행을 죽은 행으로 두고 최신 레코드를 새 행으로 추가 (기존 행렬은 복사하지 않음)"""
+        latest = {}
+        for concert in concerts:
+            key = concert_key(concert)
+            if key:
+                latest[key] = concert
+        if not latest:
+            return 0
+        start = len(self.keys)
+        for i, (key, concert) in enumerate(latest.items()):
+            old = self.key_row.get(key)
+            if old is not None:
+                self.alive[old] = False
+                self.names[old] = ""
+            self.key_row[key] = start + i
+            self.keys.append(key)
+            self.names.append(normalize_name(concert.get("concert_name")))
+            self.alive.append(True)
+        self.blocks.append(encode_concerts(list(latest.values())))
+        self.block_files.append(None)
+        self._matrix = None
+        return len(latest)
+
+    def update(self, outputDir=os.path.join(ROOT_DIR, OUTPUT_DIR)):
+        """아직 반영하지 않았거나 바뀐 일별 파일만 읽어 추가"""
+        changed = []
+        for path in listDailyFiles(outputDir):
+            stat = os.stat(path)
+            signature = [stat.st_size, stat.st_mtime_ns]
+            name = os.path.basename(path)
+            if self.files.get(name) != signature:
+                changed.append((name, path, signature))
+        concerts = []
+        for name, path, signature in changed:
+            concerts.extend(loadDailyConcerts(path))
+            self.files[name] = signature
+        added = self.add_concerts(concerts)
+        print(f"🗂️ 콘텐츠 피처: 파일 {len(changed)}개 반영, 공연 {added}개 추가/갱신 (총 {len(self)}개)")
+        return added
+
+    def rows(self, concerts):
+        # 공연 dict 목록 -> 피처 행 번호 (없으면 -1)
+        return np.array([self.key_row.get(concert_key(c), -1) for c in concerts], dtype=np.int64)
+
+    def nbytes(self):
+        return sum(b.data.nbytes + b.indices.nbytes + b.indptr.nbytes for b in self.blocks)
+
+def infer_factors(features, rows, known_rows, known_w, known_v, k=INFER_NEIGHBORS):
+    """리뷰가 없는 공연의 FM 요인(w_i, v_i)을 콘텐츠가 가장 비슷한 학습된 공연들의 가중 평균으로 추정"""
+    sims = (features[rows] @ features[known_rows].T).toarray()
+    k = min(k, len(known_rows))
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    weights = np.maximum(np.take_along_axis(sims, top, axis=1), 0)
+    total = weights.sum(axis=1)
+    w = np.einsum('rk,rk->r', weights, known_w[top]) / np.where(total > 0, total, 1)
+    v = np.einsum('rk,rkd->rd', weights, known_v[top]) / np.where(total > 0, total, 1)[:, None]
+    # 비슷한 공연이 하나도 없으면 학습된 공연 전체 평균
+    w[total == 0] = known_w.mean()
+    v[total == 0] = known_v.mean(axis=0)
+    return w.astype(np.float32), v.astype(np.float32)
+
+def benchmark(n_concerts=10_000, seed=0):
+    # 실제 크롤링 레코드를 출연진/공연장만 바꿔 복제해서 1만 개당 생성 시간과 메모리 측정
+    rng = np.random.default_rng(seed)
+    base = [c for path in listDailyFiles(os.path.join(ROOT_DIR, OUTPUT_DIR)) for c in loadDailyConcerts(path)]
+    base = [c for c in base if c.get("genre")] or [{"genre": Genre.IDOL.value, "price": {"R": 99000}}]
+    concerts = []
+    for i in range(n_concerts):
+        concert = dict(base[i % len(base)])
+        concert["booking_link"] = f"synthetic/{i}"
+        concert["casting"] = [{"name": f"artist{a}"} for a in rng.integers(0, 20_000, rng.integers(1, 5))]
+        concert["venue"] = f"venue{rng.integers(0, 500)}"
+        concerts.append(concert)
+
+    start = time.perf_counter()
+    features = ContentFeatures()
+    features.add_concerts(concerts)
+    elapsed = time.perf_counter() - start
+    # 메모리는 tracemalloc 오버헤드가 시간 측정에 섞이지 않도록 따로 측정
+    tracemalloc.start()
+    ContentFeatures().add_concerts(concerts)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    per_10k = 10_000 / n_concerts
+    print(f"📊 공연 {n_concerts}개, 피처 {N_FEATURES}차원, nnz {features.matrix.nnz}")
+    print(f"⏱️ 1만 개당 생성 {elapsed * per_10k:.2f}s, 행렬 {features.nbytes() * per_10k / 1024:.0f}KB, 생성 중 최대 메모리 {peak * per_10k / 1024 / 1024:.1f}MB")
+
+    start = time.perf_counter()
+    features.add_concerts(concerts[:100])
+    print(f"➕ 기존 행렬에 100개 추가/갱신: {(time.perf_counter() - start) * 1000:.1f}ms")
+    start = time.perf_counter()
+    for i in range(10):
+        features.add_concerts(concerts[i * 100:(i + 1) * 100])
+    features.matrix
+    print(f"➕ 100개씩 10번 추가 후 행렬 합치기: {(time.perf_counter() - start) * 1000:.1f}ms (블록 {len(features.blocks)}개)")
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        benchmark()
+    else:
+        features = ContentFeatures.load()
+        features.update()
+        features.save()
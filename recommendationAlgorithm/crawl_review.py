@@ -1,26 +1,71 @@
 import asyncio
+import os
+import sys
 from crawl4ai import AsyncWebCrawler
-from bs4 import BeautifulSoup
-import pandas as pd
-from urllib.parse import urljoin, parse_qs, urlencode
+from urllib.parse import urljoin, parse_qs, urlencode, urlparse
 from playwright.async_api import async_playwright
 import re
 import json
-import gc
+
+# 루트 모듈(resourceFilter 등) 공유
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from htmlParse import findHref, parseReviewRows
+from resourceFilter import RouteStats, attachToCrawler
+from goods_client import GoodsNameClient
+from review_sink import CSV_PATH, ReviewSink, review_id
+
+# 동시성 기본값
+PAGE_CONCURRENCY = 3      # 동시에 처리할 목록 페이지 수
+REQUEST_CONCURRENCY = 6   # 동시에 열 브라우저 요청 수 (목록/상세/제목 페이지 전체)
+
+# 호스트별 요청 간 최소 간격(초)
+HOST_DELAYS = {
+    "ticket.interpark.com": 0.5,
+    "api-ticketfront.interpark.com": 0.2,
+}
+DEFAULT_HOST_DELAY = 0.5
+
+class HostThrottle:
+    """호스트별로 요청 시작 간격을 delay초 이상으로 유지"""
+    def __init__(self, delays: dict | None = None, default_delay: float = DEFAULT_HOST_DELAY):
+        self.delays = dict(HOST_DELAYS if delays is None else delays)
+        self.default_delay = default_delay
+        self.next_at = {}
+        self.locks = {}
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            delay = self.next_at.get(host, 0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_at[host] = loop.time() + self.delays.get(host, self.default_delay)
 
 class InterParkReviewCrawler:
-    def __init__(self):
-        self.results = []
+    def __init__(self, sink, page_concurrency=PAGE_CONCURRENCY, request_concurrency=REQUEST_CONCURRENCY, host_delays=None):
+        self.sink = sink  # 페이지가 끝날 때마다 바로 기록 (메모리에 쌓지 않음)
         self.base_url = "http://ticket.interpark.com/Community/Play/Talk/"
         self.crawler = None  # 크롤러 인스턴스를 클래스 레벨에서 관리
+        self.route_stats = RouteStats()  # 차단/허용한 요청 수
+        self.page_semaphore = asyncio.Semaphore(page_concurrency)
+        self.request_semaphore = asyncio.Semaphore(request_concurrency)
+        self.throttle = HostThrottle(host_delays)
+        self.goods_client = None  # parse_review 동안 GoodsNameClient
+        self.detail_fetches = 0           # 상세 페이지를 연 횟수
+        self.detail_fetches_skipped = 0   # 목록 행에서 GoodsCode를 찾아 생략한 횟수
+        self.known_rows_skipped = 0       # 이미 저장된 글 번호라 제목 조회 없이 건너뛴 행 수
+
+    # 모든 브라우저 요청은 여기로 모아 동시성 제한과 호스트별 대기를 적용
+    async def fetch(self, url, **kwargs):
+        async with self.request_semaphore:
+            await self.throttle.wait(url)
+            return await self.crawler.arun(url=url, **kwargs)
 
-    def convert_url(self,old_url):
+    def extract_goods_code(self, old_url):
         match = re.search(r'GoodsCode=(\d+)', old_url)
-        if match:
-            goods_code = match.group(1)
-            new_url = f"https://api-ticketfront.interpark.com/v1/goods/{goods_code}/summary"
-            return new_url
-        return None
+        return match.group(1) if match else None
 
     def create_page_url(self, page_no):
         """페이지 URL 생성"""
@@ -39,38 +84,27 @@ class InterParkReviewCrawler:
         }
         return f"{self.base_url+'CommunityList.asp'}?{urlencode(params)}"
 
-    # 별점 이미지의 개수를 세는 메소드
-    def count_stars(self, td):
-        star_count = 0
-        star_images = td.find_all('img', alt='별점')
-        star_count = len(star_images)
-        return star_count
-
-    # 테이블의 각 행을 파싱
-    async def parse_table_row(self, tr):
+    # 테이블의 각 행을 파싱 (row: htmlParse.parseReviewRows의 결과 한 행)
+    async def parse_table_row(self, row):
         row_data = {}
         try :
             # 링크 정보 추출
-            links = tr.find_all('a')
+            links = row['hrefs']
             print(f"links : {links}\n")
 
             if not links or len(links) < 2:
                 return None  # 유효하지 않은 행은 건너뛰기
 
-            row_data['url'] = urljoin(self.base_url, links[1].get('href', ''))
+            row_data['url'] = urljoin(self.base_url, links[1])
             if not row_data['url']:  # URL이 없으면 건너뛰기
                 return None
 
             # 별점 추출
-            star_td = tr.find('td', class_='textsmall')
-            if star_td:
-                row_data['star_rating'] = self.count_stars(star_td)
+            if row['star_count'] is not None:
+                row_data['star_rating'] = row['star_count']
 
             # 기타 정보 추출
-            texts_tds = tr.find_all('td', class_='texts')
-            textsmall_tds = tr.find_all('td', class_='textsmall')
-            tds = texts_tds + textsmall_tds
-            for i, td in enumerate(tds):
+            for i, text in enumerate(row['texts']):
                 column_name = {
                     0: 'title',
                     1: 'review',
@@ -82,11 +116,18 @@ class InterParkReviewCrawler:
                     7: 'date'
                 }.get(i, f'column_{i}')
 
-                row_data[column_name] = td.get_text(strip=True)
+                row_data[column_name] = text
 
             # URL이 있는 경우 추가 크롤링 수행
             if row_data.get('url'):  # 'url' 키 존재 여부 및 값 체크
-                detailed_data = await self.crawl_review_detail_page(url=row_data['url'])
+                # 목록 행에 GoodsCode가 있으면 상세 페이지를 열지 않고 바로 제목 조회
+                goods_code = row['goods_code'] or self.extract_goods_code(row_data['url'])
+                if goods_code is not None:
+                    self.detail_fetches_skipped += 1
+                    detailed_data = await self.goods_client.get_name(goods_code)
+                else:
+                    self.detail_fetches += 1
+                    detailed_data = await self.crawl_review_detail_page(url=row_data['url'])
                 if detailed_data is not None:
                     row_data['title']=detailed_data
                 else:
@@ -103,26 +144,18 @@ class InterParkReviewCrawler:
         detailed_data = None
         try:
             # 요청 및 파싱
-            result = await self.crawler.arun(
-                url=url,
+            result = await self.fetch(
+                url,
                 css_selector="text",
                 process_iframes=True
             )
 
             if result and result.html:  # 결과와 HTML 내용이 유효한지 확인
-                soup = BeautifulSoup(result.html, 'html.parser')
-
-                # 모든 <a> 태그에서 링크(href) 추출
-                links = soup.find_all('a')
-                print(f"review_detail_rink : {links}")
-                for link in links:
-                    href = link.get('href')
-                    if href and 'GoodsCode=' in href:
-                        # URL 파싱하여 GoodsCode 값 추출
-                        concert_link = href
-                        concert_title = await self.crawl_review_concert_title_page(url=concert_link)
-                        detailed_data = concert_title
-                        break
+                # GoodsCode가 들어간 첫 번째 링크만 찾는다
+                concert_link = findHref(result.html, 'GoodsCode=')
+                print(f"review_detail_rink : {concert_link}")
+                if concert_link:
+                    detailed_data = await self.crawl_review_concert_title_page(url=concert_link)
             else:
                 print(f"No valid HTML content for URL: {url}")
                 detailed_data = None
@@ -133,95 +166,96 @@ class InterParkReviewCrawler:
 
         return detailed_data
 
-    # 리뷰한 콘서트 제목 크롤링
+    # 리뷰한 콘서트 제목 조회 (GoodsCode 캐시 → 없으면 JSON API 직접 호출)
     async def crawl_review_concert_title_page(self, url):
-        try :
-            new_url = self.convert_url(url)
-            result = await self.crawler.arun(
-                url=new_url,
+        goods_code = self.extract_goods_code(url)
+        if goods_code is None:
+            return None
+        return await self.goods_client.get_name(goods_code)
+
+    def row_review_id(self, row):
+        hrefs = row['hrefs']
+        return review_id(urljoin(self.base_url, hrefs[1])) if len(hrefs) >= 2 else None
+
+    # 단일 페이지 크롤링 -> (리뷰 목록, 목록 페이지 요청 성공 여부)
+    async def crawl_page(self, page_no):
+        url = self.create_page_url(page_no)
+        try:
+            result = await self.fetch(
+                url,
+                css_selector="table",
                 process_iframes=True
             )
-            if result and result.html:
-                soup = BeautifulSoup(result.html, 'html.parser')
-                # print(f"공연 제목 HTML: {result.html}")  # 문제 발생 URL 확인
-                # print(f"공연 제목 HTML: {soup.prettify()}")  # 문제 발생 URL 확인
-
-                # JSON 데이터가 포함된 <pre> 태그 찾기
-                pre_tag = soup.find('pre')
-                if pre_tag:
-                    data = json.loads(pre_tag.text)  # JSON 문자열 파싱
-                    goods_name = data.get('data', {}).get('goodsName')  # "goodsName" 추출
-                    # print(goods_name)
-                    return goods_name
-                return None
         except Exception as e:
-            print(f"Error fetching rendered HTML from {url}: {e}")
-            return None
+            print(f"페이지 {page_no} 요청 중 에러 발생: {e}")
+            return [], False
+        if result and getattr(result, 'success', True) and result.html:
+            rows = parseReviewRows(result.html)
+            # 이미 저장된 리뷰는 상세/제목 요청 없이 건너뜀 (페이지가 밀려 다시 보인 리뷰 포함)
+            ids = [self.row_review_id(row) for row in rows]
+            known = self.sink.known_ids(ids)
+            rows = [row for row, rid in zip(rows, ids) if rid not in known]
+            self.known_rows_skipped += len(ids) - len(rows)
+            # 행들을 동시에 처리 (순서는 유지)
+            row_results = await asyncio.gather(*(self.parse_table_row(row) for row in rows))
+            return [row_data for row_data in row_results if row_data is not None], True
+        return [], False
 
-    # 단일 페이지 크롤링
-    async def crawl_page(self, crawler, page_no):
-        url = self.create_page_url(page_no)
-        result = await crawler.arun(
-            url=url,
-            css_selector="table",
-            process_iframes=True
-        )
-        if result and result.html:
-            soup = BeautifulSoup(result.html, 'html.parser')
-            target_tables = soup.find_all('table', attrs={'width': '100%', 'border': '0'})
-
-            page_results = []
-            for table in target_tables:
-                rows = table.select('tbody > tr')
-                for row in rows:
-                    row_data = await self.parse_table_row(row)
-                    if row_data is not None:
-                        page_results.append(row_data)
-
-            return page_results
-        return []
-
-    """여러 페이지 순차적 크롤링"""
+    async def crawl_page_bounded(self, page_no):
+        async with self.page_semaphore:
+            print(f"페이지 {page_no} 크롤링 중...")
+            page_results, ok = await self.crawl_page(page_no)
+            inserted = self.sink.write_page(page_no, page_results)
+            if ok:
+                print(f"페이지 {page_no} 완료: {len(page_results)}개의 리뷰 수집, {inserted}개 신규 저장")
+            else:
+                print(f"페이지 {page_no} 요청 실패: 다음 실행에서 글 번호로 다시 확인")
+            return inserted
+
+    """여러 페이지 동시 크롤링 (이미 저장된 리뷰는 글 번호를 보고 건너뜀)"""
     async def parse_review(self, start_page, end_page):
+        pages = range(start_page, end_page + 1)
         async with AsyncWebCrawler(verbose=True) as crawler:
+            # 이미지/폰트/분석 스크립트는 로드하지 않음
+            attachToCrawler(crawler, "review", self.route_stats)
             self.crawler = crawler
-            for page_no in range(start_page, end_page + 1):
-                print(f"페이지 {page_no} 크롤링 중...")
-                page_results = await self.crawl_page(crawler, page_no)
-                self.results.extend(page_results)
-                print(f"페이지 {page_no} 완료: {len(page_results)}개의 리뷰 수집")
-
-            # 결과 저장
-            if self.results:
-                df = pd.DataFrame(self.results)
-                df = df.drop_duplicates()
-                filter_df = df.iloc[7:, :10]  # :8은 column_8 이전의 열까지만 선택
-                filter_df.to_csv('interpark_reviews.csv',mode= 'a', index=False, encoding='utf-8-sig',header=False)
-                print(f"\n크롤링 완료: 총 {len(filter_df)}개의 리뷰가 저장되었습니다.")
-                self.results = []  # 저장 후 메모리에서 데이터 제거
-                gc.collect()  # Garbage Collection 강제 실행
-
-            else:
-                print("크롤링된 데이터가 없습니다.")
+            async with GoodsNameClient(throttle=self.throttle) as goods_client:
+                self.goods_client = goods_client
+                inserted = await asyncio.gather(*(self.crawl_page_bounded(page_no) for page_no in pages))
+                print(f"GoodsCode 캐시: {goods_client.stats()}")
+                print(f"상세 페이지 요청: {self.detail_fetches}회, 생략: {self.detail_fetches_skipped}회")
+                print(f"이미 저장된 리뷰 건너뜀: {self.known_rows_skipped}개")
 
+            print(f"\n크롤링 완료: {len(pages)}페이지, 신규 {sum(inserted)}개 (누적 {self.sink.count()}개)")
+            print(f"리소스 필터: {self.route_stats.as_dict()}")
             await asyncio.sleep(1)
 
 
 async def main():
-    crawler = InterParkReviewCrawler()
+    sink = ReviewSink()
+    crawler = InterParkReviewCrawler(sink)
+    # 예전 실행이 CSV에만 남긴 리뷰도 싱크에 합쳐 두어야 마지막 export에서 지워지지 않는다
+    print(f"기존 CSV에서 {sink.import_csv(CSV_PATH)}개 리뷰를 가져왔습니다.")
 
     # 전체 페이지를 10페이지씩 나누어 크롤링
-    # 현재 30페이지까지 완료
-    start_page = 31
+    # 목록은 최신순이라 새 리뷰가 올라오면 예전 리뷰가 뒤 페이지로 밀린다. 그래서 페이지 번호로 이어 가지 않고
+    # 항상 1페이지부터 보되, sink에 있는 글 번호는 목록 요청만 하고 건너뛰므로 중단 후 다시 실행해도 이어서 진행
+    print(f"저장된 최신 리뷰 글 번호: {sink.newest_review_id()}")
+    start_page = 1
     end_page = 100
     batch_size = 10
 
-    for batch_start in range(start_page, end_page + 1, batch_size):
-        batch_end = min(batch_start + batch_size - 1, end_page)
-        print(f"\n[작업 범위] {batch_start} ~ {batch_end} 페이지 크롤링 시작")
-        await crawler.parse_review(start_page=batch_start, end_page=batch_end)
-        print(f"[작업 범위] {batch_start} ~ {batch_end} 페이지 크롤링 완료\n")
-        await asyncio.sleep(10)  # 다음 배치 전 대기 시간 추가
+    try:
+        for batch_start in range(start_page, end_page + 1, batch_size):
+            batch_end = min(batch_start + batch_size - 1, end_page)
+            print(f"\n[작업 범위] {batch_start} ~ {batch_end} 페이지 크롤링 시작")
+            await crawler.parse_review(start_page=batch_start, end_page=batch_end)
+            print(f"[작업 범위] {batch_start} ~ {batch_end} 페이지 크롤링 완료\n")
+            await asyncio.sleep(10)  # 다음 배치 전 대기 시간 추가
+    finally:
+        # MF_model.ipynb 입력 CSV 갱신
+        sink.export_csv(CSV_PATH)
+        sink.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
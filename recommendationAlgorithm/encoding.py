@@ -0,0 +1,147 @@
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ENCODER_PATH = 'fm_encoder.json'
+USER_COL = 'userid'
+ITEM_COL = 'title'
+RATING_COL = 'star_rating'
+
+def _keys(column):
+    # CSV에서 읽은 id가 int/str로 섞여도 저장 후 같은 키가 되도록 문자열로 통일
+    return pd.Series(column).astype(str)
+
+# user/item id -> FM 변수 인덱스 (MF_model.ipynb의 user_dict/item_dict 대체)
+class FeatureEncoder() :
+    def __init__(self, users=(), items=(), user_pos=None, item_pos=None, w0=0.0):
+        self.users = pd.Index(list(users), dtype=object)
+        self.items = pd.Index(list(items), dtype=object)
+        # fit 직후에는 user가 0..n_users-1, item이 그 뒤에 연속으로 배치된다
+        self.user_pos = np.arange(len(self.users), dtype=np.int32) if user_pos is None else np.asarray(user_pos, dtype=np.int32)
+        self.item_pos = (len(self.users) + np.arange(len(self.items), dtype=np.int32)) if item_pos is None else np.asarray(item_pos, dtype=np.int32)
+        self.w0 = float(w0) # 전체 편향값
+
+    @property
+    def n_users(self):
+        return len(self.users)
+
+    @property
+    def n_items(self):
+        return len(self.items)
+
+    @property
+    def num_x(self):
+        return self.n_users + self.n_items
+
+    def fit(self, df):
+        """정렬된 factorize 코드로 인코딩을 만든다 (실행할 때마다 같은 결과)"""
+        _, users = pd.factorize(_keys(df[USER_COL]), sort=True)
+        _, items = pd.factorize(_keys(df[ITEM_COL]), sort=True)
+        self.__init__(users, items, w0=np.mean(df[RATING_COL]) if RATING_COL in df else 0.0)
+        return self
+
+    def extend(self, df):
+        """처음 보는 user/item을 기존 인덱스 뒤에 추가 (기존 인덱스는 바뀌지 않음)"""
+        new_users = pd.Index(pd.unique(_keys(df[USER_COL]))).difference(self.users, sort=True)
+        new_items = pd.Index(pd.unique(_keys(df[ITEM_COL]))).difference(self.items, sort=True)
+        start = self.num_x
+        self.users = self.users.append(new_users)
+        self.user_pos = np.concatenate([self.user_pos, start + np.arange(len(new_users), dtype=np.int32)])
+        start += len(new_users)
+        self.items = self.items.append(new_items)
+        self.item_pos = np.concatenate([self.item_pos, start + np.arange(len(new_items), dtype=np.int32)])
+        return len(new_users), len(new_items)
+
+    def user_index(self, ids):
+        codes = self.users.get_indexer(_keys(ids))
+        return np.where(codes >= 0, self.user_pos[codes], -1).astype(np.int32)
+
+    def item_index(self, ids):
+        codes = self.items.get_indexer(_keys(ids))
+        return np.where(codes >= 0, self.item_pos[codes], -1).astype(np.int32)
+
+    def transform(self, df, drop_unknown=False):
+        """DF -> ((indptr, indices, values), y). 노트북의 data/y와 같은 내용을 CSR 배열로 반환"""
+        u = self.user_index(df[USER_COL])
+        i = self.item_index(df[ITEM_COL])
+        known = (u >= 0) & (i >= 0)
+        if not known.all():
+            if not drop_unknown:
+                raise KeyError(f"{int((~known).sum())} rows have unknown user/item ids")
+            u, i = u[known], i[known]
+        n_rows = len(u)
+        indptr = np.arange(0, 2 * n_rows + 1, 2, dtype=np.int64)
+        indices = np.column_stack([u, i]).ravel()
+        values = np.ones(2 * n_rows, dtype=np.float32)
+        y = None
+        if RATING_COL in df:
+            y = np.asarray(df[RATING_COL], dtype=np.float32)
+            if not known.all():
+                y = y[known]
+            y = y - np.float32(self.w0)
+        return (indptr, indices, values), y
+
+    def save(self, path=ENCODER_PATH):
+        state = {
+            'w0': self.w0,
+            'users': self.users.tolist(),
+            'items': self.items.tolist(),
+            'user_pos': self.user_pos.tolist(),
+            'item_pos': self.item_pos.tolist(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=ENCODER_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return cls(state['users'], state['items'], state['user_pos'], state['item_pos'], state['w0'])
+
+def legacy_encode(DF):
+    # 노트북의 기존 방식 (비교용): set() 순회 + DF.iloc 행 루프
+    user_dict = {}
+    for user in set(DF[USER_COL]):
+        user_dict[user] = len(user_dict)
+    item_dict = {}
+    for item in set(DF[ITEM_COL]):
+        item_dict[item] = len(user_dict) + len(item_dict)
+    w0 = np.mean(DF[RATING_COL])
+    data, y = [], []
+    for i in range(len(DF)):
+        case = DF.iloc[i]
+        data.append([[user_dict[case[USER_COL]], item_dict[case[ITEM_COL]]], [1, 1]])
+        y.append(case[RATING_COL] - w0)
+    return data, y
+
+def benchmark(path=None, n_ratings=100_000, seed=0):
+    if path:
+        DF = pd.read_csv(path)[[ITEM_COL, USER_COL, RATING_COL]].drop_duplicates()
+    else:
+        rng = np.random.default_rng(seed)
+        DF = pd.DataFrame({
+            ITEM_COL: [f'concert{i}' for i in rng.integers(0, 2_000, n_ratings)],
+            USER_COL: [f'user{i}' for i in rng.integers(0, 60_000, n_ratings)],
+            RATING_COL: rng.integers(1, 11, n_ratings),
+        })
+    print(f"📊 {len(DF)} ratings")
+
+    start = time.perf_counter()
+    encoder = FeatureEncoder().fit(DF)
+    (indptr, indices, values), y = encoder.transform(DF)
+    vectorized = time.perf_counter() - start
+    print(f"⚡ FeatureEncoder: {vectorized * 1000:.1f}ms (num_x={encoder.num_x})")
+
+    start = time.perf_counter()
+    data, y_legacy = legacy_encode(DF)
+    legacy = time.perf_counter() - start
+    print(f"🐢 DF.iloc 루프: {legacy * 1000:.1f}ms ({legacy / vectorized:.0f}x)")
+
+    assert np.allclose(y, y_legacy, atol=1e-4)
+    assert all(len(row[0]) == 2 for row in data) and len(indices) == 2 * len(data)
+
+if __name__ == '__main__':
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,358 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba가 없으면 mini-batch 벡터화 엔진만 사용
+    njit = None
+
+CHECKPOINT_DIR = 'fm_checkpoint' # w.npy, v.npy(메모리 매핑 가능, 여유 용량 포함) + meta.json
+
+def RMSE(y_true,y_pred):
+    return np.sqrt(np.mean((np.asarray(y_true) - np.asarray(y_pred))**2))
+
+def to_csr(data):
+    """[[x_index, x_value], ...] 형태(노트북 포맷)를 CSR 배열 (indptr, indices, values)로 변환"""
+    if isinstance(data, tuple) and len(data) == 3:
+        indptr, indices, values = data
+        return np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int32), np.asarray(values, dtype=np.float32)
+
+    lengths = np.fromiter((len(row[0]) for row in data), dtype=np.int64, count=len(data))
+    indptr = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((i for row in data for i in row[0]), dtype=np.int32, count=indptr[-1])
+    values = np.fromiter((x for row in data for x in row[1]), dtype=np.float32, count=indptr[-1])
+    return indptr, indices, values
+
+def slice_csr(csr, start, end):
+    indptr, indices, values = csr
+    lo, hi = indptr[start], indptr[end]
+    return indptr[start:end + 1] - lo, indices[lo:hi], values[lo:hi]
+
+if njit is not None:
+    @njit(cache=True)
+    def _sgd_numba(indptr, indices, values, y, w, v, alpha, beta, l2_reg, y_pred):
+        # 노트북의 샘플 단위 SGD와 같은 업데이트를 컴파일된 루프로 수행
+        K = v.shape[1]
+        sum_vx = np.zeros(K)
+        for r in range(len(y)):
+            lo, hi = indptr[r], indptr[r + 1]
+            bias_score = 0.0
+            latent_score = 0.0
+            for k in range(K):
+                s = 0.0
+                s2 = 0.0
+                for j in range(lo, hi):
+                    vx = v[indices[j], k] * values[j]
+                    s += vx
+                    s2 += vx * vx
+                sum_vx[k] = s
+                latent_score += s * s - s2
+            for j in range(lo, hi):
+                bias_score += w[indices[j]] * values[j]
+            y_hat = bias_score + 0.5 * latent_score
+            y_pred[r] = y_hat
+            error = y[r] - y_hat
+            for j in range(lo, hi):
+                i = indices[j]
+                x = values[j]
+                reg_w = beta * w[i] if l2_reg else 0.0
+                w[i] += error * alpha * (x - reg_w)
+                for k in range(K):
+                    reg_v = beta * v[i, k] if l2_reg else 0.0
+                    v[i, k] += error * alpha * (x * sum_vx[k] - v[i, k] * x * x - reg_v)
+
+# FM 구현 (MF_model.ipynb의 FM과 같은 API, CSR 인덱스 배열 기반)
+class FM() :
+    def __init__(self,N,K,data=None,y=None,alpha=0.0014,beta=0.075,train_ratio = 0.75,
+                 iterations=100,tolerance=0.005,l2_reg=True,verbose=True,
+                 batch_size=1024,engine='auto',seed=None):
+        self.K=K # latent feature의 수
+        self.N=N # 변수 x의 수
+        self.alpha = alpha # 학습률
+        self.beta = beta # 정규화 계수
+        self.iterations = iterations # 반복횟수
+        self.tolerance = tolerance # 반복을 중단하는 RMSE의 기준인 tolerance
+        self.l2_reg = l2_reg # 정규화를 할지 여부를 나타내는 값
+        self.verbose = verbose # 학습 상황을 표시할지 나타내는 값
+        self.batch_size = batch_size # mini-batch 크기 (batch 엔진)
+        # 'numba': 샘플 단위 컴파일 루프, 'batch': mini-batch 벡터화, 'auto': numba가 있으면 numba
+        self.engine = ('numba' if njit is not None else 'batch') if engine == 'auto' else engine
+        if self.engine == 'numba' and njit is None:
+            raise ImportError("engine='numba' requires numba")
+        if engine == 'auto' and njit is None:
+            # mini-batch 엔진은 샘플 단위 SGD와 갱신 순서가 달라 학습 결과(RMSE)가 조금 다르다
+            print("⚠️ numba가 설치되어 있지 않아 mini-batch 엔진으로 학습합니다. 결과가 numba 엔진과 다를 수 있습니다.")
+
+        self.rng = np.random.default_rng(seed)
+        # 변수의 편향을 나타내는 w벡터 초기화
+        # 잠재요인 행렬 v 초기화
+        # (w, v는 grow로 늘릴 수 있도록 용량만큼 잡은 _w_buf, _v_buf의 앞 N행)
+        self._set_buffers(self.rng.normal(scale=1./self.N,size = (self.N)),
+                          self.rng.normal(scale=1./self.K,size = (self.N,self.K)))
+        self.meta = {} # 체크포인트에 함께 저장할 정보 (마지막으로 학습한 리뷰 위치 등)
+
+        if data is None: # 체크포인트에서 불러오거나 온라인 업데이트만 하는 경우
+            return
+        # Train/Test 분리
+        csr = to_csr(data)
+        y = np.asarray(y, dtype=np.float64)
+        self.n_case = len(y)
+        cutoff = int(train_ratio*self.n_case)
+        self.train_x = slice_csr(csr, 0, cutoff)
+        self.train_y = y[:cutoff]
+        self.test_x = slice_csr(csr, cutoff, self.n_case)
+        self.test_y = y[cutoff:]
+
+    # Training 하면서 RMSE 계산
+    def test(self):
+        # SGD를 iterations 숫자만큼 진행
+        best_RMSE = 10000
+        best_iteration = 0
+        training_process = []
+        for i in range(self.iterations):
+            # SGD & Train RMSE 계산
+            rmse1 = self.sgd(self.train_x,self.train_y)
+            # Test RMSE 계산
+            rmse2 = self.test_rmse(self.test_x,self.test_y)
+            training_process.append([i,rmse1,rmse2])
+
+            if self.verbose:
+                if(i+1)%10==0:
+                    print("Iteration: %d ; Train RMSE = %.6f ; Test RMSE = %.6f" % (i+1,rmse1,rmse2))
+
+            if best_RMSE > rmse2:
+                best_RMSE = rmse2
+                best_iteration = i
+            # RMSE가 정해진 tolerance보다 더 악화되었으면 학습을 중단
+            elif(rmse2-best_RMSE) > self.tolerance: break
+
+        print(best_iteration,best_RMSE)
+        return training_process
+
+    # 한 번에 여러 행의 점수 계산
+    def _scores(self, indptr, indices, values):
+        vx = self.v[indices] * values[:, None]
+        bias = self.w[indices] * values
+        n_rows = len(indptr) - 1
+        nnz = np.diff(indptr)
+        if n_rows and np.all(nnz == nnz[0]):
+            # 행마다 nonzero 수가 같으면(유저+아이템 one-hot 등) reshape 후 합산
+            vx_3d = vx.reshape(n_rows, nnz[0], self.K)
+            sum_vx = vx_3d.sum(axis=1)
+            sum_vx_2 = np.einsum('rck,rck->rk', vx_3d, vx_3d)
+            bias_score = bias.reshape(n_rows, nnz[0]).sum(axis=1)
+        else:
+            # 행 단위 구간합은 reduceat으로
+            starts = indptr[:-1]
+            sum_vx = np.add.reduceat(vx, starts, axis=0)
+            sum_vx_2 = np.add.reduceat(vx * vx, starts, axis=0)
+            bias_score = np.add.reduceat(bias, starts)
+        latent_score = 0.5 * np.sum(np.square(sum_vx) - sum_vx_2, axis=1)
+        return bias_score + latent_score, vx, sum_vx
+
+    def _sgd_batch(self, csr, y_data, y_pred):
+        indptr, indices, values = csr
+        for start in range(0, len(y_data), self.batch_size):
+            end = min(start + self.batch_size, len(y_data))
+            b_indptr, b_indices, b_values = slice_csr(csr, start, end)
+            y_hat, vx, sum_vx = self._scores(b_indptr, b_indices, b_values)
+            y_pred[start:end] = y_hat
+            error = y_data[start:end] - y_hat
+
+            # 각 nonzero가 속한 행의 오차/sum_vx를 펼쳐서 한 번에 업데이트
+            row = np.repeat(np.arange(end - start), np.diff(b_indptr))
+            err = error[row] * self.alpha
+            x_0 = b_values
+            x_1 = x_0[:, None]
+            grad_w = x_0
+            grad_v = x_1 * sum_vx[row] - vx * x_1
+            if self.l2_reg: # 정규화하는 경우의 업데이트
+                grad_w = grad_w - self.beta * self.w[b_indices]
+                grad_v = grad_v - self.beta * self.v[b_indices]
+            np.add.at(self.w, b_indices, err * grad_w)
+            np.add.at(self.v, b_indices, err[:, None] * grad_v)
+
+    # w,v 업데이트를 위한 Stochastic gradient descent
+    def sgd(self,x_data,y_data):
+        csr = to_csr(x_data)
+        y_data = np.asarray(y_data, dtype=np.float64)
+        y_pred = np.empty(len(y_data))
+        if self.engine == 'numba':
+            _sgd_numba(*csr, y_data, self.w, self.v, self.alpha, self.beta, self.l2_reg, y_pred)
+        else:
+            self._sgd_batch(csr, y_data, y_pred)
+        return RMSE(y_data,y_pred)
+
+    def test_rmse(self,x_data,y_data):
+        return RMSE(y_data,self.predict_many(x_data))
+
+    # 여러 행의 예측값을 한 번에 계산
+    def predict_many(self, x_data, batch_size=8192):
+        csr = to_csr(x_data)
+        n_rows = len(csr[0]) - 1
+        y_pred = np.empty(n_rows)
+        for start in range(0, n_rows, batch_size):
+            end = min(start + batch_size, n_rows)
+            y_pred[start:end] = self._scores(*slice_csr(csr, start, end))[0]
+        return y_pred
+
+    def _set_buffers(self, w_buf, v_buf, N=None):
+        self._w_buf, self._v_buf = w_buf, v_buf
+        self.N = len(w_buf) if N is None else N
+        self.w = self._w_buf[:self.N]
+        self.v = self._v_buf[:self.N]
+
+    @property
+    def capacity(self):
+        return len(self._w_buf)
+
+    def grow(self, N):
+        """새 유저/아이템만큼 w, v를 늘린다. 용량(체크포인트에도 저장) 안이면 제자리에서 늘리고,
+        넘치면 두 배로 다시 잡아서 매일 늘려도 전체 복사는 가끔만 일어난다"""
+        if N <= self.N:
+            return
+        if N > self.capacity or not self._w_buf.flags.writeable:
+            capacity = max(N, 2 * self.N, self.capacity)
+            w_buf = np.empty(capacity)
+            v_buf = np.empty((capacity, self.K))
+            w_buf[:self.N] = self.w
+            v_buf[:self.N] = self.v
+            self._set_buffers(w_buf, v_buf, self.N)
+        # 새 변수는 처음 학습할 때와 같은 분포로 초기화
+        self._w_buf[self.N:N] = self.rng.normal(scale=1./N, size=N - self.N)
+        self._v_buf[self.N:N] = self.rng.normal(scale=1./self.K, size=(N - self.N, self.K))
+        self._set_buffers(self._w_buf, self._v_buf, N)
+
+    def partial_fit(self, x_data, y_data, epochs=3):
+        """새로 들어온 평점만으로 몇 번의 SGD를 진행 (비용이 새 데이터 크기에 비례)"""
+        csr = to_csr(x_data)
+        if len(csr[1]) and int(csr[1].max()) >= self.N:
+            raise ValueError(f"feature index {int(csr[1].max())} out of range for N={self.N}; call grow() first")
+        if not self.w.flags.writeable: # mmap_mode='r'로 불러온 경우 메모리로 복사 (여유 용량 포함)
+            self._set_buffers(np.array(self._w_buf), np.array(self._v_buf), self.N)
+        rmse = [float(self.sgd(csr, y_data)) for _ in range(epochs)]
+        if self.verbose:
+            print("partial_fit: %d ratings, %d epochs ; Train RMSE = %.6f" % (len(y_data), epochs, rmse[-1]))
+        return rmse
+
+    def save(self, path=CHECKPOINT_DIR, **meta):
+        """w.npy, v.npy, meta.json으로 저장 (임시 파일에 쓴 뒤 교체해서 중간에 실패해도 이전 체크포인트 유지)
+        npy 파일은 capacity 행 크기로 만들고 앞 N행만 채운다 (나머지는 다음 grow가 쓸 여유 용량)"""
+        os.makedirs(path, exist_ok=True)
+        self.meta.update(meta)
+        for name, array, buf in (('w', self.w, self._w_buf), ('v', self.v, self._v_buf)):
+            tmp = os.path.join(path, f'{name}.npy.tmp')
+            out = np.lib.format.open_memmap(tmp, mode='w+', dtype=array.dtype, shape=buf.shape)
+            out[:self.N] = array
+            out.flush()
+            del out
+            os.replace(tmp, os.path.join(path, f'{name}.npy'))
+        info = {
+            'N': self.N, 'capacity': self.capacity, 'K': self.K, 'alpha': self.alpha, 'beta': self.beta,
+            'l2_reg': self.l2_reg, 'batch_size': self.batch_size, 'saved_at': time.time(),
+            **self.meta,
+        }
+        tmp = os.path.join(path, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, os.path.join(path, 'meta.json'))
+
+    @classmethod
+    def load(cls, path=CHECKPOINT_DIR, mmap_mode=None, **kwargs):
+        """체크포인트 로드. 서빙처럼 읽기만 할 때는 mmap_mode='r'로 복사 없이 매핑
+        w, v는 앞 N행이고 파일의 나머지 행은 grow가 복사 없이 쓰는 여유 용량"""
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        params = {key: info[key] for key in ('alpha', 'beta', 'l2_reg', 'batch_size')}
+        params.update(kwargs)
+        model = cls(1, info['K'], **params)
+        w_buf = np.load(os.path.join(path, 'w.npy'), mmap_mode=mmap_mode)
+        v_buf = np.load(os.path.join(path, 'v.npy'), mmap_mode=mmap_mode)
+        # capacity가 없는 이전 체크포인트는 파일 전체가 N행
+        model._set_buffers(w_buf, v_buf, info.get('N', len(w_buf)))
+        model.meta = {key: value for key, value in info.items()
+                      if key not in ('N', 'capacity', 'K', 'alpha', 'beta', 'l2_reg', 'batch_size', 'saved_at')}
+        return model
+
+    # 데이터 중 하나의 행에 대한 예측값을 계산하는 함수
+    def predict(self,idx,x):
+        x_0 = np.array(x)
+        x_1 = x_0.reshape(-1,1)
+
+        # 편향값 계산
+        bias_score = np.sum(self.w[idx]*x_0)
+
+        # score 계산
+        vx = self.v[idx] * (x_1)
+        sum_vx = np.sum(vx,axis = 0)
+        sum_vx_2 = np.sum(vx*vx,axis = 0)
+        latent_score = 0.5 * np.sum(np.square(sum_vx) - sum_vx_2)
+
+        # 예측값 계산
+        y_hat = bias_score + latent_score
+        return y_hat
+
+def legacy_sgd(w, v, x_data, y_data, alpha, beta):
+    # 노트북 FM.sgd의 샘플 단위 파이썬 루프 (벤치마크 비교용)
+    y_pred = []
+    for data, y in zip(x_data, y_data):
+        x_idx = data[0]
+        x_0 = np.array(data[1])
+        x_1 = x_0.reshape(-1, 1)
+        bias_score = np.sum(w[x_idx] * x_0)
+        vx = v[x_idx] * (x_1)
+        sum_vx = np.sum(vx, axis=0)
+        sum_vx_2 = np.sum(vx * vx, axis=0)
+        latent_score = 0.5 * np.sum(np.square(sum_vx) - sum_vx_2)
+        y_hat = bias_score + latent_score
+        y_pred.append(y_hat)
+        error = y - y_hat
+        w[x_idx] += error * alpha * (x_0 - beta * w[x_idx])
+        v[x_idx] += error * alpha * ((x_1) * sum(vx) - (vx * x_1) - beta * v[x_idx])
+    return RMSE(y_data, y_pred)
+
+def benchmark(n_ratings=1_000_000, n_users=50_000, n_items=5_000, K=32, legacy_rows=100_000):
+    """합성 데이터(유저+아이템 one-hot)로 1 epoch 학습/예측 시간 비교"""
+    rng = np.random.default_rng(0)
+    users = rng.integers(0, n_users, n_ratings)
+    items = rng.integers(0, n_items, n_ratings) + n_users
+    y = rng.integers(1, 6, n_ratings).astype(np.float64)
+    y -= y.mean()
+    N = n_users + n_items
+
+    indptr = np.arange(0, 2 * n_ratings + 1, 2, dtype=np.int64)
+    indices = np.empty(2 * n_ratings, dtype=np.int32)
+    indices[0::2], indices[1::2] = users, items
+    values = np.ones(2 * n_ratings, dtype=np.float32)
+    csr = (indptr, indices, values)
+
+    engines = ['batch'] + (['numba'] if njit is not None else [])
+    for engine in engines:
+        fm = FM(N, K, csr, y, alpha=0.0014, beta=0.075, train_ratio=1.0, engine=engine, seed=0)
+        if engine == 'numba':
+            fm.sgd(slice_csr(fm.train_x, 0, 10), fm.train_y[:10])  # JIT 컴파일 제외
+        start = time.perf_counter()
+        fm.sgd(fm.train_x, fm.train_y)
+        train_s = time.perf_counter() - start
+        start = time.perf_counter()
+        fm.predict_many(csr)
+        predict_s = time.perf_counter() - start
+        print(f"{engine:>6}: sgd 1 epoch {train_s:.2f}s ({n_ratings / train_s:,.0f} rows/s), predict_many {predict_s:.2f}s")
+
+    # 노트북 구현은 느려서 일부 행만 돌려 1M 행 기준으로 환산
+    data = [[[int(u), int(i)], [1, 1]] for u, i in zip(users[:legacy_rows], items[:legacy_rows])]
+    w = rng.normal(scale=1. / N, size=N)
+    v = rng.normal(scale=1. / K, size=(N, K))
+    start = time.perf_counter()
+    legacy_sgd(w, v, data, y[:legacy_rows], 0.0014, 0.075)
+    legacy_s = (time.perf_counter() - start) * n_ratings / legacy_rows
+    print(f"legacy: sgd 1 epoch ~{legacy_s:.1f}s ({legacy_rows:,}행 측정 후 환산)")
+
+# 사용 예시: python fm_model.py [n_ratings]
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
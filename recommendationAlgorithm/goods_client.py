@@ -0,0 +1,111 @@
+import asyncio
+import sqlite3
+import time
+
+import aiohttp
+
+# 인터파크 상품 요약 API (goodsName 조회용)
+GOODS_API_URL = "https://api-ticketfront.interpark.com/v1/goods/{goods_code}/summary"
+CACHE_PATH = "goods_names.sqlite"
+REQUEST_TIMEOUT = 10
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept": "application/json",
+}
+
+class GoodsNameClient:
+    """GoodsCode → goodsName 조회. 메모리/SQLite 캐시를 먼저 보고, 없을 때만 JSON API를 직접 호출"""
+    def __init__(self, cache_path=CACHE_PATH, api_url=GOODS_API_URL, timeout=REQUEST_TIMEOUT, throttle=None):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.throttle = throttle  # wait(url)을 가진 객체 (crawl_review.HostThrottle)
+        self.session = None
+        self.memory = {}
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.fetch_seconds = []
+
+        self.conn = sqlite3.connect(cache_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS goods_names (goods_code TEXT PRIMARY KEY, goods_name TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(headers=HEADERS, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.conn.close()
+
+    def _load(self, goods_code):
+        row = self.conn.execute("SELECT goods_name FROM goods_names WHERE goods_code = ?", (goods_code,)).fetchone()
+        return row[0] if row else None
+
+    def _save(self, goods_code, goods_name):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO goods_names (goods_code, goods_name, fetched_at) VALUES (?, ?, ?)",
+            (goods_code, goods_name, time.time()),
+        )
+        self.conn.commit()
+
+    async def _fetch(self, goods_code):
+        url = self.api_url.format(goods_code=goods_code)
+        if self.throttle is not None:
+            await self.throttle.wait(url)
+        start = time.perf_counter()
+        try:
+            async with self.session.get(url) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        finally:
+            self.fetch_seconds.append(time.perf_counter() - start)
+        return (data.get('data') or {}).get('goodsName')
+
+    async def get_name(self, goods_code):
+        if goods_code in self.memory:
+            self.hits += 1
+            return self.memory[goods_code]
+
+        goods_name = self._load(goods_code)
+        if goods_name is not None:
+            self.hits += 1
+            self.memory[goods_code] = goods_name
+            return goods_name
+
+        # 같은 코드를 동시에 요청하면 한 번만 호출
+        if goods_code in self.inflight:
+            self.hits += 1
+            try:
+                return await self.inflight[goods_code]
+            except Exception:
+                return None
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._fetch(goods_code))
+        self.inflight[goods_code] = task
+        try:
+            goods_name = await task
+        except Exception as e:
+            print(f"Error fetching goods summary for {goods_code}: {e}")
+            return None
+        finally:
+            del self.inflight[goods_code]
+
+        if goods_name:
+            self.memory[goods_code] = goods_name
+            self._save(goods_code, goods_name)
+        return goods_name
+
+    def stats(self):
+        total = self.hits + self.misses
+        latencies = sorted(self.fetch_seconds)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "fetch_p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+            "fetch_max_ms": latencies[-1] * 1000 if latencies else None,
+        }
@@ -0,0 +1,54 @@
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+from encoding import ENCODER_PATH, FeatureEncoder
+from fm_model import CHECKPOINT_DIR, FM
+from review_sink import SINK_PATH
+
+ONLINE_EPOCHS = 3   # 새 평점에 대해 돌릴 SGD 횟수
+
+def load_new_ratings(sink_path=SINK_PATH, after_rowid=0):
+    """리뷰 DB에서 마지막 학습 이후 추가된 평점만 읽어 노트북과 같은 전처리 적용"""
+    conn = sqlite3.connect(sink_path)
+    try:
+        DF = pd.read_sql_query(
+            "SELECT rowid, title, userid, star_rating FROM reviews WHERE rowid > ? AND star_rating IS NOT NULL ORDER BY rowid",
+            conn, params=(after_rowid,),
+        )
+    finally:
+        conn.close()
+    # "NONAME"이 포함된 행 제거, 중복 제거 (MF_model.ipynb와 동일)
+    DF = DF[DF["title"] != "NO NAME"]
+    return DF.drop_duplicates(subset=["title", "userid", "star_rating"])
+
+def online_update(sink_path=SINK_PATH, checkpoint=CHECKPOINT_DIR, encoder_path=ENCODER_PATH, epochs=ONLINE_EPOCHS, since_rowid=None):
+    """체크포인트에 새 유저/아이템을 추가하고 새 평점만으로 학습 (CSV 전체 재학습 대신 매일 실행)"""
+    start = time.perf_counter()
+    model = FM.load(checkpoint)
+    encoder = FeatureEncoder.load(encoder_path)
+    # 체크포인트에 기록이 없으면(노트북으로 처음 학습한 직후) 리뷰 DB 전체를 새 데이터로 본다
+    last_rowid = model.meta.get('last_review_rowid', 0) if since_rowid is None else since_rowid
+
+    DF = load_new_ratings(sink_path, last_rowid)
+    if DF.empty:
+        print("✅ 새 평점 없음, 체크포인트 그대로 유지")
+        return None
+
+    new_users, new_items = encoder.extend(DF)
+    model.grow(encoder.num_x)
+    # 전체 편향값 w0는 처음 학습할 때 값을 유지해야 기존 w, v와 맞는다
+    data, y = encoder.transform(DF)
+    rmse = model.partial_fit(data, y, epochs=epochs)
+
+    model.save(checkpoint, last_review_rowid=int(DF["rowid"].max()), trained_ratings=model.meta.get('trained_ratings', 0) + len(DF))
+    encoder.save(encoder_path)
+    print(f"🔁 온라인 업데이트: 평점 {len(DF)}개, 새 유저 {new_users}명, 새 공연 {new_items}개, "
+          f"Train RMSE {rmse[-1]:.4f}, {time.perf_counter() - start:.2f}s")
+    return rmse
+
+# 사용 예시: python online_update.py [since_rowid]
+if __name__ == '__main__':
+    online_update(since_rowid=int(sys.argv[1]) if len(sys.argv) > 1 else None)
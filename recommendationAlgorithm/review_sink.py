@@ -0,0 +1,140 @@
+import csv
+import itertools
+import os
+import re
+import sqlite3
+from urllib.parse import parse_qs, urlparse
+
+SINK_PATH = "interpark_reviews.sqlite"
+CSV_PATH = "interpark_reviews.csv"
+LEGACY_PAGE = 0   # 기존 CSV에서 가져온 리뷰의 page_no (내보낼 때 맨 앞에 온다)
+
+# interpark_reviews.csv(MF_model.ipynb 입력)와 같은 열 순서
+CSV_COLUMNS = ['url', 'title', 'review', 'view', 'likes', 'stars', 'blank', 'userid', 'date', 'star_rating']
+
+def review_id(url):
+    """리뷰 상세 URL의 글 번호(no). 목록의 pageno도 URL에 들어가 있어 URL만으로는 같은 리뷰인지 알 수 없다"""
+    values = parse_qs(urlparse(url or '').query).get('no')
+    return to_int(values[0]) if values else None
+
+def to_int(value):
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    digits = re.sub(r'[^\d]', '', str(value))
+    return int(digits) if digits else None
+
+class ReviewSink:
+    """리뷰를 페이지 단위로 바로 SQLite에 쓰는 저장소. 리뷰 글 번호(review_id)로 중복을 거른다.
+    목록은 최신순이라 새 리뷰가 올라오면 페이지 번호가 밀리므로 페이지 번호 대신 글 번호로 이어서 수집한다"""
+    def __init__(self, path=SINK_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS reviews (
+                url TEXT NOT NULL,
+                userid TEXT NOT NULL,
+                title TEXT,
+                review TEXT,
+                star_rating INTEGER,
+                view INTEGER,
+                likes INTEGER,
+                stars TEXT,
+                blank TEXT,
+                date TEXT,
+                page_no INTEGER NOT NULL,
+                review_id INTEGER,
+                UNIQUE (userid, url)
+            );
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(reviews)")}
+        if 'review_id' not in columns:
+            self._add_review_ids()
+        # 페이지 번호 체크포인트는 페이지가 밀리면 어긋나므로 더 쓰지 않는다
+        self.conn.execute("DROP TABLE IF EXISTS completed_pages")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS reviews_review_id ON reviews (review_id)")
+        self.conn.commit()
+
+    def _add_review_ids(self):
+        # 이전 스키마는 pageno가 다른 URL로 같은 리뷰를 여러 번 저장했을 수 있어, 글 번호를 채우고 먼저 저장된 행만 남긴다
+        self.conn.execute("ALTER TABLE reviews ADD COLUMN review_id INTEGER")
+        seen = set()
+        for rowid, url in self.conn.execute("SELECT rowid, url FROM reviews ORDER BY rowid").fetchall():
+            rid = review_id(url)
+            if rid in seen:
+                self.conn.execute("DELETE FROM reviews WHERE rowid = ?", (rowid,))
+                continue
+            if rid is not None:
+                seen.add(rid)
+                self.conn.execute("UPDATE reviews SET review_id = ? WHERE rowid = ?", (rid, rowid))
+
+    def known_ids(self, ids):
+        """ids 중 이미 저장된 리뷰 글 번호"""
+        ids = [rid for rid in ids if rid is not None]
+        if not ids:
+            return set()
+        placeholders = ', '.join('?' * len(ids))
+        return {row[0] for row in self.conn.execute(f"SELECT review_id FROM reviews WHERE review_id IN ({placeholders})", ids)}
+
+    def newest_review_id(self):
+        return self.conn.execute("SELECT MAX(review_id) FROM reviews").fetchone()[0]
+
+    def _insert(self, page_no, rows):
+        records = (
+            (
+                row.get('url'), row.get('userid'), row.get('title'), row.get('review'),
+                to_int(row.get('star_rating')), to_int(row.get('view')), to_int(row.get('likes')),
+                row.get('stars'), row.get('blank'), row.get('date'), page_no, review_id(row.get('url')),
+            )
+            # 작성자가 없는 행(공지 등)은 저장하지 않는다
+            for row in rows if row.get('url') and row.get('userid')
+        )
+        before = self.conn.total_changes
+        self.conn.executemany(
+            """INSERT OR IGNORE INTO reviews
+               (url, userid, title, review, star_rating, view, likes, stars, blank, date, page_no, review_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            records,
+        )
+        return self.conn.total_changes - before
+
+    def write_page(self, page_no, rows):
+        """한 페이지의 리뷰를 하나의 트랜잭션으로 기록. 이미 있는 글 번호는 무시하고 새로 들어간 리뷰 수를 반환"""
+        with self.conn:
+            return self._insert(page_no, rows)
+
+    def import_csv(self, path=CSV_PATH):
+        """기존 CSV의 리뷰를 싱크에 합친다 (이미 있는 글 번호는 무시). 새로 들어간 리뷰 수를 반환"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return 0
+            # 헤더 없이 이어 붙인 파일이면 첫 줄도 데이터
+            if 'url' in header and 'userid' in header:
+                columns, lines = header, reader
+            else:
+                columns, lines = CSV_COLUMNS, itertools.chain([header], reader)
+            with self.conn:
+                return self._insert(LEGACY_PAGE, (dict(zip(columns, values)) for values in lines))
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def export_csv(self, path=CSV_PATH):
+        """노트북 입력용 CSV로 내보내기 (커서로 한 줄씩 써서 메모리 사용 일정).
+        임시 파일에 다 쓴 뒤 교체하므로 중간에 실패해도 기존 CSV는 그대로 남는다"""
+        cursor = self.conn.execute(f"SELECT {', '.join(CSV_COLUMNS)} FROM reviews ORDER BY page_no, rowid")
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(cursor)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        self.conn.close()
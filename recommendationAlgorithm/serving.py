@@ -0,0 +1,209 @@
+import os
+import re
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+# 루트 모듈(dailyFiles) 공유
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from dailyFiles import OUTPUT_DIR, listDailyFiles, loadDailyConcerts
+from content_features import infer_factors
+from encoding import ENCODER_PATH, FeatureEncoder
+from fm_model import CHECKPOINT_DIR, FM
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+FACTORS_PATH = CHECKPOINT_DIR
+TOP_K = 10
+USER_BATCH = 256          # 한 번에 행렬곱할 유저 수
+LATENCY_WINDOW = 10_000   # p50/p99 계산에 쓰는 최근 요청 수
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+
+def save_factors(model, path=FACTORS_PATH):
+    # 학습된 FM의 w, v를 체크포인트(w.npy, v.npy, meta.json)로 저장
+    model.save(path)
+
+def load_factors(path=FACTORS_PATH):
+    """w, v를 연속된 float32 배열로 로드 (체크포인트는 메모리 매핑으로 읽는다)"""
+    model = FM.load(path, mmap_mode='r')
+    w = np.ascontiguousarray(model.w, dtype=np.float32)
+    v = np.ascontiguousarray(model.v, dtype=np.float32)
+    return w, v
+
+def normalize_title(title):
+    return re.sub(r'\s+', ' ', str(title or '')).strip()
+
+def load_candidates(outputDir=os.path.join(ROOT_DIR, OUTPUT_DIR), days=None):
+    """crawl_new_concerts의 일별 파일에서 추천 후보 공연 목록 (예매링크 기준 중복 제거)"""
+    files = listDailyFiles(outputDir)
+    if days:
+        files = files[-days:]
+    candidates = {}
+    for path in files:
+        for concert in loadDailyConcerts(path):
+            name = normalize_title(concert.get('concert_name'))
+            if name:
+                candidates[concert.get('booking_link') or name] = concert
+    return list(candidates.values())
+
+# FM 점수 = w0 + w_u + w_i + <v_u, v_i> 이므로 유저별 순위는 w_i + <v_u, v_i>로 결정된다
+class Recommender() :
+    def __init__(self, w, v, encoder, candidates=None, content=None):
+        self.w = np.ascontiguousarray(w, dtype=np.float32)
+        self.v = np.ascontiguousarray(v, dtype=np.float32)
+        self.encoder = encoder
+        self.index = None
+        self.index_backend = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW) # 요청별 처리 시간(ms)
+        if candidates is None:
+            self.set_candidates(list(encoder.items))
+        else:
+            self.set_candidates(candidates, content)
+
+    @classmethod
+    def load(cls, factors_path=FACTORS_PATH, encoder_path=ENCODER_PATH, candidates=None, content=None):
+        w, v = load_factors(factors_path)
+        return cls(w, v, FeatureEncoder.load(encoder_path), candidates, content)
+
+    def set_candidates(self, candidates, content=None):
+        """후보 공연(공연명 문자열 또는 크롤링 dict)을 학습된 아이템에 매칭하고 아이템 행렬을 미리 모아둔다.
+        content(ContentFeatures)를 주면 리뷰가 없는 신규 공연도 콘텐츠가 비슷한 공연의 요인으로 추정해 포함"""
+        concerts = [c if isinstance(c, dict) else {'concert_name': c} for c in candidates]
+        titles = [normalize_title(c.get('concert_name')) for c in concerts]
+        known = {normalize_title(item): item for item in self.encoder.items}
+        matched = [title for title in dict.fromkeys(titles) if title in known]
+        pos = self.encoder.item_index([known[title] for title in matched]) if matched else np.empty(0, dtype=np.int32)
+        item_w, item_v = self.w[pos], self.v[pos]
+
+        cold = []
+        if content is not None and len(content):
+            seen = set(matched)
+            cold = [c for c, title in zip(concerts, titles) if title and title not in seen and not seen.add(title)]
+            rows = content.rows(cold)
+            cold = [c for c, row in zip(cold, rows) if row >= 0]
+            # 콘텐츠 피처가 있으면서 학습된 공연들이 추정의 기준이 된다
+            known_rows = [i for i, name in enumerate(content.names) if normalize_title(name) in known]
+            if cold and known_rows:
+                known_pos = self.encoder.item_index([known[normalize_title(content.names[i])] for i in known_rows])
+                cold_w, cold_v = infer_factors(content.matrix, rows[rows >= 0], known_rows, self.w[known_pos], self.v[known_pos])
+                item_w = np.concatenate([item_w, cold_w])
+                item_v = np.vstack([item_v, cold_v])
+            else:
+                cold = []
+
+        self.titles = np.array(matched + [normalize_title(c.get('concert_name')) for c in cold], dtype=object)
+        self.item_w = np.ascontiguousarray(item_w, dtype=np.float32)
+        self.item_v = np.ascontiguousarray(item_v, dtype=np.float32)
+        self.index = None
+        self.index_backend = None
+        # (학습된 공연 수, 콘텐츠로 추정한 신규 공연 수, 요인이 없어 빠진 공연 수)
+        return len(matched), len(cold), len(set(titles)) - len(matched) - len(cold)
+
+    def build_index(self, backend='auto'):
+        """대형 카탈로그용 ANN 인덱스 (faiss/hnswlib가 설치된 경우만)"""
+        if backend == 'auto':
+            backend = 'faiss' if faiss is not None else 'hnswlib' if hnswlib is not None else None
+        if backend is None:
+            print("⚠️ faiss/hnswlib가 없어 정확한 행렬곱 검색을 사용합니다.")
+            return None
+        # 내적 검색 한 번으로 w_i + <v_u, v_i>를 구하도록 아이템 벡터에 w_i, 유저 벡터에 1을 붙인다
+        items = np.ascontiguousarray(np.hstack([self.item_v, self.item_w[:, None]]))
+        if backend == 'faiss':
+            index = faiss.IndexHNSWFlat(items.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.add(items)
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif backend == 'hnswlib':
+            index = hnswlib.Index(space='ip', dim=items.shape[1])
+            index.init_index(max_elements=len(items), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            index.add_items(items, np.arange(len(items)))
+            index.set_ef(HNSW_EF_SEARCH)
+        else:
+            raise ValueError(f"unknown ANN backend: {backend}")
+        self.index = index
+        self.index_backend = backend
+        return backend
+
+    def _user_vectors(self, user_ids):
+        pos = self.encoder.user_index(user_ids)
+        vecs = self.v[np.maximum(pos, 0)]
+        # 처음 보는 유저는 잠재벡터 0 -> 아이템 편향(w_i) 순으로 추천
+        vecs[pos < 0] = 0
+        return vecs
+
+    def _exact(self, users, k):
+        scores = users @ self.item_v.T
+        scores += self.item_w
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def _ann(self, users, k):
+        queries = np.ascontiguousarray(np.hstack([users, np.ones((len(users), 1), dtype=np.float32)]))
+        if self.index_backend == 'faiss':
+            scores, top = self.index.search(queries, k)
+        else:
+            top, dist = self.index.knn_query(queries, k=k)
+            scores = 1 - dist # hnswlib의 ip 거리는 1 - 내적
+        return top, scores
+
+    def recommend(self, user_ids, k=TOP_K):
+        """유저 목록 -> 유저별 [(공연명, 점수), ...] 상위 k개"""
+        start = time.perf_counter()
+        k = min(k, len(self.titles))
+        results = []
+        if k == 0:
+            results = [[] for _ in user_ids]
+        for b in range(0, len(user_ids) if k else 0, USER_BATCH):
+            users = self._user_vectors(user_ids[b:b + USER_BATCH])
+            top, scores = self._ann(users, k) if self.index is not None else self._exact(users, k)
+            for row, row_scores in zip(top, scores):
+                results.append([(self.titles[i], float(s)) for i, s in zip(row, row_scores) if i >= 0])
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        return results
+
+    def latency(self):
+        if not self.latencies:
+            return {"requests": 0, "p50_ms": None, "p99_ms": None}
+        ms = np.fromiter(self.latencies, dtype=np.float64)
+        return {"requests": len(ms), "p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99))}
+
+def benchmark(n_users=50_000, n_items=100_000, K=64, batch=64, n_requests=200, seed=0):
+    # 합성 요인으로 정확 검색 / ANN 검색의 요청 지연시간과 recall 비교
+    rng = np.random.default_rng(seed)
+    encoder = FeatureEncoder([f'user{i}' for i in range(n_users)], [f'concert{i}' for i in range(n_items)])
+    w = rng.normal(scale=0.1, size=encoder.num_x).astype(np.float32)
+    v = rng.normal(scale=0.1, size=(encoder.num_x, K)).astype(np.float32)
+    server = Recommender(w, v, encoder)
+    requests = [[f'user{i}' for i in rng.integers(0, n_users, batch)] for _ in range(n_requests)]
+
+    exact = [server.recommend(users) for users in requests]
+    stats = server.latency()
+    print(f"📊 정확 검색 ({n_items} items, {batch} users/request): p50 {stats['p50_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms")
+
+    start = time.perf_counter()
+    if server.build_index() is None:
+        return
+    print(f"🏗️ {server.index_backend} 인덱스 생성: {time.perf_counter() - start:.1f}s")
+    server.latencies.clear()
+    approx = [server.recommend(users) for users in requests]
+    stats = server.latency()
+    hits = sum(len({t for t, _ in a} & {t for t, _ in e}) for ra, re_ in zip(approx, exact) for a, e in zip(ra, re_))
+    recall = hits / sum(len(e) for re_ in exact for e in re_)
+    print(f"⚡ ANN 검색: p50 {stats['p50_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms, recall@{TOP_K} {recall:.3f}")
+
+if __name__ == '__main__':
+    benchmark()
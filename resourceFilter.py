@@ -0,0 +1,121 @@
+import json
+import sys
+import time
+
+# 단계별로 필요한 리소스 종류만 허용 (DOM 텍스트와 img src 속성만 쓰므로 이미지/폰트/미디어는 불필요)
+STAGE_ALLOW = {
+    "notice_list": {"document", "script", "xhr", "fetch"},   # 목록은 무한 스크롤이라 JS/XHR 필요
+    "detail": {"document", "script", "xhr", "fetch"},
+    "review": {"document", "script", "xhr", "fetch"},        # 리뷰 게시판은 iframe + JS
+    "api": {"document", "xhr", "fetch"},                      # goods summary JSON
+}
+
+# 허용 종류라도 막을 서드파티 분석/광고 스크립트
+BLOCKED_HOSTS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net",
+    "criteo.com", "criteo.net", "kakaopixel", "wcs.naver.net", "adsrvr.org", "mixpanel.com",
+]
+
+# Chrome CDP Network.setBlockedURLs 패턴 (리소스 종류 대신 URL로 막는다)
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+] + [f"*{host}*" for host in BLOCKED_HOSTS]
+
+# 측정 모드: performance 로그로 네트워크 전송 바이트 수집
+def measuringOptions(options):
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+def applyChromeOptions(options, measure: bool = False):
+    """이미지 로딩을 끄는 Chrome prefs 적용. measure=True면 바이트 측정을 위해 performance 로그 활성화"""
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    return measuringOptions(options) if measure else options
+
+def installCdpBlocking(driver, patterns: list[str] = BLOCKED_URL_PATTERNS):
+    # 폰트/서드파티 스크립트는 prefs로 막을 수 없어 CDP로 차단
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+def isBlocked(resourceType: str, url: str, stage: str) -> bool:
+    if resourceType not in STAGE_ALLOW[stage]:
+        return True
+    return any(host in url for host in BLOCKED_HOSTS)
+
+class RouteStats:
+    def __init__(self):
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type: dict[str, int] = {}
+
+    def as_dict(self) -> dict:
+        return {"allowed": self.allowed, "blocked": self.blocked, "blocked_by_type": self.blocked_by_type}
+
+def makeRouteHandler(stage: str, stats: RouteStats | None = None):
+    """Playwright page.route용 핸들러"""
+    async def handler(route):
+        request = route.request
+        if isBlocked(request.resource_type, request.url, stage):
+            if stats is not None:
+                stats.blocked += 1
+                stats.blocked_by_type[request.resource_type] = stats.blocked_by_type.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            if stats is not None:
+                stats.allowed += 1
+            await route.continue_()
+    return handler
+
+def attachToCrawler(crawler, stage: str, stats: RouteStats | None = None):
+    """crawl4ai AsyncWebCrawler의 새 페이지마다 리소스 필터 라우팅을 건다"""
+    async def onPageContextCreated(page, context=None, **kwargs):
+        await page.route("**/*", makeRouteHandler(stage, stats))
+        return page
+
+    crawler.crawler_strategy.set_hook("on_page_context_created", onPageContextCreated)
+    return crawler
+
+def pageBytes(driver) -> int:
+    # performance 로그의 loadingFinished 이벤트로 전송 바이트 합산 (로그는 읽으면 비워진다)
+    total = 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.loadingFinished":
+            total += message["params"].get("encodedDataLength", 0)
+    return total
+
+def measurePage(driver, url: str) -> dict:
+    driver.get_log("performance")
+    start = time.perf_counter()
+    driver.get(url)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "bytes": pageBytes(driver)}
+
+def compare(urls: list[str]):
+    """필터 적용/미적용 드라이버로 같은 페이지를 열어 페이지당 절약된 바이트와 시간을 출력"""
+    from selenium import webdriver
+    from browserPool import defaultOptions
+
+    plain = webdriver.Chrome(options=measuringOptions(defaultOptions()))
+    filtered = webdriver.Chrome(options=applyChromeOptions(defaultOptions(), measure=True))
+    installCdpBlocking(filtered)
+    try:
+        for url in urls:
+            before = measurePage(plain, url)
+            after = measurePage(filtered, url)
+            print(
+                f"{url}\n  bytes {before['bytes']:,} → {after['bytes']:,} (절약 {before['bytes'] - after['bytes']:,})"
+                f"\n  time  {before['seconds']:.2f}s → {after['seconds']:.2f}s (절약 {before['seconds'] - after['seconds']:.2f}s)"
+            )
+    finally:
+        plain.quit()
+        filtered.quit()
+
+# 사용 예시: python resourceFilter.py https://tickets.interpark.com/contents/notice?Genre=CONCERT
+if __name__ == "__main__":
+    compare(sys.argv[1:])
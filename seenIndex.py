@@ -0,0 +1,65 @@
+import json
+import os
+import re
+
+from dailyFiles import OUTPUT_DIR, listDailyFiles, loadDailyConcerts
+
+# 이전 실행에서 본 목록 라벨을 저장하는 상태 파일
+STATE_PATH = os.path.join("crawl_state", "seen_labels.json")
+
+def normalizeName(name: str) -> str:
+    return re.sub(r"\s+", " ", name).strip().lower()
+
+class SeenIndex:
+    """이전 결과(crawl_new_concerts/*.json)와 상태 파일로 만든 '이미 본 공연' 인덱스"""
+    def __init__(self, outputDir: str = OUTPUT_DIR, statePath: str = STATE_PATH):
+        self.statePath = statePath
+        self.labels: set[str] = set()
+        self.links: set[str] = set()
+        self.names: set[str] = set()
+        # 이번 실행에서 새로 발견한 링크 → 라벨, 파싱까지 성공한 링크 (결과 저장 후 commit)
+        self.pending: dict[str, str] = {}
+        self.succeeded: set[str] = set()
+
+        for path in listDailyFiles(outputDir):
+            for concert in loadDailyConcerts(path):
+                if concert.get("booking_link"):
+                    self.links.add(concert["booking_link"])
+                if concert.get("concert_name"):
+                    self.names.add(normalizeName(concert["concert_name"]))
+
+        if os.path.exists(statePath):
+            with open(statePath, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.labels.update(state.get("labels", []))
+            self.links.update(state.get("links", []))
+
+    def isKnown(self, label: str, link: str | None = None) -> bool:
+        if label in self.labels or normalizeName(label) in self.names:
+            return True
+        return bool(link) and link in self.links
+
+    def markPending(self, label: str, link: str):
+        self.pending[link] = label
+
+    def markSucceeded(self, link: str):
+        self.succeeded.add(link)
+
+    def commit(self):
+        """결과에 저장된 공연만 본 것으로 기록 (실패한 공연은 다음 실행에서 다시 시도)"""
+        for link, label in self.pending.items():
+            if link in self.succeeded:
+                self.labels.add(label)
+                self.links.add(link)
+        self.pending = {}
+        self.succeeded = set()
+
+        os.makedirs(os.path.dirname(self.statePath), exist_ok=True)
+        with open(self.statePath, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"labels": sorted(self.labels), "links": sorted(self.links)},
+                f, ensure_ascii=False, indent=2,
+            )
+
+    def __len__(self):
+        return len(self.links | self.labels)
@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+# uploader.uploadConcerts가 보내는 저장 API 흉내 (tests/test_uploader.py와 uploader.benchmark가 같이 쓴다)
+async def startStub(failFirst: int = 0, delay: float = 0.0):
+    """저장 API 스텁: gzip NDJSON/JSON을 받아 요청마다 (멱등 키, 공연 수, 응답 코드)를 log에 남긴다.
+    failFirst를 주면 멱등 키마다 첫 요청은 그 상태 코드로 실패, concert_name이 없는 공연이 있으면 422"""
+    stored: dict[str, dict] = {}
+    log: list[tuple[str, int, int]] = []
+    seenKeys: set[str] = set()
+    attempted: set[str] = set()
+
+    async def save(request: web.Request):
+        await asyncio.sleep(delay)
+        key = request.headers.get("Idempotency-Key")
+        # 일시적인 오류 흉내 (본문을 읽기 전이라 저장되지 않음)
+        if failFirst and key not in attempted:
+            attempted.add(key)
+            log.append((key, 0, failFirst))
+            return web.Response(status=failFirst, headers={"Retry-After": "0"})
+        # Content-Encoding: gzip 본문은 aiohttp가 풀어서 준다
+        body = await request.read()
+        if request.content_type == "application/x-ndjson":
+            concerts = [json.loads(line) for line in body.decode("utf-8").splitlines() if line]
+        else:
+            concerts = json.loads(body)
+        if key in seenKeys:
+            log.append((key, len(concerts), 200))
+            return web.json_response({"saved": 0, "duplicate": True})
+        if any(not concert.get("concert_name") for concert in concerts):
+            log.append((key, len(concerts), 422))
+            return web.json_response({"error": "concert_name is required"}, status=422)
+        for concert in concerts:
+            stored[concert["booking_link"]] = concert
+        if key:
+            seenKeys.add(key)
+        log.append((key, len(concerts), 200))
+        return web.json_response({"saved": len(concerts)})
+
+    app = web.Application(client_max_size=256 * 2**20)
+    app.router.add_post("/save", save)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    port = runner.addresses[0][1]
+    return runner, stored, log, f"http://127.0.0.1:{port}/save"
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 루트 모듈과 recommendationAlgorithm 모듈(같은 폴더 기준 import)을 테스트에서 바로 import
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, "recommendationAlgorithm")]
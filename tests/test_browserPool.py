@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+import browserPool
+from browserPool import BrowserPool
+
+class FakeChrome:
+    """webdriver.Chrome 대역: failAt번째 실행은 Chrome을 못 띄운 것처럼 실패"""
+    launched: list["FakeChrome"] = []
+    failed: list[int] = []
+    failAt: set[int] = set()
+
+    def __init__(self, options=None):
+        number = len(FakeChrome.launched) + len(FakeChrome.failed)
+        if number in FakeChrome.failAt:
+            FakeChrome.failed.append(number)
+            raise RuntimeError(f"chrome {number} failed to start")
+        self.quitCalled = False
+        FakeChrome.launched.append(self)
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        self.quitCalled = True
+
+@pytest.fixture
+def chrome(monkeypatch):
+    FakeChrome.launched, FakeChrome.failed, FakeChrome.failAt = [], [], set()
+    monkeypatch.setattr(browserPool.webdriver, "Chrome", FakeChrome)
+    return FakeChrome
+
+def test_start_failure_quits_started_drivers(chrome):
+    chrome.failAt = {1}
+    pool = BrowserPool(size=3, block_resources=False)
+    with pytest.raises(RuntimeError, match="chrome 1"):
+        asyncio.run(pool.start())
+    assert len(chrome.launched) == 2
+    assert all(driver.quitCalled for driver in chrome.launched)
+    assert pool.page_counts == {} and pool.idle.empty()
+
+def test_failed_relaunch_keeps_slot(chrome):
+    async def run():
+        pool = await BrowserPool(size=1, max_pages_per_driver=1, block_resources=False).start()
+        # 재생성이 실패하면 빈 자리(None)로 돌아가고, 다음 acquire에서 다시 띄운다
+        chrome.failAt = {1}
+        async with pool.driver():
+            pass
+        assert pool.idle.qsize() == 1
+        driver = await asyncio.wait_for(pool.acquire(), 1)
+        assert driver is chrome.launched[-1] and not driver.quitCalled
+        await pool.release(driver, pages=0)
+        await pool.shutdown()
+
+    asyncio.run(run())
+    assert all(driver.quitCalled for driver in chrome.launched)
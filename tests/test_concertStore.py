@@ -0,0 +1,107 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from concertStore import ConcertStore
+
+def concert(link="https://tickets.example/1", **fields):
+    base = {
+        "concert_name": "2025 아무개 콘서트",
+        "genre": "발라드",
+        "venue": "올림픽홀",
+        "running_time": 120,
+        "ticket_status": False,
+        "casting": [{"name": "아무개"}],
+        "performance_rounds": [{"round": 1, "datetime": "2025-09-13T18:00:00"}],
+        "price": {"R": 132000, "S": 110000},
+        "ticket_open_dates": {"일반 예매": "2025-08-20T20:00:00"},
+        "booking_link": link,
+    }
+    return {**base, **fields}
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConcertStore(str(tmp_path / "concerts.sqlite"))
+    yield store
+    store.close()
+
+def test_older_file_does_not_overwrite_newer(store):
+    store.upsertMany([concert(venue="KSPO DOME", price={"VIP": 165000})], "2025-08-02")
+    assert store.upsertMany([concert(venue="올림픽홀")], "2025-08-01") == 0
+
+    saved = store.get("https://tickets.example/1")
+    assert saved["venue"] == "KSPO DOME"
+    assert saved["price"] == {"VIP": 165000}
+
+def test_null_does_not_erase_value(store):
+    store.upsertMany([concert()], "2025-08-01")
+    # 새 레코드에 비어 있는 스칼라 값과 자식 테이블은 기존 값을 유지하고, 값이 있는 필드만 바뀐다
+    store.upsertMany([concert(running_time=None, venue=None, price=None, casting=[], ticket_status=True)], "2025-08-02")
+
+    saved = store.get("https://tickets.example/1")
+    assert (saved["running_time"], saved["venue"], saved["ticket_status"]) == (120, "올림픽홀", True)
+    assert saved["price"] == {"R": 132000, "S": 110000}
+    assert saved["casting"] == [{"name": "아무개"}]
+
+def writeDaily(folder, day, concerts):
+    with open(os.path.join(folder, f"{day}.json"), "w", encoding="utf-8") as f:
+        json.dump(concerts, f, ensure_ascii=False)
+
+def test_reimport_is_noop(store, tmp_path):
+    folder = tmp_path / "crawl_new_concerts"
+    folder.mkdir()
+    writeDaily(folder, "2025-08-01", [concert(), concert("https://tickets.example/2")])
+    writeDaily(folder, "2025-08-02", False)  # 크롤링 실패한 날
+    assert store.importDailyFiles(str(folder)) == 2
+
+    # checkout 등으로 mtime만 바뀐 파일은 다시 가져오지 않는다
+    for name in os.listdir(folder):
+        os.utime(folder / name, (1, 1))
+    assert store.importDailyFiles(str(folder)) == 0
+
+    # 내용이 바뀐 파일(크기가 같아도)만 다시 가져온다
+    size = os.path.getsize(folder / "2025-08-01.json")
+    writeDaily(folder, "2025-08-01", [concert(), concert("https://tickets.example/2", price={"R": 133000, "S": 110000})])
+    assert os.path.getsize(folder / "2025-08-01.json") == size
+    writeDaily(folder, "2025-08-03", [concert("https://tickets.example/3")])
+    assert store.importDailyFiles(str(folder)) == 3
+    assert store.get("https://tickets.example/2")["price"] == {"R": 133000, "S": 110000}
+    assert len(store) == 3
+
+def test_legacy_imported_files_table_is_rebuilt(tmp_path):
+    path = str(tmp_path / "concerts.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE imported_files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL)")
+    conn.execute("INSERT INTO imported_files VALUES ('2025-08-01.json', 10, 1.0)")
+    conn.commit()
+    conn.close()
+
+    store = ConcertStore(path)
+    columns = {row["name"] for row in store.conn.execute("PRAGMA table_info(imported_files)")}
+    assert "sha256" in columns and "mtime" not in columns
+    store.close()
+
+def test_range_boundaries(store):
+    store.upsertMany([
+        concert("https://tickets.example/start", performance_rounds=[{"round": 1, "datetime": "2025-09-01T00:00:00"}],
+                ticket_open_dates={"일반 예매": "2025-08-01T00:00:00"}),
+        concert("https://tickets.example/mid", performance_rounds=[{"round": 1, "datetime": "2025-09-15 19:30"}],
+                ticket_open_dates={"선예매": "2025-08-05T20:00:00", "일반 예매": "2025-08-08T00:00:00"}),
+        concert("https://tickets.example/end", performance_rounds=[{"round": 1, "datetime": "2025-10-01T00:00:00"}],
+                ticket_open_dates={"일반 예매": "2025-08-07T23:59:59"}),
+    ], "2025-08-01")
+
+    # [start, end): 시작 시각은 포함, 끝 날짜 0시는 제외
+    links = [c["booking_link"] for c in store.concertsBetween("2025-09-01", "2025-10-01")]
+    assert links == ["https://tickets.example/start", "https://tickets.example/mid"]
+    assert [c["booking_link"] for c in store.concertsBetween("2025-09-15T19:30:00", "2025-10-01T00:00:01")] == [
+        "https://tickets.example/mid", "https://tickets.example/end",
+    ]
+
+    opens = store.ticketOpensBetween("2025-08-01", "2025-08-08")
+    assert [(at, kind) for at, kind, _ in opens] == [
+        ("2025-08-01T00:00:00", "일반 예매"), ("2025-08-05T20:00:00", "선예매"), ("2025-08-07T23:59:59", "일반 예매"),
+    ]
+    assert opens[1][2]["booking_link"] == "https://tickets.example/mid"
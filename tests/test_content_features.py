@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+
+from content_features import ENUM_CODES, OFFSETS, ContentFeatures
+from models.schemas import Genre
+
+GENRE_COL = OFFSETS["genre"] + ENUM_CODES["genre"][Genre.IDOL.value]
+
+def concert(link, name, venue="venue"):
+    return {"booking_link": link, "concert_name": name, "genre": Genre.IDOL.value, "venue": venue}
+
+def test_add_save_load_keeps_latest_rows(tmp_path):
+    features_path = str(tmp_path / "content_features.npz")
+    manifest_path = str(tmp_path / "content_manifest.json")
+    features = ContentFeatures()
+    features.add_concerts([concert("a", "A"), concert("b", "B")])
+    features.save(features_path, manifest_path)
+    first = set(os.listdir(tmp_path))
+
+    # 두 번째 저장은 새 블록만 추가로 쓴다
+    features.add_concerts([concert("b", "B2", venue="other"), concert("c", "C")])
+    assert len(features.blocks) == 2 and len(features) == 3
+    features.save(features_path, manifest_path)
+    assert first - {"content_manifest.json"} <= set(os.listdir(tmp_path))
+
+    loaded = ContentFeatures.load(features_path, manifest_path)
+    rows = loaded.rows([concert("a", "A"), concert("b", "B2"), concert("c", "C"), concert("x", "X")])
+    assert list(rows[:3]) == [0, 2, 3] and rows[3] == -1
+    assert [loaded.names[i] for i in rows[:3]] == ["A", "B2", "C"]
+    assert np.allclose(loaded.matrix.toarray(), features.matrix.toarray())
+    # 저장된 값("아이돌")으로 장르 원-핫 열이 켜진다
+    assert (loaded.matrix[rows[:3]][:, GENRE_COL].toarray() > 0).all()
+
+def test_compact_drops_replaced_rows(tmp_path):
+    features_path = str(tmp_path / "content_features.npz")
+    manifest_path = str(tmp_path / "content_manifest.json")
+    features = ContentFeatures()
+    features.add_concerts([concert("a", "A"), concert("b", "B")])
+    features.save(features_path, manifest_path)
+    features.add_concerts([concert("a", "A2")])
+    features.save(features_path, manifest_path)  # 죽은 행 1/3 > 25% -> 정리
+
+    loaded = ContentFeatures.load(features_path, manifest_path)
+    assert loaded.keys == ["b", "a"] and loaded.names == ["B", "A2"] and loaded.matrix.shape[0] == 2
+    assert sorted(os.listdir(tmp_path)) == ["content_features.00001.npz", "content_manifest.json"]
@@ -0,0 +1,57 @@
+from dedupe import dropDuplicates, expandDuplicates, findDuplicates, mergeConcerts
+
+def notice(noticeId: int, date: str, venue: str) -> str:
+    # 같은 투어의 도시별 공지: 회차 날짜와 공연장 줄만 다르다
+    return (
+        f"공연 URL: https://tickets.interpark.com/contents/notice/detail/{noticeId}\n"
+        "공연 설명: 2025 아무개 전국투어 콘서트 티켓오픈 안내\n"
+        "티켓오픈일시 2025년 8월 20일(수) 오후 8시\n"
+        f"공연일시 {date} 오후 6시\n"
+        f"공연장소 {venue}\n"
+        "관람시간 약 120분\n"
+        "티켓가격 R석 132,000원 / S석 110,000원\n"
+        f"이미지 링크: https://ticketimage.interpark.com/{noticeId}.jpg"
+    )
+
+def concert(venue: str, datetime: str) -> dict:
+    return {
+        "concert_name": "2025 아무개 전국투어 콘서트",
+        "concert_poster": None,
+        "genre": "발라드",
+        "concert_mood": "Calm",
+        "concert_style": "Solo Performance",
+        "concert_type": "Concert",
+        "casting": [{"name": "아무개"}],
+        "performance_rounds": [{"round": 1, "datetime": datetime}],
+        "venue": venue,
+        "running_time": 120,
+        "price": {"R석": 132000},
+        "age_limit": None,
+        "booking_limit": None,
+        "selling_platform": "INTERPARK",
+        "ticket_status": False,
+        "ticket_open_dates": None,
+        "booking_link": None,
+    }
+
+def test_same_tour_other_city_is_kept():
+    seoul = notice(1, "2025년 9월 13일(토)", "올림픽공원 올림픽홀")
+    busan = notice(2, "2025년 9월 27일(토)", "부산 KBS홀")
+    assert findDuplicates([seoul, busan]) == {}
+
+    merged = mergeConcerts([concert("올림픽공원 올림픽홀", "2025-09-13T18:00:00"), concert("부산 KBS홀", "2025-09-27T18:00:00")])
+    assert sorted(c["venue"] for c in merged) == ["부산 KBS홀", "올림픽공원 올림픽홀"]
+
+def test_exact_duplicate_reuses_original_record():
+    seoul = notice(1, "2025년 9월 13일(토)", "올림픽공원 올림픽홀")
+    busan = notice(2, "2025년 9월 27일(토)", "부산 KBS홀")
+    # URL/포스터 줄만 다른 재게시 공지는 본문이 같아 LLM에 보내지 않는다
+    repost = notice(3, "2025년 9월 13일(토)", "올림픽공원 올림픽홀")
+    unique, duplicateOf = dropDuplicates([seoul, busan, repost])
+    assert unique == [seoul, busan] and duplicateOf == {2: 0}
+
+    records = expandDuplicates([seoul, busan, repost], duplicateOf, [{"venue": "올림픽홀"}, None])
+    assert records == [{"venue": "올림픽홀"}, None, {"venue": "올림픽홀"}]
+
+def test_error_pages_are_not_duplicates():
+    assert findDuplicates(["[에러] 상세 페이지 없음", "[에러] 상세 페이지 없음"]) == {}
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from encoding import FeatureEncoder
+
+def ratings(users, items, stars=None):
+    return pd.DataFrame({"userid": users, "title": items, "star_rating": stars or [5] * len(users)})
+
+def test_extend_keeps_existing_indices():
+    encoder = FeatureEncoder().fit(ratings(["u2", "u1"], ["공연B", "공연A"], [4, 2]))
+    assert list(encoder.user_index(["u1", "u2"])) == [0, 1]
+    assert list(encoder.item_index(["공연A", "공연B"])) == [2, 3]
+    assert encoder.w0 == 3.0
+
+    # 정렬상 앞에 오는 새 id가 와도 기존 인덱스는 그대로, 새 변수는 num_x 뒤에 붙는다
+    assert encoder.extend(ratings(["u0", "u1", "u3"], ["공연0", "공연A", "공연A"])) == (2, 1)
+    assert list(encoder.user_index(["u1", "u2", "u0", "u3"])) == [0, 1, 4, 5]
+    assert list(encoder.item_index(["공연A", "공연B", "공연0"])) == [2, 3, 6]
+    assert encoder.num_x == 7
+
+    # 이미 아는 id만 있으면 아무것도 늘지 않는다
+    assert encoder.extend(ratings(["u0"], ["공연B"])) == (0, 0)
+    assert encoder.num_x == 7
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "fm_encoder.json")
+    encoder = FeatureEncoder().fit(ratings([101, 102], ["공연A", "공연B"], [3, 5]))
+    encoder.extend(ratings([100], ["공연C"]))
+    encoder.save(path)
+
+    loaded = FeatureEncoder.load(path)
+    assert loaded.w0 == encoder.w0 and loaded.num_x == encoder.num_x
+    # CSV에서 읽은 id가 int/str 어느 쪽이어도 같은 인덱스
+    assert list(loaded.user_index(["101", 102, 100])) == list(encoder.user_index([101, 102, 100])) == [0, 1, 4]
+    assert list(loaded.item_index(["공연A", "공연B", "공연C"])) == [2, 3, 5]
+
+    df = ratings([102, 100], ["공연C", "공연A"], [4, 2])
+    (indptr, indices, values), y = loaded.transform(df)
+    expected, expected_y = encoder.transform(df)
+    assert list(indices) == list(expected[1]) == [1, 5, 4, 2]
+    assert np.array_equal(y, expected_y)
+
+def test_unknown_keys():
+    encoder = FeatureEncoder().fit(ratings(["u1"], ["공연A"], [4]))
+    # 모르는 id는 -1
+    assert list(encoder.user_index(["u1", "nobody"])) == [0, -1]
+    assert list(encoder.item_index(["없는 공연"])) == [-1]
+
+    df = ratings(["u1", "nobody", "u1"], ["공연A", "공연A", "없는 공연"], [5, 1, 2])
+    with pytest.raises(KeyError):
+        encoder.transform(df)
+    # drop_unknown=True면 모르는 id가 있는 행만 빼고 평점도 같이 맞춘다
+    (indptr, indices, values), y = encoder.transform(df, drop_unknown=True)
+    assert list(indptr) == [0, 2] and list(indices) == [0, 1]
+    assert list(y) == [1.0]
@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from fm_model import FM, legacy_sgd, njit
+
+N_USERS, N_ITEMS, K = 10, 8, 4
+ALPHA, BETA, EPOCHS = 0.01, 0.075, 5
+
+def ratings(n=50, seed=0):
+    # 유저 one-hot + 아이템 one-hot 형태의 작은 고정 시드 데이터 (노트북 포맷)
+    rng = np.random.default_rng(seed)
+    x = [[[int(rng.integers(N_USERS)), N_USERS + int(rng.integers(N_ITEMS))], [1.0, 1.0]] for _ in range(n)]
+    y = [float(rng.integers(1, 6)) for _ in range(n)]
+    return x, y
+
+def train(engine, batch_size=1024):
+    x, y = ratings()
+    model = FM(N_USERS + N_ITEMS, K, alpha=ALPHA, beta=BETA, engine=engine, batch_size=batch_size, verbose=False, seed=1)
+    rmse = [model.sgd(x, y) for _ in range(EPOCHS)]
+    return model, rmse
+
+def legacy_predictions():
+    # 같은 시드의 초기값에서 노트북의 샘플 단위 SGD를 돌린 결과
+    x, y = ratings()
+    model = FM(N_USERS + N_ITEMS, K, alpha=ALPHA, beta=BETA, engine='batch', verbose=False, seed=1)
+    w, v = model.w.copy(), model.v.copy()
+    rmse = [legacy_sgd(w, v, x, y, ALPHA, BETA) for _ in range(EPOCHS)]
+    model.w[:], model.v[:] = w, v
+    return model.predict_many(x), rmse
+
+@pytest.mark.skipif(njit is None, reason="numba not installed")
+def test_numba_matches_legacy():
+    expected, expected_rmse = legacy_predictions()
+    model, rmse = train('numba')
+    assert np.allclose(model.predict_many(ratings()[0]), expected, atol=1e-9)
+    assert np.allclose(rmse, expected_rmse, atol=1e-9)
+
+def test_batch_engine_matches_legacy():
+    expected, expected_rmse = legacy_predictions()
+    # batch_size=1이면 샘플 단위 SGD와 같은 갱신
+    model, rmse = train('batch', batch_size=1)
+    assert np.allclose(model.predict_many(ratings()[0]), expected, atol=1e-9)
+    assert np.allclose(rmse, expected_rmse, atol=1e-9)
+    # mini-batch는 갱신 순서가 달라 근사치
+    model, rmse = train('batch', batch_size=8)
+    assert np.abs(model.predict_many(ratings()[0]) - expected).max() < 0.05
+    assert abs(rmse[-1] - expected_rmse[-1]) < 0.05
+
+def test_grow_save_reload_grow_in_place(tmp_path):
+    path = str(tmp_path / "fm_checkpoint")
+    model = FM(4, 3, verbose=False, engine='batch', seed=0)
+    model.grow(6)  # 용량 8로 늘어남
+    assert model.N == 6 and model.capacity == 8
+    w, v = model.w.copy(), model.v.copy()
+    model.save(path, last_review_rowid=10)
+
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        info = json.load(f)
+    assert info['N'] == 6 and info['capacity'] == 8
+    assert np.load(os.path.join(path, 'w.npy'), mmap_mode='r').shape == (8,)
+
+    loaded = FM.load(path)
+    assert loaded.N == 6 and loaded.capacity == 8 and loaded.meta == {'last_review_rowid': 10}
+    assert np.array_equal(loaded.w, w) and np.array_equal(loaded.v, v)
+
+    # 저장된 여유 용량 안에서는 버퍼를 새로 잡지 않는다
+    buf = loaded._w_buf
+    loaded.grow(8)
+    assert loaded._w_buf is buf and np.shares_memory(loaded.w, buf)
+    assert np.array_equal(loaded.w[:6], w) and np.array_equal(loaded.v[:6], v)
+    loaded.partial_fit([[[0, 7], [1, 1]]], [4.0], epochs=1)
+
+    # 용량을 넘으면 두 배로 다시 잡고 기존 값은 유지
+    loaded.grow(9)
+    assert loaded.capacity == 16 and loaded.N == 9
+    loaded.save(path)
+    again = FM.load(path, mmap_mode='r')
+    assert again.N == 9 and again.capacity == 16 and np.array_equal(again.w, loaded.w)
+    again.grow(10)  # 읽기 전용 매핑이면 메모리로 복사한 뒤 늘린다
+    assert again.N == 10 and np.array_equal(again.w[:9], loaded.w)
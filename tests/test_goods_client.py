@@ -0,0 +1,56 @@
+import asyncio
+
+from aiohttp import web
+
+from goods_client import GoodsNameClient
+
+async def startStub():
+    """상품 요약 API 스텁: 코드별 호출 수를 세고, 동시 요청이 겹치도록 조금 늦게 응답 ("missing"은 404)"""
+    calls: dict[str, int] = {}
+
+    async def summary(request: web.Request):
+        code = request.match_info["code"]
+        calls[code] = calls.get(code, 0) + 1
+        await asyncio.sleep(0.05)
+        if code == "missing":
+            return web.json_response({"data": None}, status=404)
+        return web.json_response({"data": {"goodsName": f"공연 {code}"}})
+
+    app = web.Application()
+    app.router.add_get("/v1/goods/{code}/summary", summary)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, calls, f"http://127.0.0.1:{port}/v1/goods/{{goods_code}}/summary"
+
+def test_goods_client(tmp_path):
+    cachePath = str(tmp_path / "goods_names.sqlite")
+
+    async def run():
+        runner, calls, apiUrl = await startStub()
+        try:
+            async with GoodsNameClient(cache_path=cachePath, api_url=apiUrl) as client:
+                # 같은 코드를 동시에 요청하면 API는 한 번만 호출
+                names = await asyncio.gather(*(client.get_name("111") for _ in range(5)), client.get_name("222"))
+                assert names == ["공연 111"] * 5 + ["공연 222"]
+                assert calls == {"111": 1, "222": 1}
+
+                assert await client.get_name("111") == "공연 111"
+                assert await client.get_name("missing") is None
+                stats = client.stats()
+                assert (stats["hits"], stats["misses"]) == (5, 3)
+                assert stats["fetch_p50_ms"] is not None
+
+            # 새 인스턴스는 SQLite에 저장된 이름을 API 호출 없이 사용 (실패한 코드는 저장하지 않음)
+            async with GoodsNameClient(cache_path=cachePath, api_url=apiUrl) as client:
+                assert await client.get_name("222") == "공연 222"
+                assert await client.get_name("missing") is None
+                stats = client.stats()
+                assert (stats["hits"], stats["misses"]) == (1, 1)
+            assert calls == {"111": 1, "222": 1, "missing": 2}
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
@@ -0,0 +1,35 @@
+import pytest
+
+from htmlParse import BACKENDS, DEFAULT_BACKEND, PARSERS, loadFixtures
+
+FIXTURES = loadFixtures()
+CASES = [(kind, n) for kind, pages in FIXTURES.items() for n in range(len(pages))]
+
+def test_fixtures_committed():
+    assert set(FIXTURES) == set(PARSERS)
+    assert DEFAULT_BACKEND == "lxml"
+
+@pytest.mark.parametrize("kind,n", CASES)
+def test_backends_agree(kind, n):
+    # 설치된 모든 백엔드가 기존 방식(bs4 전체 트리)과 같은 필드를 돌려줘야 한다
+    page = FIXTURES[kind][n]
+    expected = PARSERS[kind](page, "bs4")
+    assert expected
+    for backend in BACKENDS:
+        assert PARSERS[kind](page, backend) == expected, backend
+
+def test_fixture_fields():
+    info, poster = PARSERS["detail"](FIXTURES["detail"][0], DEFAULT_BACKEND)
+    assert info.startswith("티켓오픈일시") and "공연장소" in info and "window.__TRACK__" not in info
+    assert poster.startswith("https://ticketimage.interpark.com/")
+
+    rows = PARSERS["review_list"](FIXTURES["review_list"][0], DEFAULT_BACKEND)
+    assert len(rows) == 12
+    # EUC-KR 페이지도 meta charset대로 디코딩
+    assert rows[0]["texts"][1].startswith("너무 좋았어요 & 다음에도")
+    assert [row["goods_code"] is not None for row in rows[:4]] == [False, True, True, True]
+    # crawl_review.parse_table_row의 열 순서(제목, 후기, ..., 작성자, 날짜)와 같은 8열
+    assert len(rows[0]["texts"]) == 8 and rows[0]["texts"][6:] == ["fan000**", "2025.08.28"]
+
+    href = PARSERS["review_detail"](FIXTURES["review_detail"][0], DEFAULT_BACKEND)
+    assert "GoodsCode=" in href
@@ -0,0 +1,46 @@
+import crawlAI
+from crawlAI import HARVEST_SCRIPT, SCROLL_SCRIPT, UNSEEN_SCRIPT, iterConcerts
+
+class FakeListDriver:
+    """공지 목록 페이지 대역: 스크롤할 때마다 다음 DOM 상태로 바뀌고, 스크립트는 같은 일을 파이썬으로 한다"""
+    def __init__(self, states):
+        self.states = states
+        self.step = 0
+        self.harvested = set()  # window.__harvestedLabels
+
+    def get(self, url):
+        pass
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def tiles(self):
+        return [{"label": label, "href": f"https://tickets.example/{label}", "info": [f"{label} 정보"]}
+                for label in self.states[min(self.step, len(self.states) - 1)]]
+
+    def execute_script(self, script, *args):
+        if script == HARVEST_SCRIPT:
+            new = [tile for tile in self.tiles() if tile["label"] not in self.harvested]
+            self.harvested.update(tile["label"] for tile in new)
+            return new
+        if script == UNSEEN_SCRIPT:
+            return any(tile["label"] not in self.harvested for tile in self.tiles())
+        if script == SCROLL_SCRIPT:
+            self.step += 1
+            return None
+        raise AssertionError(f"unexpected script: {script[:40]}")
+
+def labels(driver):
+    return [text.split("공연명:")[1].split("\n")[0].strip() for text in iterConcerts(driver)]
+
+def test_new_tiles_found_by_label(monkeypatch):
+    monkeypatch.setattr(crawlAI, "GROWTH_TIMEOUT", 0.05)
+    monkeypatch.setattr(crawlAI, "GROWTH_POLL", 0.01)
+    driver = FakeListDriver([
+        ["A", "B", "C"],
+        # 가상 스크롤로 앞 타일이 빠지고 맨 위에 새 공지 N이 끼어든 경우 (위치로 자르면 N, D를 놓친다)
+        ["N", "C", "D", "E"],
+        # 재정렬되어 이미 읽은 타일이 다시 보여도 한 번만 내보낸다
+        ["E", "A", "F"],
+    ])
+    assert labels(driver) == ["A", "B", "C", "N", "D", "E", "F"]
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from langchain_core.language_models import FakeListChatModel
+
+from makeJson import ConcertParser
+from parseCache import ParseCache
+
+def concertJson(name: str) -> dict:
+    return {
+        "concert_name": name,
+        "concert_poster": None,
+        "genre": "발라드",
+        "concert_mood": "Calm",
+        "concert_style": "Solo Performance",
+        "concert_type": "Concert",
+        "casting": [{"name": name}],
+        "performance_rounds": [{"round": 1, "datetime": "2025-09-13T18:00:00"}],
+        "venue": "올림픽홀",
+        "running_time": 120,
+        "price": {"R석": 99000},
+        "age_limit": None,
+        "booking_limit": None,
+        "selling_platform": "INTERPARK",
+        "ticket_status": False,
+        "ticket_open_dates": None,
+        "booking_link": None,
+    }
+
+def parse(texts, model, **kwargs):
+    # 테스트에서는 속도 제한으로 기다리지 않도록 분당 요청 수를 크게 준다
+    return asyncio.run(ConcertParser.astructure_concerts(texts, model=model, requests_per_minute=60_000, **kwargs))
+
+def test_batch_split_on_failure():
+    # 첫 배치 응답은 공연이 1개뿐이라 개수 불일치 -> 반으로 나눠 공연별 단일 요청으로 다시 파싱
+    model = FakeListChatModel(responses=[
+        json.dumps({"concerts": [concertJson("A")]}),
+        json.dumps(concertJson("A")),
+        json.dumps(concertJson("B")),
+    ])
+    results, failures = parse(["공연 A 공지", "공연 B 공지"], model, batch_size=2, max_concurrency=1)
+
+    assert failures == {}
+    assert [result["concert_name"] for result in results] == ["A", "B"]
+
+def test_failure_reported_by_input_index():
+    model = FakeListChatModel(responses=[json.dumps(concertJson("A")), "not json"])
+    results, failures = parse(["공연 A 공지", "공연 B 공지"], model, max_concurrency=1)
+
+    assert results[0]["concert_name"] == "A"
+    assert results[1] is None
+    assert list(failures) == [1]
+
+def test_cache_hit_skips_model(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache.sqlite"))
+    first, _ = parse(["공연 A 공지"], FakeListChatModel(responses=[json.dumps(concertJson("A"))]), cache=cache)
+
+    # 두 번째 실행은 모델이 잘못된 응답만 주더라도 캐시에서 같은 결과를 돌려준다
+    second, failures = parse(["공연 A  공지 "], FakeListChatModel(responses=["not json"]), cache=cache)
+
+    assert failures == {}
+    assert second == first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    cache.close()
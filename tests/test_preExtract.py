@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+from langchain_core.language_models import FakeListChatModel
+
+from makeJson import ConcertParser
+from preExtract import RULE_FIELDS, extractFields, splitSections
+
+# get_text(strip=True)로 라벨과 값이 붙어 있는 상세 본문 ("티켓오픈일시" 안의 "일시"가 공연 일시로 잡히면 안 된다)
+DETAIL_TEXT = (
+    "공연 URL: https://tickets.interpark.com/contents/notice/detail/12345\n"
+    "공연 설명: 2025 아무개 콘서트 티켓오픈 안내"
+    "티켓오픈일시Membership Presale 2025년 8월 18일(월) 오후 8시 일반 예매 2025년 8월 20일(수) 오후 8시"
+    "공연일시2025년 9월 13일(토) 오후 6시 ~ 14일(일) 오후 5시"
+    "공연장소올림픽공원 올림픽홀"
+    "관람시간약 120분"
+    "관람등급만 7세 이상"
+    "티켓가격R석 132,000원 / S석 110,000원"
+    "예매제한1인 2매까지 예매 가능\n"
+    "이미지 링크: https://ticketimage.interpark.com/poster.jpg"
+)
+
+def test_ticket_open_header_is_not_performance():
+    sections = splitSections(DETAIL_TEXT)
+    assert "2025년 8월" in sections["ticket_open"]
+    assert "2025년 8월" not in sections["performance"]
+
+def test_extract_fields():
+    fields = extractFields(DETAIL_TEXT)
+
+    assert set(fields) == set(RULE_FIELDS)
+    assert fields["performance_rounds"] == [
+        {"round": 1, "datetime": "2025-09-13T18:00:00"},
+        {"round": 2, "datetime": "2025-09-14T17:00:00"},
+    ]
+    assert fields["price"] == {"R": 132000, "S": 110000}
+    assert fields["running_time"] == 120
+    assert fields["age_limit"] == "만 7세 이상"
+    assert fields["concert_poster"] == "https://ticketimage.interpark.com/poster.jpg"
+    assert fields["booking_link"] == "https://tickets.interpark.com/contents/notice/detail/12345"
+
+def test_llm_fields_are_kept():
+    classification = {
+        "concert_name": "2025 아무개 콘서트",
+        "genre": "발라드",
+        "concert_mood": "Calm",
+        "concert_style": "Solo Performance",
+        "concert_type": "Concert",
+        "casting": [{"name": "아무개"}],
+        "venue": "올림픽공원 올림픽홀",
+        "booking_limit": "1인 2매",
+        "ticket_status": False,
+        "ticket_open_dates": {"Membership Presale": "2025-08-18T20:00:00", "일반 예매": "2025-08-20T20:00:00"},
+    }
+    model = FakeListChatModel(responses=[json.dumps(classification, ensure_ascii=False)])
+    results, failures = asyncio.run(ConcertParser.astructure_concerts(
+        [DETAIL_TEXT], model=model, pre_extract=True, requests_per_minute=60_000,
+    ))
+
+    assert failures == {}
+    concert = results[0]
+    # 예매 유형 이름과 ticket_status는 LLM 값 그대로, 회차/가격은 규칙 값
+    assert concert["ticket_open_dates"] == classification["ticket_open_dates"]
+    assert concert["ticket_status"] is False
+    assert concert["booking_limit"] == "1인 2매"
+    assert [r["datetime"] for r in concert["performance_rounds"]] == ["2025-09-13T18:00:00", "2025-09-14T17:00:00"]
+    assert concert["price"] == {"R": 132000, "S": 110000}
+
+# 포스터, 관람시간, 관람등급이 없는 공지 (규칙 필드는 null이어도 키는 있어야 Concert 검증을 통과)
+SPARSE_TEXT = (
+    "공연 URL: https://tickets.interpark.com/contents/notice/detail/67890\n"
+    "공연 설명: 2025 누군가 단독 공연 티켓오픈 안내"
+    "티켓오픈일시2025년 8월 20일(수) 오후 8시"
+    "공연일시2025년 10월 4일(토) 오후 7시"
+    "공연장소블루스퀘어 마스터카드홀\n"
+)
+
+CLASSIFICATION = {
+    "concert_name": "2025 누군가 단독 공연",
+    "genre": "발라드",
+    "concert_mood": "Calm",
+    "concert_style": "Solo Performance",
+    "concert_type": "Concert",
+    "casting": [{"name": "누군가"}],
+    "venue": "블루스퀘어 마스터카드홀",
+    "booking_limit": None,
+    "ticket_status": False,
+    "ticket_open_dates": {"일반 예매": "2025-08-20T20:00:00"},
+}
+
+def test_missing_rule_fields_are_null():
+    fields = extractFields(SPARSE_TEXT)
+    assert fields["concert_poster"] is None and fields["running_time"] is None and fields["age_limit"] is None
+
+    model = FakeListChatModel(responses=[json.dumps(CLASSIFICATION, ensure_ascii=False)])
+    results, failures = asyncio.run(ConcertParser.astructure_concerts(
+        [SPARSE_TEXT], model=model, pre_extract=True, requests_per_minute=60_000,
+    ))
+
+    assert failures == {}
+    concert = results[0]
+    assert (concert["concert_poster"], concert["running_time"], concert["age_limit"]) == (None, None, None)
+    assert [r["datetime"] for r in concert["performance_rounds"]] == ["2025-10-04T19:00:00"]
+
+def test_invalid_merge_falls_back_to_full_prompt(monkeypatch):
+    import makeJson
+
+    # 합친 결과가 스키마 검증에 실패하면 전체 프롬프트 응답을 쓴다
+    monkeypatch.setattr(makeJson, "mergeFields", lambda parsed, fields: parsed)
+    full = {
+        **CLASSIFICATION,
+        "concert_poster": None,
+        "performance_rounds": [{"round": 1, "datetime": "2025-10-04T19:00:00"}],
+        "running_time": 100,
+        "price": {"R석": 99000},
+        "age_limit": None,
+        "selling_platform": "INTERPARK",
+        "booking_link": None,
+    }
+    model = FakeListChatModel(responses=[json.dumps(CLASSIFICATION, ensure_ascii=False), json.dumps(full, ensure_ascii=False)])
+    results, failures = asyncio.run(ConcertParser.astructure_concerts(
+        [SPARSE_TEXT], model=model, pre_extract=True, requests_per_minute=60_000,
+    ))
+
+    assert failures == {}
+    assert results[0]["running_time"] == 100
@@ -0,0 +1,102 @@
+import asyncio
+import csv
+import sqlite3
+from types import SimpleNamespace
+
+from crawl_review import InterParkReviewCrawler
+from htmlParse import loadFixtures
+from review_sink import CSV_COLUMNS, ReviewSink
+
+def review(userid, url, rating="5"):
+    return {"url": url, "userid": userid, "title": "공연", "review": "좋아요", "star_rating": rating}
+
+def read_url(no, page_no):
+    return f"http://ticket.interpark.com/Community/Play/Talk/CommunityRead.asp?bbsno=10&no={no}&pageno={page_no}"
+
+def test_shifted_review_is_stored_once(tmp_path):
+    sink = ReviewSink(str(tmp_path / "reviews.sqlite"))
+    assert sink.write_page(1, [review("a", read_url(5, 1)), review("b", read_url(4, 1))]) == 2
+    # 새 리뷰가 올라와 같은 리뷰가 2페이지에서 pageno만 다른 URL로 다시 보여도 한 번만 저장
+    assert sink.write_page(2, [review("b", read_url(4, 2)), review("c", read_url(3, 2))]) == 1
+
+    assert sink.count() == 3
+    assert sink.newest_review_id() == 5
+    assert sink.known_ids([6, 5, 3, None]) == {5, 3}
+    sink.close()
+
+def test_old_sink_is_migrated(tmp_path):
+    path = str(tmp_path / "reviews.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE reviews (url TEXT NOT NULL, userid TEXT NOT NULL, title TEXT, review TEXT, star_rating INTEGER,
+            view INTEGER, likes INTEGER, stars TEXT, blank TEXT, date TEXT, page_no INTEGER NOT NULL, UNIQUE (userid, url));
+        CREATE TABLE completed_pages (page_no INTEGER PRIMARY KEY, review_count INTEGER NOT NULL, completed_at REAL NOT NULL);
+        """
+    )
+    conn.executemany(
+        "INSERT INTO reviews (url, userid, page_no) VALUES (?, ?, ?)",
+        [(read_url(5, 1), "a", 1), (read_url(4, 1), "b", 1), (read_url(4, 2), "b", 2)],
+    )
+    conn.commit()
+    conn.close()
+
+    sink = ReviewSink(path)
+    # pageno만 다른 중복 행은 먼저 저장된 것만 남는다
+    assert sink.count() == 2 and sink.known_ids([5, 4]) == {5, 4}
+    assert sink.write_page(3, [review("b", read_url(4, 3))]) == 0
+    sink.close()
+
+class FakeCrawler:
+    def __init__(self, html):
+        self.html = html
+
+    async def arun(self, url, **kwargs):
+        return SimpleNamespace(success=True, html=self.html)
+
+class FakeGoodsClient:
+    def __init__(self):
+        self.lookups = 0
+
+    async def get_name(self, goods_code):
+        self.lookups += 1
+        return f"공연 {goods_code}"
+
+def test_known_reviews_skip_lookups(tmp_path):
+    sink = ReviewSink(str(tmp_path / "reviews.sqlite"))
+    crawler = InterParkReviewCrawler(sink, host_delays={})
+    crawler.throttle.default_delay = 0
+    crawler.crawler = FakeCrawler(loadFixtures()["review_list"][0])
+    crawler.goods_client = FakeGoodsClient()
+
+    rows, ok = asyncio.run(crawler.crawl_page(1))
+    assert ok and rows
+    inserted = sink.write_page(1, rows)
+    lookups = crawler.goods_client.lookups
+    assert inserted > 0 and lookups > 0
+
+    # 다음 실행에서 같은 목록이 다른 페이지 번호로 보여도 저장된 글 번호는 제목 조회 없이 건너뜀
+    rows, ok = asyncio.run(crawler.crawl_page(2))
+    assert ok and rows == []
+    assert crawler.goods_client.lookups == lookups
+    assert crawler.known_rows_skipped >= inserted
+    sink.close()
+
+def test_existing_csv_survives_export(tmp_path):
+    csvPath = str(tmp_path / "interpark_reviews.csv")
+    with open(csvPath, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerow(review("old", "u0", "4"))
+        writer.writerow(review("a", "u1", "3"))
+
+    sink = ReviewSink(str(tmp_path / "reviews.sqlite"))
+    assert sink.import_csv(csvPath) == 2
+    sink.write_page(1, [review("a", "u1"), review("b", "u2")])
+    sink.export_csv(csvPath)
+    sink.close()
+
+    with open(csvPath, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    # CSV에만 있던 리뷰가 남고, 같은 (userid, url)은 한 번만
+    assert [(row["userid"], row["url"]) for row in rows] == [("old", "u0"), ("a", "u1"), ("b", "u2")]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+import serving
+from content_features import ContentFeatures, infer_factors
+from encoding import FeatureEncoder
+from models.schemas import Genre
+from serving import Recommender
+
+N_USERS, N_ITEMS, K = 300, 40, 8
+
+def model(seed=0):
+    rng = np.random.default_rng(seed)
+    encoder = FeatureEncoder([f"user{i}" for i in range(N_USERS)], [f"공연 {i}" for i in range(N_ITEMS)])
+    w = rng.normal(scale=0.1, size=encoder.num_x).astype(np.float32)
+    v = rng.normal(scale=0.3, size=(encoder.num_x, K)).astype(np.float32)
+    return encoder, w, v
+
+def brute_force(encoder, w, v, user, k):
+    # 유저별 순위 = w_i + <v_u, v_i> (처음 보는 유저는 v_u = 0)
+    items = encoder.item_index(list(encoder.items))
+    pos = encoder.user_index([user])[0]
+    scores = w[items] + (v[items] @ v[pos] if pos >= 0 else 0)
+    order = np.argsort(-scores, kind="stable")[:k]
+    return [encoder.items[i] for i in order], scores[order]
+
+def test_top_k_matches_brute_force():
+    encoder, w, v = model()
+    server = Recommender(w, v, encoder)
+    # USER_BATCH(256)를 넘겨 여러 배치로 나뉘는 경로까지 확인, 마지막은 처음 보는 유저
+    users = [f"user{i}" for i in range(N_USERS)] + ["new user"]
+    results = server.recommend(users, k=5)
+    assert len(results) == len(users)
+    for user, result in zip(users, results):
+        titles, scores = brute_force(encoder, w, v, user, 5)
+        assert [title for title, _ in result] == titles
+        assert np.allclose([score for _, score in result], scores, atol=1e-5)
+    assert server.latency()["requests"] == 1
+
+    # k가 후보 수보다 크면 전체 후보를 점수순으로
+    assert len(server.recommend(["user0"], k=100)[0]) == N_ITEMS
+
+@pytest.mark.parametrize("backend", ["faiss", "hnswlib"])
+def test_ann_recall(backend):
+    if getattr(serving, backend) is None:
+        pytest.skip(f"{backend} not installed")
+    encoder, w, v = model()
+    server = Recommender(w, v, encoder)
+    users = [f"user{i}" for i in range(50)]
+    exact = server.recommend(users, k=5)
+    assert server.build_index(backend) == backend
+    approx = server.recommend(users, k=5)
+    hits = sum(len({t for t, _ in a} & {t for t, _ in e}) for a, e in zip(approx, exact))
+    assert hits / (5 * len(users)) >= 0.95
+
+def concert(name, venue, genre=Genre.BALLAD):
+    return {"concert_name": name, "booking_link": f"https://tickets.example/{name}", "genre": genre.value,
+            "venue": venue, "casting": [{"name": name.split()[0]}]}
+
+def test_unmatched_and_cold_start_candidates():
+    encoder, w, v = model()
+    # 공백만 다른 공연명은 학습된 공연으로 매칭, 리뷰가 없는 공연은 콘텐츠 피처가 없으면 빠진다
+    candidates = [{"concert_name": " 공연  1 "}, {"concert_name": "공연 2"}, concert("신인 데뷔 공연", "홍대 롤링홀")]
+    server = Recommender(w, v, encoder, candidates)
+    assert server.set_candidates(candidates) == (2, 0, 1)
+    assert list(server.titles) == ["공연 1", "공연 2"]
+
+    # 콘텐츠 피처가 있으면 비슷한 학습된 공연의 요인으로 추정해 후보에 넣는다
+    content = ContentFeatures()
+    content.add_concerts([concert("공연 1", "홍대 롤링홀"), concert("공연 2", "올림픽홀", Genre.IDOL),
+                          concert("신인 데뷔 공연", "홍대 롤링홀")])
+    assert server.set_candidates(candidates, content) == (2, 1, 0)
+    assert list(server.titles) == ["공연 1", "공연 2", "신인 데뷔 공연"]
+
+    known_pos = encoder.item_index(["공연 1", "공연 2"])
+    cold_w, cold_v = infer_factors(content.matrix, np.array([2]), [0, 1], w[known_pos], v[known_pos])
+    assert np.allclose(server.item_w[2], cold_w[0]) and np.allclose(server.item_v[2], cold_v[0])
+    # 공연장/장르가 같은 "공연 1"의 요인에 더 가깝다
+    assert np.abs(server.item_v[2] - v[known_pos[0]]).sum() < np.abs(server.item_v[2] - v[known_pos[1]]).sum()
+
+    # 처음 보는 유저에게는 w_i 순으로 추천
+    [result] = server.recommend(["new user"], k=3)
+    assert [score for _, score in result] == sorted(server.item_w.tolist(), reverse=True)
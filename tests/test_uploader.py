@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from stubServer import startStub
+from uploader import uploadConcerts
+
+def concerts(n):
+    return [{"concert_name": f"공연 {i}", "booking_link": f"https://tickets.example/{i}"} for i in range(n)]
+
+def upload(items, **stubKwargs):
+    async def run():
+        runner, stored, log, url = await startStub(**stubKwargs)
+        try:
+            stats, failures = await uploadConcerts(items, url, chunkSize=200, baseDelay=0.01, maxDelay=0.05)
+        finally:
+            await runner.cleanup()
+        return stats, failures, stored, log
+
+    return asyncio.run(run())
+
+def test_chunks():
+    stats, failures, stored, log = upload(concerts(450))
+    assert not failures and len(stored) == 450
+    assert sorted(count for _, count, _ in log) == [50, 200, 200]
+    assert (stats["requests"], stats["sent"], stats["retries"], stats["splits"]) == (3, 450, 0, 0)
+    assert stats["gzip_bytes"] < stats["raw_bytes"]
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retry_keeps_idempotency_key(status):
+    stats, failures, stored, log = upload(concerts(450), failFirst=status)
+    assert not failures and len(stored) == 450
+    assert (stats["requests"], stats["retries"]) == (6, 3)
+    # 청크마다 같은 키로 한 번 실패하고 한 번 성공
+    attempts: dict[str, list[int]] = {}
+    for key, _, code in log:
+        attempts.setdefault(key, []).append(code)
+    assert list(attempts.values()) == [[status, 200]] * 3
+
+def test_bisects_bad_records():
+    items = concerts(400)
+    for idx in (10, 250, 399):
+        items[idx]["concert_name"] = None
+    stats, failures, stored, log = upload(items)
+    assert sorted(items.index(concert) for concert, _ in failures) == [10, 250, 399]
+    assert all("422" in error for _, error in failures)
+    assert len(stored) == 397 and stats["sent"] == 397
+    assert stats["retries"] == 0 and stats["splits"] > 0
+    # 422는 재시도하지 않으므로 같은 키로 두 번 보낸 요청이 없다
+    keys = [key for key, _, _ in log]
+    assert len(keys) == len(set(keys))
@@ -0,0 +1,188 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+import aiohttp
+
+from metrics import METRICS
+from rateLimit import BASE_DELAY, MAX_DELAY, MAX_RETRIES, retryWithBackoff
+
+# 공연 저장 API (UPLOAD_API_URL로 다른 서버 지정 가능)
+API_URL = os.getenv("UPLOAD_API_URL", "https://dev.bolmal.shop/save")
+CHUNK_SIZE = 200         # 요청 하나에 담는 공연 수
+MAX_CONNECTIONS = 4      # 동시에 보내는 청크 수 (keep-alive 연결 재사용)
+UPLOAD_TIMEOUT = 30      # 청크 요청 하나의 제한 시간(초)
+GZIP_LEVEL = 6
+HEADERS = {
+    "Content-Type": "application/x-ndjson",
+    "Content-Encoding": "gzip",
+    "Accept": "application/json",
+}
+
+# 잠시 후 다시 보내면 성공할 수 있는 응답
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+class UploadError(Exception):
+    """저장 API가 2xx가 아닌 응답을 준 경우 (retryAfter가 response.headers를 읽는다)"""
+    def __init__(self, status_code: int, response: aiohttp.ClientResponse, body: str):
+        super().__init__(f"HTTP {status_code}: {body[:200]}")
+        self.status_code = status_code
+        self.response = response
+
+def isRetryableUpload(e: Exception) -> bool:
+    # 연결 끊김/타임아웃과 429, 5xx는 재시도, 나머지 4xx는 청크 안의 데이터 문제로 본다
+    if isinstance(e, UploadError):
+        return e.status_code in RETRYABLE_STATUS
+    return isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+def encodeChunk(concerts: list[dict]) -> tuple[bytes, int, str]:
+    """공연 목록 -> (gzip NDJSON 본문, 압축 전 크기, 멱등 키). 같은 내용이면 같은 키라 재시도해도 한 번만 저장된다"""
+    raw = "".join(json.dumps(concert, ensure_ascii=False, separators=(",", ":")) + "\n" for concert in concerts).encode("utf-8")
+    return gzip.compress(raw, compresslevel=GZIP_LEVEL), len(raw), hashlib.sha256(raw).hexdigest()
+
+class Uploader:
+    """검증된 공연을 CHUNK_SIZE개씩 gzip NDJSON으로 나눠 하나의 keep-alive 세션으로 업로드"""
+    def __init__(
+        self,
+        url: str = API_URL,
+        chunkSize: int = CHUNK_SIZE,
+        maxConnections: int = MAX_CONNECTIONS,
+        timeout: float = UPLOAD_TIMEOUT,
+        maxRetries: int = MAX_RETRIES,
+        baseDelay: float = BASE_DELAY,
+        maxDelay: float = MAX_DELAY,
+    ):
+        self.url = url
+        self.chunkSize = chunkSize
+        self.maxConnections = maxConnections
+        self.timeout = timeout
+        self.maxRetries = maxRetries
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.session = None
+        self.semaphore = asyncio.Semaphore(maxConnections)
+        self.stats = {"sent": 0, "failed": 0, "requests": 0, "retries": 0, "splits": 0, "raw_bytes": 0, "gzip_bytes": 0}
+        self.failures: list[tuple[dict, str]] = []
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.maxConnections, limit_per_host=self.maxConnections)
+        self.session = aiohttp.ClientSession(
+            headers=HEADERS, connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def postChunk(self, body: bytes, key: str):
+        self.stats["requests"] += 1
+        METRICS.count("upload.requests")
+        METRICS.count("upload.bytes", len(body))
+        async with self.session.post(self.url, data=body, headers={"Idempotency-Key": key}) as response:
+            text = await response.text()
+            if response.status >= 300:
+                raise UploadError(response.status, response, text)
+
+    def onRetry(self, label: str, attempt: int, e: Exception, delay: float):
+        self.stats["retries"] += 1
+        METRICS.count("upload.retries")
+        print(f"⏳ [업로드 {label}] {type(e).__name__}: {e} -> 재시도 {attempt}회 ({delay:.1f}s 대기)")
+
+    async def sendChunk(self, concerts: list[dict], label: str):
+        """청크 하나를 재시도까지 해서 보내고, 재시도로 안 되는 4xx면 반으로 나눠 문제 공연만 골라낸다"""
+        body, rawSize, key = encodeChunk(concerts)
+        try:
+            async with self.semaphore:
+                await retryWithBackoff(
+                    lambda: self.postChunk(body, key),
+                    maxRetries=self.maxRetries,
+                    retryable=isRetryableUpload,
+                    baseDelay=self.baseDelay,
+                    maxDelay=self.maxDelay,
+                    onRetry=lambda attempt, e, delay: self.onRetry(label, attempt, e, delay),
+                )
+        except Exception as e:
+            if len(concerts) > 1 and not isRetryableUpload(e):
+                self.stats["splits"] += 1
+                half = len(concerts) // 2
+                await asyncio.gather(
+                    self.sendChunk(concerts[:half], f"{label}a"),
+                    self.sendChunk(concerts[half:], f"{label}b"),
+                )
+                return
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ [업로드 {label}] 공연 {len(concerts)}개 실패: {error}")
+            self.stats["failed"] += len(concerts)
+            METRICS.count("upload.failures", len(concerts))
+            self.failures.extend((concert, error) for concert in concerts)
+            return
+        self.stats["sent"] += len(concerts)
+        self.stats["raw_bytes"] += rawSize
+        self.stats["gzip_bytes"] += len(body)
+        METRICS.count("upload.raw_bytes", rawSize)
+
+    async def upload(self, concerts: list[dict]) -> dict:
+        """전체 공연 업로드 후 통계 반환 (실패한 공연은 self.failures에 (공연, 오류)로 남는다)"""
+        started = time.perf_counter()
+        with METRICS.timer("upload"):
+            await asyncio.gather(*(
+                self.sendChunk(concerts[i:i + self.chunkSize], str(i // self.chunkSize))
+                for i in range(0, len(concerts), self.chunkSize)
+            ))
+        return {**self.stats, "seconds": time.perf_counter() - started}
+
+async def uploadConcerts(concerts: list[dict], url: str = API_URL, **kwargs) -> tuple[dict, list[tuple[dict, str]]]:
+    async with Uploader(url, **kwargs) as uploader:
+        stats = await uploader.upload(concerts)
+    return stats, uploader.failures
+
+async def benchmark(n: int = 5000, delay: float = 0.02, uplinkMbps: float = 20):
+    # 테스트와 같은 저장 API 스텁(stubServer.py)으로 기존 방식(indent=2 JSON 한 번에 전송)과 청크 gzip NDJSON 업로드 비교.
+    # 루프백은 대역폭 제한이 없으므로 uplinkMbps 회선에서의 전송 시간 추정치를 함께 출력
+    transfer = lambda size: size * 8 / (uplinkMbps * 1e6)
+    from concertStore import syntheticConcerts
+    from stubServer import startStub
+
+    concerts = [concert for _, concert in syntheticConcerts(n)]
+
+    runner, stored, _, url = await startStub(delay=delay)
+    try:
+        payload = json.dumps(concerts, ensure_ascii=False, indent=2).encode("utf-8")
+        started = time.perf_counter()
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, data=payload, headers={"Content-Type": "application/json"}) as response:
+                await response.read()
+        elapsed = time.perf_counter() - started
+        print(f"📦 기존 방식 (JSON indent=2, 요청 1번): {len(payload) / 2**20:.2f}MB, {elapsed:.2f}s, {n / elapsed:,.0f}건/s, "
+              f"{uplinkMbps:g}Mbps 전송 추정 {transfer(len(payload)):.2f}s")
+
+        for chunkSize in [50, 200, 1000]:
+            stored.clear()
+            stats, failures = await uploadConcerts(concerts, url, chunkSize=chunkSize)
+            assert len(stored) == n and not failures
+            print(f"🚀 청크 {chunkSize:>4}개 gzip NDJSON: {stats['gzip_bytes'] / 2**20:.2f}MB "
+                  f"({stats['gzip_bytes'] / len(payload):.1%}), 요청 {stats['requests']}번, "
+                  f"{stats['seconds']:.2f}s, {n / stats['seconds']:,.0f}건/s, 전송 추정 {transfer(stats['gzip_bytes']):.2f}s")
+    finally:
+        await runner.cleanup()
+
+    # 일시 오류(청크마다 첫 요청은 503) + 잘못된 공연 3개: 재시도로 모두 저장되고, 잘못된 공연만 골라져야 한다
+    runner, stored, _, url = await startStub(failFirst=503)
+    try:
+        broken = [dict(concert) for concert in concerts[:1000]]
+        for idx in (10, 500, 999):
+            broken[idx]["concert_name"] = None
+        stats, failures = await uploadConcerts(broken, url, baseDelay=0.01)
+        ok = len(stored) == len(broken) - 3 and sorted(broken.index(c) for c, _ in failures) == [10, 500, 999]
+        print(f"🧪 부분 실패: 저장 {len(stored)}건, 실패 {len(failures)}건, 재시도 {stats['retries']}번, "
+              f"분할 {stats['splits']}번 {'✅' if ok else '❌'}")
+    finally:
+        await runner.cleanup()
+
+# 사용 예시: python uploader.py [공연 수]
+if __name__ == "__main__":
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))